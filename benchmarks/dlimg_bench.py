@@ -0,0 +1,72 @@
+"""Benchmark for compositing dlimg images onto the canvas.
+
+Compares the previous full-canvas alpha compositing with paste_tile,
+which composites only the area an image covers and pastes opaque images
+directly, for many small images on large canvases. Run from the
+repository root:
+
+    python benchmarks/dlimg_bench.py
+"""
+import os
+import sys
+import timeit
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "custom_components"))
+
+from open_epaper_link.imagegen import paste_tile  # noqa: E402
+
+SIZES = [(296, 128), (800, 480), (1600, 1200)]
+IMAGES = 20
+TILE_SIZE = (48, 48)
+REPEAT = 5
+
+
+def make_tiles():
+    """Create a transparent and an opaque tile."""
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, (TILE_SIZE[1], TILE_SIZE[0], 4), dtype=np.uint8)
+    transparent = Image.fromarray(pixels, "RGBA")
+    opaque = transparent.convert("RGB")
+    return transparent, opaque
+
+
+def full_canvas(img, tile, position):
+    """Composite like before: a canvas-sized layer per image."""
+    tile = tile.convert("RGBA")
+    temp_img = Image.new("RGBA", img.size)
+    temp_img.paste(tile, position, tile)
+    img.paste(Image.alpha_composite(img, temp_img), (0, 0))
+
+
+def draw_all(size, tile, composite):
+    """Draw IMAGES tiles spread over a white canvas."""
+    img = Image.new("RGBA", size, (255, 255, 255, 255))
+    for i in range(IMAGES):
+        position = ((i * 37) % max(1, size[0] - TILE_SIZE[0]), (i * 23) % max(1, size[1] - TILE_SIZE[1]))
+        composite(img, tile, position)
+    return img
+
+
+def bench(name, func):
+    """Time a function and print the mean duration per call."""
+    seconds = timeit.timeit(func, number=REPEAT) / REPEAT
+    print(f"{name:<28} {seconds * 1e3:10.2f} ms")
+
+
+def main():
+    transparent, opaque = make_tiles()
+    for size in SIZES:
+        print(f"{size[0]}x{size[1]}, {IMAGES} images of {TILE_SIZE[0]}x{TILE_SIZE[1]}")
+        assert draw_all(size, transparent, full_canvas).tobytes() == draw_all(size, transparent, paste_tile).tobytes()
+        assert draw_all(size, opaque, full_canvas).tobytes() == draw_all(size, opaque, paste_tile).tobytes()
+        bench("  transparent (full canvas)", lambda: draw_all(size, transparent, full_canvas))
+        bench("  transparent (region)", lambda: draw_all(size, transparent, paste_tile))
+        bench("  opaque (full canvas)", lambda: draw_all(size, opaque, full_canvas))
+        bench("  opaque (direct paste)", lambda: draw_all(size, opaque, paste_tile))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Benchmark for palette rendering.
+
+Compares drawing on an RGBA canvas with drawing on a palette canvas at
+common tag resolutions. Run from the repository root:
+
+    python benchmarks/palette_bench.py
+"""
+import io
+import os
+import sys
+import timeit
+from types import SimpleNamespace
+
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "custom_components"))
+
+from open_epaper_link.imagegen import BLACK, RED, WHITE, create_palette_canvas  # noqa: E402
+
+SIZES = [(296, 128), (400, 300), (800, 480)]
+REPEAT = 5
+COLOR_TABLE = {"white": [255, 255, 255], "black": [0, 0, 0], "red": [255, 0, 0]}
+
+
+def draw_primitives(img):
+    """Draw a typical mix of shapes, rotate and encode to JPEG."""
+    draw = ImageDraw.Draw(img)
+    width, height = img.size
+    for i in range(0, width, 20):
+        draw.line([(i, 0), (width - i, height - 1)], fill=BLACK, width=2)
+    draw.rectangle([10, 10, width // 2, height // 2], fill=RED, outline=BLACK, width=3)
+    draw.ellipse([width // 2, height // 2, width - 10, height - 10], fill=WHITE, outline=RED)
+    img = img.rotate(90, expand=True)
+    output = io.BytesIO()
+    img.convert('RGB').save(output, format="JPEG", quality="maximum")
+    return output.getvalue()
+
+
+def bench(name, func):
+    """Time a function and print the mean duration per call."""
+    seconds = timeit.timeit(func, number=REPEAT) / REPEAT
+    print(f"{name:<28} {seconds * 1e3:10.2f} ms")
+
+
+def main():
+    for width, height in SIZES:
+        tag = SimpleNamespace(width=width, height=height, bpp=2, rotatebuffer=0, color_table=COLOR_TABLE)
+
+        print(f"{width}x{height}")
+        bench("  render (RGBA canvas)", lambda: draw_primitives(Image.new('RGBA', (width, height), WHITE)))
+        bench("  render (palette canvas)", lambda: draw_primitives(create_palette_canvas(tag, (width, height), WHITE)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Benchmark for the plot element at growing history sizes.
+
+Times the complete plot element as well as the coordinate transform and
+Catmull-Rom smoothing alone, comparing the previous point-by-point code
+with the NumPy versions. Run from the repository root:
+
+    python benchmarks/plot_bench.py
+"""
+import math
+import os
+import sys
+import tempfile
+import timeit
+from array import array
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "custom_components"))
+
+from homeassistant.util import dt  # noqa: E402
+
+from open_epaper_link.imagegen import ImageGen  # noqa: E402
+from open_epaper_link.plot_geometry import catmull_rom_spline, to_screen  # noqa: E402
+
+SIZES = [1_000, 10_000, 100_000]
+REPEAT = 3
+BOX = (30, 0, 266, 110)
+
+
+def make_series(count):
+    """Create a day of noisy sensor history."""
+    end = dt.utcnow()
+    start = end - timedelta(days=1)
+    timestamps = np.linspace(start.timestamp(), end.timestamp(), count)
+    values = 20 + 5 * np.sin(np.arange(count) / (count / 20)) + np.random.default_rng(0).normal(0, 0.5, count)
+    return start, end, array("d", timestamps), array("d", values)
+
+
+def python_transform(timestamps, values, start, duration, min_v, spread):
+    """The previous per-point transform on datetimes."""
+    x0, y0, width, height = BOX
+    points = []
+    for timestamp, value in zip(timestamps, values):
+        rel_time = (dt.utc_from_timestamp(timestamp) - start) / duration
+        rel_value = (value - min_v) / spread
+        points.append((round(x0 + rel_time * (width - 1)), round(y0 + (1 - rel_value) * (height - 1))))
+    return points
+
+
+def python_spline(points, steps=10):
+    """The previous per-point Catmull-Rom closure."""
+    def catmull_rom(p0, p1, p2, p3, t):
+        t2 = t * t
+        t3 = t2 * t
+        return tuple(
+            int(0.5 * ((-t3 + 2 * t2 - t) * p0[k] + (3 * t3 - 5 * t2 + 2) * p1[k]
+                       + (-3 * t3 + 4 * t2 + t) * p2[k] + (t3 - t2) * p3[k]))
+            for k in (0, 1)
+        )
+
+    coords = [points[0]]
+    for i in range(len(points) - 3):
+        coords += [catmull_rom(*points[i:i + 4], j / steps) for j in range(steps)]
+    coords.append(points[-1])
+    return coords
+
+
+def bench(name, func):
+    """Time a function and print the mean duration per call."""
+    seconds = timeit.timeit(func, number=REPEAT) / REPEAT
+    print(f"{name:<36} {seconds * 1e3:10.2f} ms")
+
+
+def main():
+    hass = MagicMock()
+    config_dir = tempfile.mkdtemp()
+    hass.config.path = lambda *args: os.path.join(config_dir, *args)
+    generator = ImageGen(hass)
+
+    for count in SIZES:
+        start, end, timestamps, values = make_series(count)
+        duration = end - start
+        min_v, max_v = min(values), max(values)
+        spread = max_v - min_v
+        print(f"{count} points")
+
+        bench("  transform (per point)", lambda: python_transform(timestamps, values, start, duration, min_v, spread))
+        bench("  transform (numpy)", lambda: to_screen(
+            np.frombuffer(timestamps), np.frombuffer(values), start.timestamp(),
+            duration.total_seconds(), min_v, spread, BOX))
+
+        points = python_transform(timestamps, values, start, duration, min_v, spread)
+        bench("  smooth (per point)", lambda: python_spline(points))
+        bench("  smooth (numpy)", lambda: catmull_rom_spline(np.array(points), 10))
+
+        for method in ("none", "minmax", "lttb"):
+            for smooth in (False, True):
+                element = {
+                    "type": "plot",
+                    "data": [{"entity": "sensor.power", "downsample": method, "smooth": smooth}],
+                    "_start": start,
+                    "_end": end,
+                    "_series": {"sensor.power": (timestamps, values)},
+                    "_statistics": {},
+                }
+                label = f"  element ({method}{', smooth' if smooth else ''})"
+                bench(label, lambda: generator._draw_plot(Image.new("RGBA", (296, 128), "white"), element, 0))
+
+
+if __name__ == "__main__":
+    main()
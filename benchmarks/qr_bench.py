@@ -0,0 +1,68 @@
+"""Benchmark for QR code rendering.
+
+Compares building a QR code from scratch as before, with the version
+search starting at 1, with render_qr_code when its cache is cold (version
+search starting at the estimate) and warm, for typical URL lengths. Run
+from the repository root:
+
+    python benchmarks/qr_bench.py
+"""
+import os
+import sys
+import timeit
+
+import qrcode
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "custom_components"))
+
+from open_epaper_link.qr_code import render_qr_code  # noqa: E402
+
+URL_LENGTHS = [25, 60, 120, 250]
+ERROR_CORRECTION = qrcode.constants.ERROR_CORRECT_H
+REPEAT = 5
+
+
+def make_url(length):
+    """Create a product URL of the given length."""
+    base = "https://shop.example.com/p/"
+    return (base + "0123456789abcdef" * (length // 16 + 1))[:length]
+
+
+def uncached(data):
+    """Build a QR code like before, searching the version from 1."""
+    qr = qrcode.QRCode(version=1, error_correction=ERROR_CORRECTION, box_size=2, border=1)
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr.make_image(fill_color=(0, 0, 0), back_color=(255, 255, 255)).convert("RGBA")
+
+
+def cold(data):
+    """Render with an empty cache."""
+    render_qr_code.cache_clear()
+    return render_qr_code(data, ERROR_CORRECTION, 2, 1, (0, 0, 0), (255, 255, 255))
+
+
+def warm(data):
+    """Render with the bitmap already cached."""
+    return render_qr_code(data, ERROR_CORRECTION, 2, 1, (0, 0, 0), (255, 255, 255))
+
+
+def bench(name, func):
+    """Time a function and print the mean duration per call."""
+    seconds = timeit.timeit(func, number=REPEAT) / REPEAT
+    print(f"{name:<28} {seconds * 1e3:10.3f} ms")
+
+
+def main():
+    for length in URL_LENGTHS:
+        data = make_url(length)
+        assert uncached(data).convert("RGB").tobytes() == cold(data).tobytes()
+        print(f"{length} characters")
+        bench("  uncached (search from 1)", lambda: uncached(data))
+        bench("  cold cache (estimated)", lambda: cold(data))
+        warm(data)
+        bench("  warm cache", lambda: warm(data))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark for stamping repeated primitives.
+
+Compares drawing every cell of a rectangle pattern and every line of a
+debug grid with ImageDraw against rasterizing them once and pasting the
+tile. Run from the repository root:
+
+    python benchmarks/stamp_bench.py
+"""
+import os
+import sys
+import timeit
+
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "custom_components"))
+
+from open_epaper_link.stamp import make_stamp  # noqa: E402
+
+CANVAS = (800, 480)
+REPEAT = 10
+
+
+def new_canvas():
+    """Create a white palette canvas with black and red."""
+    img = Image.new("P", CANVAS, 0)
+    img.putpalette([255, 255, 255, 0, 0, 0, 255, 0, 0])
+    return img
+
+
+def draw_cell(draw, ink, x, y):
+    """Draw one rounded pattern cell."""
+    draw.rounded_rectangle([(x, y), (x + 14, y + 14)], radius=4, fill=ink((255, 0, 0)), outline=ink((0, 0, 0)), width=2)
+
+
+CELLS = [(x, y) for x in range(0, CANVAS[0], 20) for y in range(0, CANVAS[1], 20)]
+
+
+def pattern_direct():
+    img = new_canvas()
+    draw = ImageDraw.Draw(img)
+    for x, y in CELLS:
+        draw_cell(draw, lambda color: color, x, y)
+    return img
+
+
+def pattern_stamped():
+    img = new_canvas()
+    make_stamp(img, (-3, -3, 18, 18), draw_cell).paste_all(img, CELLS)
+    return img
+
+
+def grid_direct():
+    img = new_canvas()
+    draw = ImageDraw.Draw(img)
+    width, height = CANVAS
+    for y in range(0, height, 10):
+        draw.line([(0, y), (width, y)], fill=(0, 0, 0), width=1)
+    for x in range(0, width, 10):
+        draw.line([(x, 0), (x, height)], fill=(0, 0, 0), width=1)
+    return img
+
+
+def grid_stamped():
+    img = new_canvas()
+    width, height = CANVAS
+    horizontal = make_stamp(img, (-1, -1, width + 2, 2), lambda draw, ink, x, y: draw.line(
+        [(x, y), (x + width, y)], fill=ink((0, 0, 0)), width=1))
+    vertical = make_stamp(img, (-1, -1, 2, height + 2), lambda draw, ink, x, y: draw.line(
+        [(x, y), (x, y + height)], fill=ink((0, 0, 0)), width=1))
+    horizontal.paste_all(img, [(0, y) for y in range(0, height, 10)])
+    vertical.paste_all(img, [(x, 0) for x in range(0, width, 10)])
+    return img
+
+
+def bench(name, func):
+    """Time a function and print the mean duration per call."""
+    seconds = timeit.timeit(func, number=REPEAT) / REPEAT
+    print(f"{name:<28} {seconds * 1e3:10.3f} ms")
+
+
+def main():
+    assert pattern_direct().tobytes() == pattern_stamped().tobytes()
+    assert grid_direct().tobytes() == grid_stamped().tobytes()
+    print(f"rectangle pattern, {len(CELLS)} cells")
+    bench("  direct", pattern_direct)
+    bench("  stamped", pattern_stamped)
+    print("debug grid, 10px spacing")
+    bench("  direct", grid_direct)
+    bench("  stamped", grid_stamped)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Micro-benchmark for text truncation and wrapping.
+
+Compares the text_layout helpers with the previous one-step-at-a-time
+implementations. Run from the repository root:
+
+    python benchmarks/text_layout_bench.py
+"""
+import os
+import sys
+import timeit
+
+from PIL import ImageFont
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "custom_components"))
+
+from open_epaper_link.text_layout import clear_text_length_cache, truncate_text, wrap_lines  # noqa: E402
+
+FONT_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         "custom_components", "open_epaper_link", "ppb.ttf")
+TEXT = ("The quick brown fox jumps over the lazy dog while the living room "
+        "temperature stays at 21.5 degrees and the forecast promises rain ") * 2
+REPEAT = 5
+
+
+def naive_truncate(font, text, max_width):
+    """Remove one character at a time until the text fits."""
+    if font.getlength(text, "1") <= max_width:
+        return text
+    truncated = text
+    while truncated and font.getlength(truncated + "...", "1") > max_width:
+        truncated = truncated[:-1]
+    return truncated + "..."
+
+
+def naive_wrap(font, text, max_width):
+    """Measure every candidate line while wrapping."""
+    lines = []
+    current_line = []
+    for word in text.split():
+        test_line = " ".join(current_line + [word])
+        if not current_line or font.getlength(test_line, "1") <= max_width:
+            current_line.append(word)
+        else:
+            lines.append(" ".join(current_line))
+            current_line = [word]
+    if current_line:
+        lines.append(" ".join(current_line))
+    return lines
+
+
+def bench(name, func):
+    """Time a function and print the mean duration per call."""
+    seconds = timeit.timeit(func, number=REPEAT) / REPEAT
+    print(f"{name:<32} {seconds * 1e6:10.1f} us")
+
+
+def main():
+    font = ImageFont.truetype(FONT_FILE, 20)
+    for max_width in (120, 296, 800):
+        print(f"max_width={max_width}, {len(TEXT)} characters")
+        bench("  truncate (naive)", lambda: naive_truncate(font, TEXT, max_width))
+        clear_text_length_cache()
+        bench("  truncate (bisect, cold cache)", lambda: (clear_text_length_cache(), truncate_text(font, TEXT, max_width, mode="1")))
+        bench("  truncate (bisect, warm cache)", lambda: truncate_text(font, TEXT, max_width, mode="1"))
+        bench("  wrap (naive)", lambda: naive_wrap(font, TEXT, max_width))
+        bench("  wrap (estimate, cold cache)", lambda: (clear_text_length_cache(), wrap_lines(font, TEXT, max_width, mode="1")))
+        bench("  wrap (estimate, warm cache)", lambda: wrap_lines(font, TEXT, max_width, mode="1"))
+
+
+if __name__ == "__main__":
+    main()
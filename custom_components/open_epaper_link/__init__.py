@@ -1,5 +1,6 @@
 import logging
 import os
+import shutil
 from typing import Final
 
 from homeassistant.config_entries import ConfigEntry
@@ -7,8 +8,10 @@ from homeassistant.const import Platform, EVENT_HOMEASSISTANT_STARTED
 from homeassistant.core import HomeAssistant
 from .const import DOMAIN
 from .hub import Hub
+from .mdi_index import MDI_INDEX_FILE
 from .tag_registry import TagRegistry
 from .services import async_setup_services, async_unload_services
+from .util import get_image_cache_dir
 _LOGGER: Final = logging.getLogger(__name__)
 
 PLATFORMS = [
@@ -143,6 +146,8 @@ async def async_remove_storage_files(hass: HomeAssistant) -> None:
     1. Tag types file (open_epaper_link_tagtypes.json)
     2. Tag storage file (.storage/open_epaper_link_tags)
     3. Image directory (www/open_epaper_link)
+    4. Downloaded image cache (.storage/open_epaper_link_image_cache)
+    5. MDI icon index (.storage/open_epaper_link.mdi_index)
 
     This prevents orphaned files when the integration is removed
     and ensures a clean reinstallation if needed.
@@ -186,4 +191,22 @@ async def async_remove_storage_files(hass: HomeAssistant) -> None:
             await hass.async_add_executor_job(os.rmdir, image_dir)
             _LOGGER.debug("Removed image directory")
         except OSError as err:
-            _LOGGER.error("Error removing image directory: %s", err)
\ No newline at end of file
+            _LOGGER.error("Error removing image directory: %s", err)
+
+    # Remove downloaded image cache
+    cache_dir = get_image_cache_dir(hass)
+    if await hass.async_add_executor_job(os.path.exists, cache_dir):
+        try:
+            await hass.async_add_executor_job(shutil.rmtree, cache_dir)
+            _LOGGER.debug("Removed image cache directory")
+        except OSError as err:
+            _LOGGER.error("Error removing image cache directory: %s", err)
+
+    # Remove MDI icon index
+    mdi_index_file = os.path.join(storage_dir, MDI_INDEX_FILE)
+    if await hass.async_add_executor_job(os.path.exists, mdi_index_file):
+        try:
+            await hass.async_add_executor_job(os.remove, mdi_index_file)
+            _LOGGER.debug("Removed MDI index file")
+        except OSError as err:
+            _LOGGER.error("Error removing MDI index file: %s", err)
@@ -0,0 +1,140 @@
+"""Cache of decoded and resized dlimg bitmaps for OpenEPaperLink image generation."""
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Hashable
+
+from PIL import Image
+
+_LOGGER = logging.getLogger(__name__)
+
+# Default upper bound for cached pixel data, in bytes
+DEFAULT_BITMAP_CACHE_BYTES = 32 * 1024 * 1024
+
+
+def image_bytes(image: Image.Image) -> int:
+    """Estimate the memory used by the pixel data of an image.
+
+    Args:
+        image: Image to measure
+
+    Returns:
+        int: Width times height times bytes per pixel
+    """
+    return image.width * image.height * len(image.getbands())
+
+
+class BitmapCache:
+    """Memory-bounded LRU cache of processed dlimg bitmaps.
+
+    Decoding, rotating and resizing an image is by far the most expensive
+    part of drawing a dlimg element, and dashboards show the same image
+    at the same size on every refresh and often on several tags. The
+    cache keeps the final RGBA tile per source and target geometry.
+
+    Cached images are shared between renders and must not be modified.
+    The cache is used from the render worker threads, so all access is
+    serialized by a lock.
+
+    Attributes:
+        max_bytes: Maximum pixel data kept, in bytes
+        hits: Lookups answered from the cache
+        misses: Lookups that had to process the image
+        evictions: Tiles dropped to stay within max_bytes
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_BITMAP_CACHE_BYTES):
+        """Initialize the bitmap cache.
+
+        Args:
+            max_bytes: Maximum pixel data kept, in bytes
+        """
+        self.max_bytes = max_bytes
+        self._tiles: OrderedDict[Hashable, Image.Image] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def stats(self) -> dict:
+        """Get cache statistics.
+
+        Returns:
+            dict: Hit/miss/eviction counters, hit rate and cache size
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "tiles": len(self._tiles),
+                "bytes": self._size,
+            }
+
+    def get(self, key: Hashable) -> Image.Image | None:
+        """Look up a tile and mark it as recently used.
+
+        Args:
+            key: Tile key
+
+        Returns:
+            Image: The cached tile, or None if not cached
+        """
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is None:
+                self.misses += 1
+                return None
+            self._tiles.move_to_end(key)
+            self.hits += 1
+            return tile
+
+    def put(self, key: Hashable, tile: Image.Image) -> None:
+        """Store a tile, evicting the least recently used ones over budget.
+
+        Tiles larger than the whole budget are not cached.
+
+        Args:
+            key: Tile key
+            tile: Processed image, not modified afterwards
+        """
+        size = image_bytes(tile)
+        with self._lock:
+            previous = self._tiles.pop(key, None)
+            if previous is not None:
+                self._size -= image_bytes(previous)
+            if size > self.max_bytes:
+                return
+            self._tiles[key] = tile
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._tiles.popitem(last=False)
+                self._size -= image_bytes(evicted)
+                self.evictions += 1
+
+    def discard(self, source: Hashable) -> int:
+        """Drop all tiles of a source, whatever their geometry.
+
+        Args:
+            source: First element of the tile keys to drop
+
+        Returns:
+            int: Number of tiles dropped
+        """
+        with self._lock:
+            keys = [key for key in self._tiles if key[0] == source]
+            for key in keys:
+                self._size -= image_bytes(self._tiles.pop(key))
+            return len(keys)
+
+    def clear(self) -> None:
+        """Drop all cached tiles."""
+        with self._lock:
+            self._tiles.clear()
+            self._size = 0
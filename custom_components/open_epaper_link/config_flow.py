@@ -17,7 +17,19 @@ from homeassistant.helpers.aiohttp_client import async_get_clientsession
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.selector import Selector, TextSelectorType
 
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    DEFAULT_RENDER_WORKERS,
+    DEFAULT_PLOT_STATISTICS_HOURS,
+    DEFAULT_IMAGE_CACHE_TTL,
+    DEFAULT_IMAGE_FETCH_TIMEOUT,
+    DEFAULT_IMAGE_MAX_SIZE_MB,
+    DEFAULT_UPLOAD_MAX_CONCURRENT,
+    DEFAULT_UPLOAD_MAX_PENDING,
+    DEFAULT_UPLOAD_MAX_RATE,
+    DEFAULT_UPLOAD_MIN_HEAP_KB,
+    DEFAULT_UPLOAD_MIN_RATE,
+)
 import logging
 
 _LOGGER: Final = logging.getLogger(__name__)
@@ -206,6 +218,9 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
     - Tag blacklisting to hide unwanted devices
     - Button and NFC debounce intervals to prevent duplicate triggers
     - Custom font directories for the image generation system
+    - Number of worker threads used to render images
+    - Cache TTL, size limit and timeout of downloaded images
+    - Limits of the adaptive image upload throttle
 
     The options flow fetches current tag data from the hub to
     populate the selection fields with accurate information.
@@ -225,6 +240,22 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         self._button_debounce = self.config_entry.options.get("button_debounce", 0.5)
         self._nfc_debounce = self.config_entry.options.get("nfc_debounce", 1.0)
         self._custom_font_dirs = self.config_entry.options.get("custom_font_dirs", "")
+        self._render_workers = self.config_entry.options.get("render_workers", DEFAULT_RENDER_WORKERS)
+        self._plot_statistics_hours = self.config_entry.options.get(
+            "plot_statistics_hours", DEFAULT_PLOT_STATISTICS_HOURS
+        )
+        self._image_cache_ttl = self.config_entry.options.get("image_cache_ttl", DEFAULT_IMAGE_CACHE_TTL)
+        self._image_max_size = self.config_entry.options.get("image_max_size", DEFAULT_IMAGE_MAX_SIZE_MB)
+        self._image_fetch_timeout = self.config_entry.options.get(
+            "image_fetch_timeout", DEFAULT_IMAGE_FETCH_TIMEOUT
+        )
+        self._upload_max_concurrent = self.config_entry.options.get(
+            "upload_max_concurrent", DEFAULT_UPLOAD_MAX_CONCURRENT
+        )
+        self._upload_min_rate = self.config_entry.options.get("upload_min_rate", DEFAULT_UPLOAD_MIN_RATE)
+        self._upload_max_rate = self.config_entry.options.get("upload_max_rate", DEFAULT_UPLOAD_MAX_RATE)
+        self._upload_min_heap = self.config_entry.options.get("upload_min_heap", DEFAULT_UPLOAD_MIN_HEAP_KB)
+        self._upload_max_pending = self.config_entry.options.get("upload_max_pending", DEFAULT_UPLOAD_MAX_PENDING)
 
     async def async_step_init(self, user_input=None):
         """Manage OpenEPaperLink options.
@@ -250,6 +281,24 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                     "button_debounce": user_input.get("button_debounce", 0.5),
                     "nfc_debounce": user_input.get("nfc_debounce", 1.0),
                     "custom_font_dirs": user_input.get("custom_font_dirs", ""),
+                    "render_workers": int(user_input.get("render_workers", DEFAULT_RENDER_WORKERS)),
+                    "plot_statistics_hours": int(
+                        user_input.get("plot_statistics_hours", DEFAULT_PLOT_STATISTICS_HOURS)
+                    ),
+                    "image_cache_ttl": int(user_input.get("image_cache_ttl", DEFAULT_IMAGE_CACHE_TTL)),
+                    "image_max_size": int(user_input.get("image_max_size", DEFAULT_IMAGE_MAX_SIZE_MB)),
+                    "image_fetch_timeout": int(
+                        user_input.get("image_fetch_timeout", DEFAULT_IMAGE_FETCH_TIMEOUT)
+                    ),
+                    "upload_max_concurrent": int(
+                        user_input.get("upload_max_concurrent", DEFAULT_UPLOAD_MAX_CONCURRENT)
+                    ),
+                    "upload_min_rate": int(user_input.get("upload_min_rate", DEFAULT_UPLOAD_MIN_RATE)),
+                    "upload_max_rate": int(user_input.get("upload_max_rate", DEFAULT_UPLOAD_MAX_RATE)),
+                    "upload_min_heap": int(user_input.get("upload_min_heap", DEFAULT_UPLOAD_MIN_HEAP_KB)),
+                    "upload_max_pending": int(
+                        user_input.get("upload_max_pending", DEFAULT_UPLOAD_MAX_PENDING)
+                    ),
                 }
             )
 
@@ -315,5 +364,122 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                         autocomplete="path"
                     )
                 ),
+                vol.Optional(
+                    "render_workers",
+                    default=self._render_workers,
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=1,
+                        max=8,
+                        step=1,
+                        mode=selector.NumberSelectorMode.BOX
+                    )
+                ),
+                vol.Optional(
+                    "plot_statistics_hours",
+                    default=self._plot_statistics_hours,
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=8760,
+                        step=1,
+                        unit_of_measurement="h",
+                        mode=selector.NumberSelectorMode.BOX
+                    )
+                ),
+                vol.Optional(
+                    "image_cache_ttl",
+                    default=self._image_cache_ttl,
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=86400,
+                        step=1,
+                        unit_of_measurement="s",
+                        mode=selector.NumberSelectorMode.BOX
+                    )
+                ),
+                vol.Optional(
+                    "image_max_size",
+                    default=self._image_max_size,
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=1,
+                        max=100,
+                        step=1,
+                        unit_of_measurement="MB",
+                        mode=selector.NumberSelectorMode.BOX
+                    )
+                ),
+                vol.Optional(
+                    "image_fetch_timeout",
+                    default=self._image_fetch_timeout,
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=1,
+                        max=300,
+                        step=1,
+                        unit_of_measurement="s",
+                        mode=selector.NumberSelectorMode.BOX
+                    )
+                ),
+                vol.Optional(
+                    "upload_max_concurrent",
+                    default=self._upload_max_concurrent,
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=1,
+                        max=4,
+                        step=1,
+                        mode=selector.NumberSelectorMode.BOX
+                    )
+                ),
+                vol.Optional(
+                    "upload_min_rate",
+                    default=self._upload_min_rate,
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=1,
+                        max=600,
+                        step=1,
+                        unit_of_measurement="uploads/min",
+                        mode=selector.NumberSelectorMode.BOX
+                    )
+                ),
+                vol.Optional(
+                    "upload_max_rate",
+                    default=self._upload_max_rate,
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=1,
+                        max=600,
+                        step=1,
+                        unit_of_measurement="uploads/min",
+                        mode=selector.NumberSelectorMode.BOX
+                    )
+                ),
+                vol.Optional(
+                    "upload_min_heap",
+                    default=self._upload_min_heap,
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=1024,
+                        step=1,
+                        unit_of_measurement="KiB",
+                        mode=selector.NumberSelectorMode.BOX
+                    )
+                ),
+                vol.Optional(
+                    "upload_max_pending",
+                    default=self._upload_max_pending,
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=1000,
+                        step=1,
+                        mode=selector.NumberSelectorMode.BOX
+                    )
+                ),
             }),
         )
\ No newline at end of file
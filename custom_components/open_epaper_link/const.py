@@ -1,4 +1,41 @@
 DOMAIN = "open_epaper_link"
 SIGNAL_TAG_UPDATE = f"{DOMAIN}_tag_update"
 SIGNAL_TAG_IMAGE_UPDATE = f"{DOMAIN}_tag_image_update"
-SIGNAL_AP_UPDATE = f"{DOMAIN}_ap_update"
\ No newline at end of file
+SIGNAL_AP_UPDATE = f"{DOMAIN}_ap_update"
+
+# Default number of threads used to rasterize drawcustom images
+DEFAULT_RENDER_WORKERS = 2
+
+# Plots spanning at least this many hours are drawn from long-term statistics
+DEFAULT_PLOT_STATISTICS_HOURS = 72
+
+# Seconds a downloaded dlimg image is used before it is revalidated
+DEFAULT_IMAGE_CACHE_TTL = 300
+
+# Largest dlimg image downloaded, in megabytes
+DEFAULT_IMAGE_MAX_SIZE_MB = 10
+
+# Seconds allowed for downloading a dlimg image
+DEFAULT_IMAGE_FETCH_TIMEOUT = 30
+
+# Seconds allowed for connecting to the AP when uploading an image
+UPLOAD_CONNECT_TIMEOUT = 5
+
+# Seconds the AP may stay silent while an upload is answered
+UPLOAD_READ_TIMEOUT = 20
+
+# Seconds allowed for a whole image upload attempt
+UPLOAD_TOTAL_TIMEOUT = 30
+
+# Most image uploads sent to the AP at the same time
+DEFAULT_UPLOAD_MAX_CONCURRENT = 2
+
+# Slowest and fastest upload rate of the adaptive throttle, in uploads per minute
+DEFAULT_UPLOAD_MIN_RATE = 6
+DEFAULT_UPLOAD_MAX_RATE = 120
+
+# Free AP heap below which uploads are slowed down, in KiB
+DEFAULT_UPLOAD_MIN_HEAP_KB = 40
+
+# Tags waiting for an image above which uploads are slowed down
+DEFAULT_UPLOAD_MAX_PENDING = 10
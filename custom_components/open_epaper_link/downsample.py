@@ -0,0 +1,184 @@
+"""Downsampling of plot series for OpenEPaperLink image generation."""
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+Point = tuple[float, float]
+
+# Supported values of the per-series "downsample" option
+DOWNSAMPLE_NONE = "none"
+DOWNSAMPLE_MINMAX = "minmax"
+DOWNSAMPLE_LTTB = "lttb"
+DOWNSAMPLE_METHODS = (DOWNSAMPLE_NONE, DOWNSAMPLE_MINMAX, DOWNSAMPLE_LTTB)
+
+
+def min_max_indices(xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+    """Select at most four points per pixel column.
+
+    Points must be in screen coordinates, ordered by x, with x already
+    rounded to a pixel column. For every column the first, lowest,
+    highest and last point are kept in their original order. A one pixel
+    wide polyline through the result covers the same pixels as one
+    through all points, since within a column it still spans the full
+    value range and enters and leaves at the same points.
+
+    Args:
+        xs: Pixel columns in ascending order
+        ys: Values or screen y coordinates
+
+    Returns:
+        np.ndarray: Ascending indices of the points to keep
+    """
+    count = len(xs)
+    if count == 0:
+        return np.arange(0)
+
+    starts = np.flatnonzero(np.r_[True, xs[1:] != xs[:-1]])
+    ends = np.r_[starts[1:], count] - 1
+    index = np.arange(count)
+
+    # First occurrence of the minimum and maximum within each column
+    column = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, count]))
+    lows = np.minimum.reduceat(ys, starts)
+    highs = np.maximum.reduceat(ys, starts)
+    first_low = np.minimum.reduceat(np.where(ys == lows[column], index, count), starts)
+    first_high = np.minimum.reduceat(np.where(ys == highs[column], index, count), starts)
+
+    selected = np.sort(np.stack([starts, first_low, first_high, ends], axis=1), axis=1)
+    keep = np.ones(selected.shape, dtype=bool)
+    keep[:, 1:] = selected[:, 1:] != selected[:, :-1]
+    return selected[keep]
+
+
+def lttb_indices(xs: np.ndarray, ys: np.ndarray, threshold: int) -> np.ndarray:
+    """Select points with Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last point and picks one point per bucket in
+    between, choosing the one forming the largest triangle with the
+    previously kept point and the average of the next bucket. This keeps
+    the visual shape of the series, including its peaks, with a fixed
+    number of points.
+
+    Args:
+        xs: X coordinates in ascending order
+        ys: Y coordinates
+        threshold: Number of points to keep, at least 3
+
+    Returns:
+        np.ndarray: Ascending indices of the points to keep, or all
+            indices if there are not more than threshold points
+    """
+    count = len(xs)
+    if threshold >= count or threshold < 3:
+        return np.arange(count)
+
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    bucket_size = (count - 2) / (threshold - 2)
+    edges = (np.arange(threshold) * bucket_size).astype(int) + 1
+
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = count - 1
+    for bucket in range(threshold - 2):
+        # Average of the next bucket is the third triangle corner
+        next_start = edges[bucket + 1]
+        next_end = min(edges[bucket + 2], count)
+        avg_x = xs[next_start:next_end].mean()
+        avg_y = ys[next_start:next_end].mean()
+
+        start, end = edges[bucket], edges[bucket + 1]
+        ax, ay = xs[selected[bucket]], ys[selected[bucket]]
+        areas = np.abs((ax - avg_x) * (ys[start:end] - ay) - (ax - xs[start:end]) * (avg_y - ay))
+        selected[bucket + 1] = start + int(np.argmax(areas))
+    return selected
+
+
+def downsample_indices(xs: np.ndarray, ys: np.ndarray, method: str, width: int) -> np.ndarray:
+    """Select the points of a plot series to draw at a given width.
+
+    Series with no more points than the plot is wide are kept whole.
+
+    Args:
+        xs: Screen x coordinates in ascending order
+        ys: Screen y coordinates
+        method: One of DOWNSAMPLE_METHODS
+        width: Width of the plot area in pixels
+
+    Returns:
+        np.ndarray: Ascending indices of the points to draw
+
+    Raises:
+        ValueError: If the method is unknown
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(
+            f"Invalid downsample method '{method}', expected one of {', '.join(DOWNSAMPLE_METHODS)}"
+        )
+    # Series that fit the plot width are drawn as they are
+    if method == DOWNSAMPLE_NONE or len(xs) <= width:
+        return np.arange(len(xs))
+    if method == DOWNSAMPLE_MINMAX:
+        return min_max_indices(xs, ys)
+    # Two points per column keep rising and falling edges apart
+    return lttb_indices(xs, ys, max(3, 2 * width))
+
+
+def _select(points: Sequence[Point], indices: np.ndarray) -> list[Point]:
+    """Pick points by index."""
+    return [points[index] for index in indices.tolist()]
+
+
+def _split(points: Sequence[Point]) -> tuple[np.ndarray, np.ndarray]:
+    """Split points into coordinate arrays."""
+    array = np.asarray(points).reshape(-1, 2)
+    return array[:, 0], array[:, 1]
+
+
+def min_max_per_column(points: Sequence[Point]) -> list[Point]:
+    """Reduce points to at most four per pixel column.
+
+    See min_max_indices.
+
+    Args:
+        points: Screen points ordered by x
+
+    Returns:
+        list: The reduced points, at most 4 per distinct x
+    """
+    return _select(points, min_max_indices(*_split(points)))
+
+
+def lttb(points: Sequence[Point], threshold: int) -> list[Point]:
+    """Downsample points with Largest-Triangle-Three-Buckets.
+
+    See lttb_indices.
+
+    Args:
+        points: Points ordered by x
+        threshold: Number of points to keep, at least 3
+
+    Returns:
+        list: The downsampled points, or all points if there are not more
+            than threshold
+    """
+    return _select(points, lttb_indices(*_split(points), threshold))
+
+
+def downsample(points: Sequence[Point], method: str, width: int) -> list[Point]:
+    """Downsample a plot series to the width it is drawn at.
+
+    Args:
+        points: Screen points ordered by x
+        method: One of DOWNSAMPLE_METHODS
+        width: Width of the plot area in pixels
+
+    Returns:
+        list: The points to draw
+
+    Raises:
+        ValueError: If the method is unknown
+    """
+    return _select(points, downsample_indices(*_split(points), method, width))
@@ -0,0 +1,315 @@
+"""Incremental recorder history cache for OpenEPaperLink plot elements."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime
+from functools import partial
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.history import get_significant_states
+from homeassistant.core import HomeAssistant, State
+
+_LOGGER = logging.getLogger(__name__)
+
+# Default upper bound for cached points over all entities (16 bytes each)
+DEFAULT_HISTORY_CACHE_MAX_POINTS = 500_000
+
+
+class _Series:
+    """Numeric history of one entity, ordered by time.
+
+    Attributes:
+        timestamps: UNIX timestamps of the state changes
+        values: Numeric state values
+        covered_from: Start of the time range fetched from the recorder
+        max_duration: Largest duration requested for this entity
+        recorded: Whether the recorder returned any states for the entity,
+            numeric or not
+    """
+
+    __slots__ = ("timestamps", "values", "covered_from", "max_duration", "recorded")
+
+    def __init__(self, covered_from: float, max_duration: float):
+        self.timestamps = array("d")
+        self.values = array("d")
+        self.covered_from = covered_from
+        self.max_duration = max_duration
+        self.recorded = False
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def append(self, timestamps: list[float], values: list[float]) -> None:
+        """Append points newer than the last cached point.
+
+        Args:
+            timestamps: Timestamps in ascending order
+            values: Values matching timestamps
+        """
+        last = self.timestamps[-1] if self.timestamps else float("-inf")
+        first_new = bisect_right(timestamps, last)
+        self.timestamps.extend(timestamps[first_new:])
+        self.values.extend(values[first_new:])
+
+    def evict_before(self, cutoff: float) -> int:
+        """Drop points older than cutoff.
+
+        The newest point at or before the cutoff is kept, since it holds
+        the state at the start of the window.
+
+        Args:
+            cutoff: Oldest timestamp still needed
+
+        Returns:
+            int: Number of points dropped
+        """
+        drop = bisect_right(self.timestamps, cutoff) - 1
+        if drop <= 0:
+            return 0
+        del self.timestamps[:drop]
+        del self.values[:drop]
+        self.covered_from = max(self.covered_from, cutoff)
+        return drop
+
+
+def _parse_states(states: list) -> tuple[list[float], list[float]]:
+    """Convert a minimal recorder response to numeric points.
+
+    Non-numeric states such as "unavailable" are skipped.
+
+    Args:
+        states: State objects and minimal state dicts for one entity
+
+    Returns:
+        tuple: (timestamps, values) in ascending time order
+    """
+    timestamps = []
+    values = []
+    for state in states:
+        try:
+            if isinstance(state, State):
+                value = float(state.state)
+                timestamp = state.last_changed.timestamp()
+            else:
+                value = float(state["state"])
+                timestamp = datetime.fromisoformat(state["last_changed"]).timestamp()
+        except (ValueError, TypeError, KeyError):
+            continue
+        timestamps.append(timestamp)
+        values.append(value)
+    return timestamps, values
+
+
+def series_since(timestamps: array, values: array, start: float) -> tuple[array, array]:
+    """Get the part of a series from the state at start onwards.
+
+    Args:
+        timestamps: Timestamps in ascending order
+        values: Values matching timestamps
+        start: UNIX timestamp of the window start
+
+    Returns:
+        tuple: (timestamps, values) starting with the newest point at or
+            before start, if any
+    """
+    first = max(0, bisect_right(timestamps, start) - 1)
+    return timestamps[first:], values[first:]
+
+
+class HistoryCache:
+    """Per-entity cache of numeric state history for plots.
+
+    A plot redrawn every few minutes over the same window only needs the
+    state changes recorded since its last render. The cache keeps the
+    history already fetched for each entity in compact arrays, fetches
+    only the tail since the newest cached point and drops points older
+    than the largest duration requested for the entity.
+
+    The total number of cached points is bounded; the least recently used
+    entities are dropped when the limit is exceeded.
+
+    Attributes:
+        hass: Home Assistant instance
+        max_points: Maximum number of points kept over all entities
+        hits: Entities served from the cache with a tail fetch
+        misses: Entities that needed a full fetch
+        evictions: Entities dropped to stay within max_points
+    """
+
+    def __init__(self, hass: HomeAssistant, max_points: int = DEFAULT_HISTORY_CACHE_MAX_POINTS):
+        """Initialize the history cache.
+
+        Args:
+            hass: Home Assistant instance
+            max_points: Maximum number of points kept over all entities
+        """
+        self.hass = hass
+        self.max_points = max_points
+        self._series: OrderedDict[str, _Series] = OrderedDict()
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.fetched_points = 0
+
+    @property
+    def stats(self) -> dict:
+        """Get cache statistics.
+
+        Returns:
+            dict: Hit/miss/eviction counters, hit rate and cache size
+        """
+        requests = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else 0.0,
+            "evictions": self.evictions,
+            "fetched_points": self.fetched_points,
+            "entities": len(self._series),
+            "points": sum(len(series) for series in self._series.values()),
+        }
+
+    def clear(self) -> None:
+        """Drop all cached history."""
+        self._series.clear()
+
+    async def _fetch(self, entity_ids: list[str], start: datetime, include_start_state: bool) -> dict:
+        """Fetch numeric history from the recorder.
+
+        Args:
+            entity_ids: Entities to fetch
+            start: Only state changes after this time are returned
+            include_start_state: Whether to include the state at start
+
+        Returns:
+            dict: Mapping of entity ID to (timestamps, values)
+        """
+        all_states = await get_instance(self.hass).async_add_executor_job(partial(get_significant_states,
+                                                                                  self.hass,
+                                                                                  start_time=start,
+                                                                                  entity_ids=entity_ids,
+                                                                                  include_start_time_state=include_start_state,
+                                                                                  significant_changes_only=False,
+                                                                                  minimal_response=True,
+                                                                                  no_attributes=True
+                                                                                  ))
+        result = {}
+        for entity_id, states in all_states.items():
+            result[entity_id] = _parse_states(states)
+            self.fetched_points += len(result[entity_id][0])
+        return result
+
+    async def async_get(
+            self,
+            entity_ids: list[str],
+            start: datetime,
+            end: datetime
+    ) -> dict[str, tuple[array, array]]:
+        """Get the numeric history of entities since start.
+
+        Entities whose cached window already reaches back to start only
+        fetch the state changes after their own newest cached point, with
+        one query per distinct starting point. Others are fetched in full,
+        including the state at start.
+
+        Args:
+            entity_ids: Entities to get
+            start: Start of the requested window
+            end: End of the requested window, normally now
+
+        Returns:
+            dict: Mapping of entity ID to (timestamps, values) arrays,
+                starting with the state at start. Entities with only
+                non-numeric states (e.g. "unavailable") get empty arrays,
+                entities without recorded history are missing.
+        """
+        entity_ids = list(dict.fromkeys(entity_ids))
+        start_ts = start.timestamp()
+        duration = (end - start).total_seconds()
+
+        async with self._lock:
+            tail_ids = []
+            full_ids = []
+            for entity_id in entity_ids:
+                series = self._series.get(entity_id)
+                if series is not None and series.covered_from <= start_ts:
+                    tail_ids.append(entity_id)
+                else:
+                    full_ids.append(entity_id)
+
+            if full_ids:
+                self.misses += len(full_ids)
+                fetched = await self._fetch(full_ids, start, True)
+                for entity_id in full_ids:
+                    previous = self._series.pop(entity_id, None)
+                    series = _Series(start_ts, max(duration, previous.max_duration if previous else 0))
+                    series.append(*fetched.get(entity_id, ([], [])))
+                    series.recorded = entity_id in fetched
+                    self._series[entity_id] = series
+
+            if tail_ids:
+                self.hits += len(tail_ids)
+                # Each tail starts at its own newest point, so an entity that
+                # has not changed for long does not widen the query of others.
+                # All changes since covered_from were fetched, so the state
+                # kept from before it does not pull the start further back.
+                groups: dict[float, list[str]] = {}
+                for entity_id in tail_ids:
+                    series = self._series[entity_id]
+                    tail_start = max(series.timestamps[-1], series.covered_from) if len(series) else start_ts
+                    groups.setdefault(tail_start, []).append(entity_id)
+                results = await asyncio.gather(*(
+                    self._fetch(ids, datetime.fromtimestamp(tail_start, start.tzinfo), False)
+                    for tail_start, ids in groups.items()
+                ))
+                fetched = {}
+                for group in results:
+                    fetched.update(group)
+                for entity_id in tail_ids:
+                    series = self._series[entity_id]
+                    series.max_duration = max(series.max_duration, duration)
+                    series.append(*fetched.get(entity_id, ([], [])))
+                    series.recorded = series.recorded or entity_id in fetched
+                    self._series.move_to_end(entity_id)
+
+            result = {}
+            for entity_id in entity_ids:
+                series = self._series[entity_id]
+                if len(series) or series.recorded:
+                    result[entity_id] = series_since(series.timestamps, series.values, start_ts)
+
+            # Drop what no plot asked for
+            end_ts = end.timestamp()
+            for series in self._series.values():
+                series.evict_before(end_ts - series.max_duration)
+            self._enforce_limit(set(entity_ids))
+
+        _LOGGER.debug("History cache: %s", self.stats)
+        return result
+
+    def _enforce_limit(self, keep: set[str]) -> None:
+        """Drop least recently used entities until within max_points.
+
+        Args:
+            keep: Entities of the current request, dropped last
+        """
+        total = sum(len(series) for series in self._series.values())
+        for entity_id in list(self._series):
+            if total <= self.max_points:
+                return
+            if entity_id in keep:
+                continue
+            total -= len(self._series.pop(entity_id))
+            self.evictions += 1
+
+        # The current request alone exceeds the limit
+        for entity_id in list(self._series):
+            if total <= self.max_points:
+                return
+            total -= len(self._series.pop(entity_id))
+            self.evictions += 1
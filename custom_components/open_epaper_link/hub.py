@@ -19,9 +19,20 @@ import logging
 
 _LOGGER: Final = logging.getLogger(__name__)
 
-from .const import DOMAIN, SIGNAL_AP_UPDATE, SIGNAL_TAG_IMAGE_UPDATE
+from .const import (
+    DOMAIN,
+    SIGNAL_AP_UPDATE,
+    SIGNAL_TAG_IMAGE_UPDATE,
+    DEFAULT_UPLOAD_MAX_CONCURRENT,
+    DEFAULT_UPLOAD_MAX_PENDING,
+    DEFAULT_UPLOAD_MAX_RATE,
+    DEFAULT_UPLOAD_MIN_HEAP_KB,
+    DEFAULT_UPLOAD_MIN_RATE,
+)
 from .tag_types import get_tag_types_manager, get_hw_string
 from .tag_registry import TagRegistry
+from .imagegen import ImageGen
+from .upload_throttle import AdaptiveThrottle
 
 STORAGE_VERSION = 1
 STORAGE_KEY = f"{DOMAIN}_tags"
@@ -107,6 +118,14 @@ class Hub:
         self._tag_registry = tag_registry
         self._update_debounce_interval()
 
+        # Long-lived image generator so its render pool and caches are reused
+        self.image_gen = ImageGen(hass, entry)
+
+        # Adapts the upload rate to the AP's load, shown by the upload rate sensor
+        self.upload_throttle = AdaptiveThrottle()
+        self.upload_throttle.add_listener(lambda: async_dispatcher_send(hass, SIGNAL_AP_UPDATE))
+        self._update_upload_limits()
+
     def _update_debounce_interval(self) -> None:
         """Update event debounce intervals from integration options.
 
@@ -122,6 +141,17 @@ class Hub:
         self._button_debounce_interval = timedelta(seconds=button_debounce_seconds)
         self._nfc_debounce_interval = timedelta(seconds=nfc_debounce_seconds)
 
+    def _update_upload_limits(self) -> None:
+        """Update the limits of the upload throttle from integration options."""
+        options = self.entry.options
+        self.upload_throttle.configure(
+            min_rate=options.get("upload_min_rate", DEFAULT_UPLOAD_MIN_RATE),
+            max_rate=options.get("upload_max_rate", DEFAULT_UPLOAD_MAX_RATE),
+            max_concurrent=int(options.get("upload_max_concurrent", DEFAULT_UPLOAD_MAX_CONCURRENT)),
+            min_heap=options.get("upload_min_heap", DEFAULT_UPLOAD_MIN_HEAP_KB) * 1024,
+            max_pending=options.get("upload_max_pending", DEFAULT_UPLOAD_MAX_PENDING),
+        )
+
     async def async_reload_config(self) -> None:
         """Reload configuration from config entry.
 
@@ -129,12 +159,16 @@ class Hub:
 
         - Reloads the tag blacklist
         - Updates debounce intervals for buttons and NFC
+        - Applies image generator options such as the render worker count
+        - Updates the limits of the upload throttle
 
         This is called when the integration options are updated through
         the configuration flow.
         """
         await self.async_reload_blacklist()
         self._update_debounce_interval()
+        self._update_upload_limits()
+        await self.image_gen.async_reload_config()
 
     async def async_setup_initial(self) -> bool:
         """Set up hub without establishing a WebSocket connection.
@@ -258,6 +292,7 @@ class Hub:
         - Sets shutdown flag to prevent new connection attempts
         - Cancels any active WebSocket connection task
         - Removes event listeners and callbacks
+        - Stops the image render worker pool
         - Updates connection status for dependent entities
 
         This should be called when unloading the integration.
@@ -283,6 +318,8 @@ class Hub:
             except Exception as err:
                 _LOGGER.debug("Error cleaning up callback: %s", err)
 
+        await self.image_gen.async_shutdown()
+
         # Mark as offline
         self.online = False
         async_dispatcher_send(self.hass, f"{DOMAIN}_connection_status", False)
@@ -469,7 +506,9 @@ class Hub:
         - Runtime information
 
         This method is called when the AP sends a "sys" WebSocket message,
-        which typically happens periodically or after state changes.
+        which typically happens periodically or after state changes. The
+        upload throttle is told about the AP's load, including the number
+        of tags with a pending image.
 
         Args:
             sys_data: Dictionary containing AP system status information
@@ -501,6 +540,9 @@ class Hub:
         if "recordcount" in sys_data:
             self._track_record_count_changes(sys_data.get("recordcount", 0))
 
+        pending_tags = sum(1 for tag_data in self._data.values() if tag_data.get("pending"))
+        self.upload_throttle.observe(self._ap_data, pending_tags)
+
         async_dispatcher_send(self.hass, SIGNAL_AP_UPDATE)
 
     @callback
@@ -1280,11 +1322,12 @@ class Hub:
         - System metrics (heap, database size)
         - Operational state (uptime, run state)
         - Tag statistics (record count, low battery count)
+        - Image upload rate set by the upload throttle
 
         Returns:
             dict: Copy of the current AP status dictionary
         """
-        return self._ap_data.copy()
+        return {**self._ap_data, "upload_rate": self.upload_throttle.rate}
 
     async def async_update_ap_config(self) -> None:
         """Force an update of AP configuration from the AP.
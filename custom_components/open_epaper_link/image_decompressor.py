@@ -193,6 +193,199 @@ def decode_g5(data: bytes, expected: int) -> bytes:
     return bytes(out)
 
 
+# Codecs supported by encode_esl_raw
+ESL_CODECS = ("zlib", "g5", "raw")
+
+# Longest run and literal a single G5 command can describe
+G5_MAX_REPEAT = 16
+G5_MAX_LITERAL = 128
+
+
+def encode_g5(rows: bytes) -> bytes:
+    """Encode row data with the run-length "G5" scheme.
+
+    The inverse of decode_g5. Runs of at least two 0x00 or 0xFF bytes
+    become repeat commands, everything else is stored as literals.
+
+    Args:
+        rows: Uncompressed row data
+
+    Returns:
+        bytes: Compressed row data without the 6-byte header
+    """
+    out = bytearray()
+    literal = bytearray()
+
+    def flush_literal():
+        for start in range(0, len(literal), G5_MAX_LITERAL):
+            chunk = literal[start:start + G5_MAX_LITERAL]
+            out.append(len(chunk) - 1)
+            out.extend(chunk)
+        literal.clear()
+
+    i = 0
+    while i < len(rows):
+        value = rows[i]
+        run = 1
+        if value in (0x00, 0xFF):
+            while (i + run < len(rows) and rows[i + run] == value
+                   and run < G5_MAX_REPEAT):
+                run += 1
+        if run >= 2:
+            flush_literal()
+            out.append(0x80 | (0x40 if value == 0xFF else 0x00) | (run - 1))
+        else:
+            literal.append(value)
+        i += run
+    flush_literal()
+    return bytes(out)
+
+
+def _looks_like_zlib(header: bytes) -> bool:
+    """Check whether a block would be mistaken for zlib data by the decoder.
+
+    Args:
+        header: First bytes of an uncompressed or G5 block
+
+    Returns:
+        bool: True if decode_esl_raw would treat the block as zlib
+    """
+    return header[0] == 0x78 and header[1] in (0x01, 0x9C, 0xDA)
+
+
+def image_to_planes(img: Image.Image, tag_type: TagType) -> bytes:
+    """Convert a rendered image to the tag's native plane data.
+
+    The inverse of to_image: the image is rotated back to the
+    orientation of the display buffer and every pixel is mapped to the
+    nearest color of the tag's color table, without dithering.
+
+    Args:
+        img: Image as shown on the display, tag width x height
+        tag_type: TagType object with display specifications
+
+    Returns:
+        bytes: Plane data in the layout returned by decode_esl_raw
+
+    Raises:
+        ValueError: If the image size does not match the tag
+    """
+    if img.size != (tag_type.width, tag_type.height):
+        raise ValueError(
+            f"Image size {img.size} does not match tag size "
+            f"{(tag_type.width, tag_type.height)}"
+        )
+
+    # Undo the rotation applied by to_image
+    if tag_type.rotatebuffer == 1:
+        img = img.transpose(Image.Transpose.ROTATE_90)
+    elif tag_type.rotatebuffer == 2:
+        img = img.transpose(Image.Transpose.ROTATE_180)
+    elif tag_type.rotatebuffer == 3:
+        img = img.transpose(Image.Transpose.ROTATE_270)
+
+    color_table = {k: tuple(v) for k, v in tag_type.color_table.items()}
+    if tag_type.bpp <= 2:
+        colors = [color_table['white'], color_table['black']]
+        if tag_type.bpp == 2:
+            color_key = next((k for k in color_table.keys()
+                              if k not in ['black', 'white']), 'white')
+            colors.append(color_table[color_key])
+    else:
+        colors = list(color_table.values())[:1 << tag_type.bpp]
+
+    palette = Image.new('P', (1, 1))
+    palette.putpalette([channel for color in colors for channel in color])
+    indexed = img.convert('RGB').quantize(palette=palette, dither=Image.Dither.NONE)
+
+    if tag_type.bpp == 4:
+        return indexed.tobytes('raw', 'P;4')
+    if tag_type.bpp > 2:
+        raise ValueError(f"Unsupported bit depth for encoding: {tag_type.bpp}")
+
+    indices = Image.frombytes('L', indexed.size, indexed.tobytes())
+    planes = indices.point([255 if v == 1 else 0 for v in range(256)], '1').tobytes()
+    if tag_type.bpp == 2:
+        planes += indices.point([255 if v == 2 else 0 for v in range(256)], '1').tobytes()
+    return planes
+
+
+def encode_esl_raw(
+        img: Image.Image,
+        tag_type: TagType,
+        codec: str = "zlib",
+        rows_per_block: int | None = None
+) -> bytes:
+    """Encode a rendered image as an OpenEPaperLink raw file.
+
+    The inverse of decode_esl_raw. Every plane is split into blocks of
+    rows_per_block rows, each starting with the ``<HHBB`` header and
+    prefixed with its 4-byte little-endian length. The length of the
+    result is the number of bytes the AP stores and transfers to the tag.
+
+    Uncompressed and G5 blocks are not marked as such, so the block before
+    one whose header would look like a zlib stream is shortened by one row.
+    If that is not possible because the blocks are a single row, the block
+    is stored with zlib instead.
+
+    Args:
+        img: Image as shown on the display, tag width x height
+        tag_type: TagType object with display specifications
+        codec: "zlib", "g5" or "raw" (uncompressed)
+        rows_per_block: Rows per block, defaults to the full height
+
+    Returns:
+        bytes: Size-prefixed block stream
+
+    Raises:
+        ValueError: If the codec is unknown or the image does not fit the tag
+    """
+    if codec not in ESL_CODECS:
+        raise ValueError(f"Unknown codec '{codec}', expected one of {ESL_CODECS}")
+
+    data = image_to_planes(img, tag_type)
+
+    width = tag_type.height if tag_type.rotatebuffer % 2 else tag_type.width
+    height = tag_type.width if tag_type.rotatebuffer % 2 else tag_type.height
+    if tag_type.bpp <= 2:
+        bytes_per_row = (width + 7) // 8
+        plane_count = tag_type.bpp
+    else:
+        bytes_per_row = (width * tag_type.bpp + 7) // 8
+        plane_count = 1
+    plane_size = bytes_per_row * height
+    rows_per_block = max(1, min(rows_per_block or height, height))
+
+    out = bytearray()
+    for plane in range(plane_count):
+        plane_data = data[plane * plane_size:(plane + 1) * plane_size]
+        y0 = 0
+        while y0 < height:
+            nrows = min(rows_per_block, height - y0)
+            next_header = struct.pack("<H", y0 + nrows)
+            if (codec != "zlib" and nrows > 1 and y0 + nrows < height
+                    and _looks_like_zlib(next_header)):
+                nrows -= 1
+            rows = plane_data[y0 * bytes_per_row:(y0 + nrows) * bytes_per_row]
+
+            block_codec = codec
+            if codec != "zlib" and _looks_like_zlib(struct.pack("<H", y0)):
+                block_codec = "zlib"
+
+            fmt = 0x01 if block_codec == "g5" else 0x00
+            header = struct.pack("<HHBB", y0, nrows, fmt, plane)
+            if block_codec == "zlib":
+                payload = zlib.compress(header + rows, 9)
+            elif block_codec == "g5":
+                payload = header + encode_g5(rows)
+            else:
+                payload = header + rows
+
+            out += len(payload).to_bytes(4, "little") + payload
+            y0 += nrows
+    return bytes(out)
+
+
 def to_image(raw_data: bytes, tag_type: TagType) -> bytes:
     """Convert decoded ESL raw data to JPEG image.
 
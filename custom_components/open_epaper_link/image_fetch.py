@@ -0,0 +1,359 @@
+"""Cached HTTP image downloads for OpenEPaperLink dlimg elements."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import DEFAULT_IMAGE_CACHE_TTL, DEFAULT_IMAGE_FETCH_TIMEOUT, DEFAULT_IMAGE_MAX_SIZE_MB
+
+_LOGGER = logging.getLogger(__name__)
+
+# Bytes of image bodies kept in memory
+DEFAULT_IMAGE_CACHE_MEMORY = 16 * 1024 * 1024
+
+# Bytes of image bodies kept on disk
+DEFAULT_IMAGE_CACHE_DISK = 64 * 1024 * 1024
+
+
+@dataclass
+class CachedImage:
+    """A downloaded image body with its validators.
+
+    Attributes:
+        data: Response body
+        etag: ETag response header, if any
+        last_modified: Last-Modified response header, if any
+        fetched_at: UNIX time the body was last confirmed by the server
+    """
+
+    data: bytes
+    etag: str | None = None
+    last_modified: str | None = None
+    fetched_at: float = 0.0
+
+    def validators(self) -> dict[str, str]:
+        """Get the headers of a conditional request for this body.
+
+        Returns:
+            dict: If-None-Match and/or If-Modified-Since headers
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ImageFetcher:
+    """Download images over HTTP with a memory and disk cache.
+
+    Dashboards often show the same weather radar or album art on many
+    tags, and refresh it more often than it changes. Downloads use Home
+    Assistant's shared client session, so connections are reused, and
+    bodies are cached by URL in memory (least recently used first out)
+    and on disk, where they survive restarts.
+
+    A cached body younger than the TTL is used as is. Older ones are
+    revalidated with If-None-Match/If-Modified-Since, so an unchanged
+    image costs a 304 response instead of the whole body. If the server
+    cannot be reached, the cached body is used.
+
+    Attributes:
+        hass: Home Assistant instance
+        cache_dir: Directory of the disk cache, or None to disable it
+        memory_budget: Maximum bytes of bodies kept in memory
+        disk_budget: Maximum bytes of bodies kept on disk
+    """
+
+    def __init__(
+            self,
+            hass: HomeAssistant,
+            cache_dir: str | None = None,
+            memory_budget: int = DEFAULT_IMAGE_CACHE_MEMORY,
+            disk_budget: int = DEFAULT_IMAGE_CACHE_DISK
+    ):
+        """Initialize the image fetcher.
+
+        Args:
+            hass: Home Assistant instance
+            cache_dir: Directory of the disk cache, or None to disable it
+            memory_budget: Maximum bytes of bodies kept in memory
+            disk_budget: Maximum bytes of bodies kept on disk
+        """
+        self.hass = hass
+        self.cache_dir = cache_dir
+        self.memory_budget = memory_budget
+        self.disk_budget = disk_budget
+        self._memory: OrderedDict[str, CachedImage] = OrderedDict()
+        self._memory_size = 0
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self.requests = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.not_modified = 0
+        self.downloads = 0
+        self.stale_served = 0
+        self.bytes_downloaded = 0
+        self.bytes_saved = 0
+
+    @property
+    def stats(self) -> dict:
+        """Get cache and bandwidth statistics.
+
+        Hits are requests answered without downloading the body, either
+        from a fresh cache entry or by a 304 response.
+
+        Returns:
+            dict: Request, hit and download counters, hit rate, bytes
+                downloaded and bytes saved by the cache
+        """
+        hits = self.memory_hits + self.disk_hits + self.not_modified
+        return {
+            "requests": self.requests,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "not_modified": self.not_modified,
+            "downloads": self.downloads,
+            "stale_served": self.stale_served,
+            "hit_rate": hits / self.requests if self.requests else 0.0,
+            "bytes_downloaded": self.bytes_downloaded,
+            "bytes_saved": self.bytes_saved,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_size,
+        }
+
+    def clear(self) -> None:
+        """Drop all images cached in memory."""
+        self._memory.clear()
+        self._memory_size = 0
+
+    async def async_fetch(
+            self,
+            url: str,
+            ttl: float = DEFAULT_IMAGE_CACHE_TTL,
+            max_size: int = DEFAULT_IMAGE_MAX_SIZE_MB * 1024 * 1024,
+            timeout: float = DEFAULT_IMAGE_FETCH_TIMEOUT
+    ) -> bytes:
+        """Get the body of an image URL.
+
+        Concurrent requests for the same URL share one download.
+
+        Args:
+            url: HTTP(S) URL of the image
+            ttl: Seconds a cached body is used without revalidation; 0
+                revalidates on every request
+            max_size: Largest body accepted, in bytes
+            timeout: Seconds allowed for the whole download
+
+        Returns:
+            bytes: The image body
+
+        Raises:
+            HomeAssistantError: If the image cannot be downloaded and is
+                not cached
+        """
+        task = self._in_flight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._async_fetch(url, ttl, max_size, timeout))
+            self._in_flight[url] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(url, None))
+        return await asyncio.shield(task)
+
+    async def _async_fetch(self, url: str, ttl: float, max_size: int, timeout: float) -> bytes:
+        """Get the body of an image URL, see async_fetch."""
+        self.requests += 1
+        key = hashlib.sha256(url.encode()).hexdigest()
+
+        cached = self._memory.get(key)
+        from_disk = False
+        if cached is not None:
+            self._memory.move_to_end(key)
+        elif self.cache_dir:
+            cached = await self.hass.async_add_executor_job(self._read_disk, key)
+            from_disk = cached is not None
+
+        if cached is not None and time.time() - cached.fetched_at < ttl:
+            if from_disk:
+                self.disk_hits += 1
+                self._remember(key, cached)
+            else:
+                self.memory_hits += 1
+            self.bytes_saved += len(cached.data)
+            return cached.data
+
+        headers = cached.validators() if cached is not None else {}
+        try:
+            session = async_get_clientsession(self.hass)
+            async with session.get(
+                    url,
+                    headers=headers,
+                    timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                if response.status == 304 and cached is not None:
+                    self.not_modified += 1
+                    self.bytes_saved += len(cached.data)
+                    cached.fetched_at = time.time()
+                    self._remember(key, cached)
+                    await self._async_write_disk(key, cached, write_data=False)
+                    return cached.data
+
+                if response.status != 200:
+                    raise HomeAssistantError(f"Failed to download image: HTTP {response.status}")
+
+                if response.content_length is not None and response.content_length > max_size:
+                    raise HomeAssistantError(
+                        f"Image too large: {response.content_length} bytes exceeds the limit of {max_size}"
+                    )
+                data = await self._read_body(response, max_size)
+                entry = CachedImage(
+                    data,
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    time.time(),
+                )
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            if cached is None:
+                raise HomeAssistantError(f"Failed to download image: {err or 'timeout'}") from err
+            _LOGGER.warning("Using cached copy of %s, download failed: %s", url, err or "timeout")
+            self.stale_served += 1
+            self.bytes_saved += len(cached.data)
+            return cached.data
+
+        self.downloads += 1
+        self.bytes_downloaded += len(data)
+        self._remember(key, entry)
+        await self._async_write_disk(key, entry)
+        _LOGGER.debug("Image fetcher: %s", self.stats)
+        return data
+
+    @staticmethod
+    async def _read_body(response: aiohttp.ClientResponse, max_size: int) -> bytes:
+        """Read a response body, aborting once it exceeds max_size.
+
+        Args:
+            response: Response to read
+            max_size: Largest body accepted, in bytes
+
+        Returns:
+            bytes: The body
+
+        Raises:
+            HomeAssistantError: If the body is larger than max_size
+        """
+        body = bytearray()
+        async for chunk in response.content.iter_chunked(64 * 1024):
+            body += chunk
+            if len(body) > max_size:
+                raise HomeAssistantError(f"Image too large: exceeds the limit of {max_size} bytes")
+        return bytes(body)
+
+    def _remember(self, key: str, entry: CachedImage) -> None:
+        """Store an entry in the memory cache and enforce its budget.
+
+        Args:
+            key: Cache key of the URL
+            entry: Entry to store
+        """
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_size -= len(previous.data)
+        if len(entry.data) > self.memory_budget:
+            return
+        self._memory[key] = entry
+        self._memory_size += len(entry.data)
+        while self._memory_size > self.memory_budget:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted.data)
+
+    def _read_disk(self, key: str) -> CachedImage | None:
+        """Load an entry from the disk cache.
+
+        Runs in an executor thread.
+
+        Args:
+            key: Cache key of the URL
+
+        Returns:
+            CachedImage: The entry, or None if not cached or unreadable
+        """
+        path = os.path.join(self.cache_dir, key)
+        try:
+            with open(f"{path}.json", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(f"{path}.bin", "rb") as f:
+                data = f.read()
+        except (OSError, ValueError):
+            return None
+        return CachedImage(data, meta.get("etag"), meta.get("last_modified"), meta.get("fetched_at", 0.0))
+
+    async def _async_write_disk(self, key: str, entry: CachedImage, write_data: bool = True) -> None:
+        """Store an entry in the disk cache.
+
+        Args:
+            key: Cache key of the URL
+            entry: Entry to store
+            write_data: Whether the body changed, or only its metadata
+        """
+        if not self.cache_dir:
+            return
+        try:
+            await self.hass.async_add_executor_job(self._write_disk, key, entry, write_data)
+        except OSError as err:
+            _LOGGER.warning("Could not write image cache: %s", err)
+
+    def _write_disk(self, key: str, entry: CachedImage, write_data: bool) -> None:
+        """Store an entry in the disk cache and enforce its budget.
+
+        Runs in an executor thread. Files are replaced atomically so a
+        concurrent reader never sees a partial body.
+
+        Args:
+            key: Cache key of the URL
+            entry: Entry to store
+            write_data: Whether the body changed, or only its metadata
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = os.path.join(self.cache_dir, key)
+        if write_data:
+            with open(f"{path}.bin.tmp", "wb") as f:
+                f.write(entry.data)
+            os.replace(f"{path}.bin.tmp", f"{path}.bin")
+        meta = {"etag": entry.etag, "last_modified": entry.last_modified, "fetched_at": entry.fetched_at}
+        with open(f"{path}.json.tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(f"{path}.json.tmp", f"{path}.json")
+        if write_data:
+            self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        """Delete the least recently written bodies above the disk budget."""
+        bodies = []
+        total = 0
+        with os.scandir(self.cache_dir) as entries:
+            for item in entries:
+                if item.name.endswith(".bin"):
+                    stat = item.stat()
+                    bodies.append((stat.st_mtime, stat.st_size, item.path))
+                    total += stat.st_size
+        for _, size, path in sorted(bodies):
+            if total <= self.disk_budget:
+                break
+            for suffix in (".bin", ".json"):
+                try:
+                    os.remove(path[:-4] + suffix)
+                except OSError:
+                    pass
+            total -= size
@@ -1,33 +1,57 @@
 from __future__ import annotations
+import hashlib
 import io
 import logging
 import os
 import math
 import json
 import re
+import threading
 import urllib
+import asyncio
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter, OrderedDict
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional, Dict, Any, List, Tuple
+from types import MappingProxyType
+from typing import Optional, Dict, Any, List, Mapping, Tuple
 from functools import partial
 
-import requests
+import numpy as np
 import qrcode
 import base64
 
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.network import get_url
-from .const import DOMAIN, SIGNAL_TAG_IMAGE_UPDATE
+from .const import (
+    DOMAIN,
+    SIGNAL_TAG_IMAGE_UPDATE,
+    DEFAULT_RENDER_WORKERS,
+    DEFAULT_PLOT_STATISTICS_HOURS,
+    DEFAULT_IMAGE_CACHE_TTL,
+    DEFAULT_IMAGE_FETCH_TIMEOUT,
+    DEFAULT_IMAGE_MAX_SIZE_MB,
+)
 from .tag_types import TagType, get_tag_types_manager
-from .util import get_image_path
+from .util import get_image_cache_dir, get_image_path
+from .mdi_index import get_mdi_index, get_mdi_font, lookup_icon
+from .downsample import DOWNSAMPLE_MINMAX, downsample_indices
+from .bitmap_cache import BitmapCache
+from .history_cache import HistoryCache, series_since
+from .image_fetch import ImageFetcher
+from .plot_geometry import catmull_rom_spline, clip_polygon, clip_polyline, marker_positions, to_screen
+from .qr_code import render_qr_code
+from .stamp import make_stamp
+from .text_layout import clear_text_length_cache, text_length, truncate_text, wrap_lines
 from PIL import Image, ImageDraw, ImageFont
 from resizeimage import resizeimage
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.components.recorder import get_instance
-from homeassistant.components.recorder.history import get_significant_states
+from homeassistant.components.recorder.statistics import statistics_during_period
 from homeassistant.util import dt
-from datetime import timedelta, datetime
+from datetime import timedelta
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -39,6 +63,13 @@ RED = (255, 0, 0, 255)
 HALF_RED = (255, 127, 127, 255)
 YELLOW = (255, 255, 0, 255)
 HALF_YELLOW = (255, 255, 127, 255)
+INDEX_COLORS = frozenset({WHITE, BLACK, HALF_BLACK, RED, HALF_RED, YELLOW, HALF_YELLOW})
+
+# Maximum number of (font, size) pairs kept loaded per font manager
+DEFAULT_FONT_CACHE_SIZE = 64
+
+# Maximum number of compiled payloads kept per image generator
+DISPLAY_LIST_CACHE_SIZE = 32
 
 
 class ElementType(str, Enum):
@@ -95,6 +126,43 @@ class ElementType(str, Enum):
         return self.value
 
 
+# Plots up to this duration use 5-minute statistics, longer ones hourly.
+# Short-term statistics are purged with the recorder's keep_days (10 by default).
+PLOT_SHORT_TERM_STATISTICS_MAX = timedelta(days=7)
+
+# Element types that need an RGBA canvas, either because they alpha
+# composite arbitrary images onto it or because they draw anti-aliased text
+TRUE_COLOR_ELEMENT_TYPES = frozenset({
+    ElementType.DLIMG,
+    ElementType.PLOT,
+    ElementType.DEBUG_GRID,
+})
+
+
+def needs_true_color(element_type: ElementType, element: Mapping[str, Any]) -> bool:
+    """Check whether an element has to be drawn on an RGBA canvas.
+
+    Progress bars only draw anti-aliased text when they show their
+    percentage. Stroked text and icons blend the stroke into the glyph
+    edges, so any element with a stroke_width needs RGBA too. Everything
+    else not in TRUE_COLOR_ELEMENT_TYPES draws in palette colors without
+    anti-aliasing.
+
+    Args:
+        element_type: Validated element type
+        element: Element properties
+
+    Returns:
+        bool: True if the canvas must be converted to RGBA first
+    """
+    stroke_width = element.get("stroke_width", 0)
+    if isinstance(stroke_width, (int, float)) and stroke_width > 0:
+        return True
+    if element_type == ElementType.PROGRESS_BAR:
+        return bool(element.get("show_percentage", False))
+    return element_type in TRUE_COLOR_ELEMENT_TYPES
+
+
 class CoordinateParser:
     """Helper class for parsing coordinates with percentage support.
 
@@ -231,6 +299,47 @@ REQUIRED_FIELDS: Dict[ElementType, list[str]] = {
     ElementType.DEBUG_GRID: []
 }
 
+# Required fields for text elements with fit enabled
+TEXT_FIT_REQUIRED_FIELDS = ["value", "x_start", "y_start", "x_end", "y_end"]
+
+# Element keys holding canvas positions and sizes, resolved to pixels when
+# a payload is compiled. Values name the CoordinateParser axis: "x", "y",
+# "width" or "height" ("points" for lists of x, y pairs). Keys the draw
+# handlers use as plain pixel values are left out.
+COORDINATE_KEYS: Dict[ElementType, Dict[str, str]] = {
+    ElementType.TEXT: {
+        "x": "x", "y": "y", "size": "height",
+        "x_start": "x", "x_end": "x", "y_start": "y", "y_end": "y",
+    },
+    ElementType.RECTANGLE: {"x_start": "x", "x_end": "x", "y_start": "y", "y_end": "y"},
+    ElementType.POLYGON: {"points": "points"},
+    ElementType.CIRCLE: {"x": "x", "y": "y"},
+    ElementType.ELLIPSE: {"x_start": "x", "x_end": "x", "y_start": "y", "y_end": "y"},
+    ElementType.ARC: {"x": "x", "y": "y", "radius": "width"},
+    ElementType.ICON: {"x": "x", "y": "y"},
+    ElementType.ICON_SEQUENCE: {"x": "x", "y": "y"},
+    ElementType.QRCODE: {"x": "x", "y": "y"},
+    ElementType.PROGRESS_BAR: {"x_start": "x", "x_end": "x", "y_start": "y", "y_end": "y"},
+}
+
+# Element keys holding color names, resolved to palette colors when a
+# payload is compiled
+COLOR_KEYS: Dict[ElementType, Tuple[str, ...]] = {
+    ElementType.TEXT: ("color", "stroke_fill"),
+    ElementType.MULTILINE: ("color", "stroke_fill"),
+    ElementType.LINE: ("fill",),
+    ElementType.RECTANGLE: ("fill", "outline"),
+    ElementType.RECTANGLE_PATTERN: ("fill", "outline"),
+    ElementType.POLYGON: ("fill", "outline"),
+    ElementType.CIRCLE: ("fill", "outline"),
+    ElementType.ELLIPSE: ("fill", "outline"),
+    ElementType.ARC: ("fill", "outline"),
+    ElementType.ICON: ("color", "fill", "stroke_fill"),
+    ElementType.ICON_SEQUENCE: ("fill", "stroke_fill"),
+    ElementType.QRCODE: ("color", "bgcolor"),
+    ElementType.PROGRESS_BAR: ("background", "fill", "outline"),
+}
+
 
 def validate_element(element: Dict[str, Any]) -> ElementType:
     """Validate element and return its type.
@@ -256,9 +365,14 @@ def validate_element(element: Dict[str, Any]) -> ElementType:
     except ValueError:
         raise ValueError(f"Invalid element type: {element['type']}")
 
+    required_fields = REQUIRED_FIELDS[element_type]
+    if element_type == ElementType.TEXT and element.get("fit", False):
+        # Fitted text is placed by its box instead of a position
+        required_fields = TEXT_FIT_REQUIRED_FIELDS
+
     # Check required fields
     missing_fields = [
-        field for field in REQUIRED_FIELDS[element_type]
+        field for field in required_fields
         if field not in element
     ]
 
@@ -287,26 +401,299 @@ class TextSegment:
     start_x: int = 0
 
 
+@dataclass(frozen=True)
+class DrawOp:
+    """A validated payload element ready to be drawn.
+
+    Attributes:
+        index: Position of the element in the payload
+        element_type: Validated element type
+        element: Read-only element properties, with the keys in
+            COORDINATE_KEYS and COLOR_KEYS resolved to pixels and colors
+        prefetched: True if the element carries data loaded by a prefetch
+            handler
+    """
+    index: int
+    element_type: ElementType
+    element: Mapping[str, Any]
+    prefetched: bool = False
+
+
+@dataclass(frozen=True)
+class DisplayList:
+    """A compiled payload.
+
+    Attributes:
+        ops: Visible, validated elements in drawing order
+        errors: Validation error messages for rejected elements
+    """
+    ops: Tuple[DrawOp, ...]
+    errors: Tuple[str, ...]
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively convert payload values to read-only equivalents.
+
+    Args:
+        value: Payload value
+
+    Returns:
+        The value with mappings replaced by read-only proxies and lists by tuples
+    """
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+@dataclass(frozen=True)
+class RenderedImage:
+    """A rendered image together with the fingerprint of its content.
+
+    Attributes:
+        image_data: JPEG image data
+        fingerprint: Hash of the resolved payload, tag type and drawing options
+        cached: True if the image was reused instead of rasterized
+    """
+    image_data: bytes
+    fingerprint: str
+    cached: bool = False
+
+
+def get_tag_palette(tag_type: TagType) -> List[Tuple[int, int, int]]:
+    """Build the render palette for a tag type.
+
+    Starts with the colors of the tag's color table, which has one entry
+    per value the tag can show at its bit depth, followed by the remaining
+    colors get_index_color can produce.
+
+    Args:
+        tag_type: Tag type with a color_table
+
+    Returns:
+        list: Unique RGB colors, indexed by palette position
+    """
+    palette = []
+    color_table = getattr(tag_type, 'color_table', None) or {}
+    for rgb in list(color_table.values()) + [WHITE, BLACK, HALF_BLACK, RED, HALF_RED, YELLOW, HALF_YELLOW]:
+        color = tuple(rgb[:3])
+        if color not in palette:
+            palette.append(color)
+    return palette
+
+
+def get_canvas_size(tag_type: TagType, rotate: int) -> Tuple[int, int]:
+    """Get the size of the canvas elements are drawn on.
+
+    The canvas is drawn upright and rotated afterwards, so for 90 and 270
+    degree rotations its width and height are swapped.
+
+    Args:
+        tag_type: Tag type providing the display dimensions
+        rotate: Rotation of the rendered image
+
+    Returns:
+        tuple: (width, height) in pixels
+    """
+    if rotate in (0, 180):
+        return tag_type.width, tag_type.height
+    return tag_type.height, tag_type.width
+
+
+def create_palette_canvas(
+        tag_type: TagType,
+        size: Tuple[int, int],
+        background: Tuple[int, int, int, int]
+) -> Image.Image:
+    """Create a palette ("P" mode) canvas for a tag type.
+
+    Drawing on one byte per pixel instead of four is cheaper to fill,
+    rotate and convert, and gives the same pixels as an RGBA canvas as
+    long as everything is drawn without anti-aliasing in palette colors.
+    Elements for which needs_true_color is true convert the canvas to
+    RGBA before drawing.
+
+    Args:
+        tag_type: Tag type providing the color table
+        size: Canvas size in pixels
+        background: Background color as RGBA tuple
+
+    Returns:
+        Image: Palette image filled with the background color
+    """
+    palette = get_tag_palette(tag_type)
+    if background[:3] not in palette:
+        palette.append(background[:3])
+
+    img = Image.new('P', size, palette.index(background[:3]))
+    img.putpalette([channel for color in palette for channel in color])
+    return img
+
+
+def paste_tile(img: Image.Image, tile: Image.Image, position: tuple[int, int]) -> None:
+    """Composite a processed image onto an RGBA canvas.
+
+    Opaque tiles ("RGB") cover everything below them and are pasted
+    directly. Tiles with transparency ("RGBA") are alpha composited, but
+    only within the part of the canvas they cover, instead of building
+    and compositing a transparent canvas-sized layer. Both give the same
+    pixels as compositing the full canvas.
+
+    Args:
+        img: RGBA canvas, modified in place
+        tile: RGB or RGBA image to draw
+        position: Canvas position of the tile's top left corner
+    """
+    if tile.mode == "RGB":
+        img.paste(tile, position)
+        return
+
+    # Clip the tile's box to the canvas
+    left, top = max(position[0], 0), max(position[1], 0)
+    right = min(position[0] + tile.width, img.width)
+    bottom = min(position[1] + tile.height, img.height)
+    if left >= right or top >= bottom:
+        return
+
+    box = (left, top, right, bottom)
+    layer = Image.new("RGBA", (right - left, bottom - top))
+    layer.paste(tile, (position[0] - left, position[1] - top), tile)
+    img.paste(Image.alpha_composite(img.crop(box), layer), box)
+
+
+def get_payload_hash(payload: List[Dict[str, Any]]) -> str:
+    """Hash the content of a drawcustom payload.
+
+    Computed once per service call and shared by the render grouping,
+    the compiled payload cache and the render fingerprint.
+
+    Args:
+        payload: List of element dictionaries
+
+    Returns:
+        str: Hex digest of the payload
+    """
+    serialized = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+def _fingerprint_default(value: Any) -> Any:
+    """Serialize values json cannot handle for payload fingerprints.
+
+    Binary data (downloaded images, cached history arrays) is reduced to
+    its hash, everything else (datetimes, recorder states) to its string
+    representation.
+
+    Args:
+        value: Value to serialize
+
+    Returns:
+        A JSON serializable representation of the value
+    """
+    if isinstance(value, (bytes, bytearray)):
+        return hashlib.sha256(value).hexdigest()
+    if isinstance(value, array):
+        return hashlib.sha256(value.tobytes()).hexdigest()
+    if isinstance(value, Mapping):
+        return dict(value)
+    return str(value)
+
+
+def _fingerprint_element(element: dict) -> dict:
+    """Get the part of a prefetched element that identifies its content.
+
+    Elements with a "_source" (image/camera entities with their state
+    version) are identified by it, whether their bitmap was cached or
+    downloaded, so the raw data and cached tile are left out.
+
+    Args:
+        element: Prefetched element dictionary
+
+    Returns:
+        dict: The element, without source data if it has a "_source"
+    """
+    if "_source" not in element:
+        return element
+    return {key: value for key, value in element.items() if key not in ("_image_data", "_tile")}
+
+
+def get_render_fingerprint(
+        tag_type: TagType,
+        accent_color: str,
+        service_data: Dict[str, Any],
+        payload_hash: str,
+        elements: List[DrawOp]
+) -> str:
+    """Compute the content fingerprint of a render.
+
+    The fingerprint covers everything that changes what the tag displays:
+    the tag type, the drawing options, the payload and the data prefetched
+    for it, like downloaded images and recorder history. The payload
+    itself is covered by its hash, only prefetched elements are serialized.
+
+    Args:
+        tag_type: Tag type the image is rendered for
+        accent_color: Accent color of the tag
+        service_data: Service data containing image parameters
+        payload_hash: Hash of the payload from get_payload_hash
+        elements: Prefetched elements from ImageGen._prefetch_elements
+
+    Returns:
+        str: Hex digest identifying the rendered content
+    """
+    content = {
+        "hw_type": getattr(tag_type, "type_id", None),
+        "width": tag_type.width,
+        "height": tag_type.height,
+        "color_table": getattr(tag_type, "color_table", None),
+        "accent": accent_color,
+        "background": service_data.get("background", "white"),
+        "rotate": service_data.get("rotate", 0),
+        "dither": service_data.get("dither"),
+        "preload_type": service_data.get("preload_type", 0),
+        "preload_lut": service_data.get("preload_lut", 0),
+        "payload": payload_hash,
+        "prefetched": [(op.index, _fingerprint_element(op.element)) for op in elements if op.prefetched],
+    }
+    serialized = json.dumps(content, sort_keys=True, default=_fingerprint_default)
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
 class FontManager:
     """Class for managing font loading, caching and path resolution.
 
     Handles font discovery, loading, and caching to improve performance.
     Searches multiple directories for fonts and provides fallback mechanisms
     for when requested fonts are not available.
+
+    One instance is shared by all renders of a config entry. Loaded fonts
+    are kept in a bounded LRU cache, which is invalidated by reload_config
+    when the configured font directories change.
     """
 
-    def __init__(self, hass: HomeAssistant, entry=None):
+    def __init__(self, hass: HomeAssistant, entry=None, max_fonts: int = DEFAULT_FONT_CACHE_SIZE):
         """Initialize the font manager.
 
         Args:
             hass: Home Assistant instance for config path resolution
             entry: Config entry for accessing user-configured font directories
+            max_fonts: Maximum number of (font, size) pairs kept loaded
         """
         self._hass = hass
         self._entry = entry
-        self._font_cache: Dict[Tuple[str, int], ImageFont.FreeTypeFont] = {}
+        self._font_cache: OrderedDict[Tuple[str, int], ImageFont.FreeTypeFont] = OrderedDict()
+        self._max_fonts = max(1, max_fonts)
         self._known_dirs = []
 
+        # Cache statistics
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        # Fonts are requested from several render worker threads at once
+        self._lock = threading.RLock()
+
         # Standard font directories to search
         self._font_dirs = []
         self._setup_font_dirs()
@@ -370,42 +757,66 @@ class FontManager:
         Raises:
             HomeAssistantError: If no font could be loaded
         """
-        # Check if config has changed since last load
-        if self._entry:
-            custom_dirs_str = self._entry.options.get("custom_font_dirs", "")
-            current_dirs = [d.strip() for d in custom_dirs_str.split(";") if d.strip()]
-            if current_dirs != self._known_dirs:
-                _LOGGER.debug("Font directories changed, updating...")
-
-                # Clear current cache
-                self.clear_cache()
-
-                # Reset known dirs and load new ones
-                self._font_dirs = [
-                    os.path.dirname(__file__),              # Integration directory
-                    self._hass.config.path("www/fonts"),    # /config/www/fonts directory
-                    self._hass.config.path("media/fonts")   # /config/media/fonts directory
-                ]
-                for directory in current_dirs:
-                    if directory and directory.strip():
-                        self.add_font_directory(directory.strip())
+        with self._lock:
+            # Create cache key (font name, size)
+            cache_key = (font_name, size)
+
+            # Return cached font if available
+            font = self._font_cache.get(cache_key)
+            if font is not None:
+                self._hits += 1
+                self._font_cache.move_to_end(cache_key)
+                return font
+
+            self._misses += 1
+
+            # Load font from file
+            font = self._load_font(font_name, size)
+
+            # Cache font, evicting the least recently used one if full
+            self._font_cache[cache_key] = font
+            if len(self._font_cache) > self._max_fonts:
+                self._font_cache.popitem(last=False)
+                self._evictions += 1
+            return font
+
+    def reload_config(self) -> None:
+        """Apply changed font directories from the config entry.
+
+        Called from the options update listener. Rebuilds the search path
+        and clears the cache if the custom font directories changed. Does
+        blocking I/O and must run in an executor.
+        """
+        if not self._entry:
+            return
 
-                # Update known dirs
-                self._known_dirs = current_dirs
+        custom_dirs_str = self._entry.options.get("custom_font_dirs", "")
+        current_dirs = [d.strip() for d in custom_dirs_str.split(";") if d.strip()]
 
-        # Create cache key (font name, size)
-        cache_key = (font_name, size)
+        with self._lock:
+            if current_dirs == self._known_dirs:
+                return
 
-        # Return cached font if available
-        if cache_key in self._font_cache:
-            return self._font_cache[cache_key]
+            _LOGGER.debug("Font directories changed, updating...")
+            self._setup_font_dirs()
+            self._load_custom_font_dirs()
+            self.clear_cache()
 
-        # Load font from file
-        font = self._load_font(font_name, size)
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Return font cache statistics.
 
-        # Cache font
-        self._font_cache[cache_key] = font
-        return font
+        Returns:
+            dict: Cache size, capacity, hits, misses and evictions
+        """
+        with self._lock:
+            return {
+                "size": len(self._font_cache),
+                "max_size": self._max_fonts,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
 
     def get_available_fonts(self) -> List[str]:
         """Get list of available font names from all directories.
@@ -549,10 +960,13 @@ class FontManager:
     def clear_cache(self) -> None:
         """Clear the font cache.
 
-        Removes all cached fonts, forcing them to be reloaded on next request.
-        This is typically called when font directories change.
+        Removes all cached fonts and their measured text widths, forcing
+        them to be reloaded on next request. This is typically called when
+        font directories change.
         """
-        self._font_cache.clear()
+        with self._lock:
+            self._font_cache.clear()
+        clear_text_length_cache()
 
 
 class ImageGen:
@@ -565,15 +979,21 @@ class ImageGen:
     The class supports a variety of element types, each with its own drawing method,
     and handles the common aspects of image generation such as tag information retrieval,
     element validation, and drawing coordination.
+
+    Rendering happens in two phases: all I/O (image downloads, recorder history,
+    icon metadata) is done first on the event loop, after which the PIL work
+    runs in a bounded pool of render worker threads.
     """
 
-    def __init__(self, hass: HomeAssistant):
+    def __init__(self, hass: HomeAssistant, entry=None):
         """Initialize the image generator.
 
         Sets up the image generator with the necessary components and handlers.
 
         Args:
             hass: Home Assistant instance
+            entry: Config entry of the integration. If omitted, the entry of
+                the first configured hub is used.
         """
         self.hass = hass
         self._queue = []
@@ -582,13 +1002,38 @@ class ImageGen:
         self._last_interaction_file = os.path.join(os.path.dirname(__file__), "lastapinteraction.txt")
 
         # Load font manager
-        self._entry = None
-        if DOMAIN in hass.data and hass.data[DOMAIN]:
-            entry_id = list(hass.data[DOMAIN].keys())[0]
-            self._entry = hass.data[DOMAIN][entry_id].entry
+        self._entry = entry
+        if self._entry is None:
+            hub = self._get_hub()
+            if hub is not None:
+                self._entry = hub.entry
 
         self._font_manager = FontManager(self.hass, self._entry)
 
+        # Render worker pool, created on first use
+        self._executor: ThreadPoolExecutor | None = None
+        self._render_workers = self._get_render_workers()
+
+        # Compiled payloads by content hash
+        self._display_lists: OrderedDict[str, DisplayList] = OrderedDict()
+
+        # Fingerprint and JPEG data of the image last uploaded to each tag MAC
+        self._last_images: Dict[str, Tuple[str, bytes]] = {}
+
+        # MDI name lookup, loaded by _prefetch_icon
+        self._mdi_index: dict[str, int] | None = None
+
+        # Numeric plot history, extended with new states on every render
+        self._history_cache = HistoryCache(hass)
+
+        # Downloaded dlimg images, revalidated after the configured TTL
+        self._image_fetcher = ImageFetcher(hass, get_image_cache_dir(hass))
+
+        # Decoded and resized dlimg tiles, and the current state version
+        # of each image/camera entity used as a source
+        self._bitmap_cache = BitmapCache()
+        self._entity_sources: dict[str, tuple] = {}
+
         # Initialize handler mapping
         self._draw_handlers = {
             ElementType.TEXT: self._draw_text,
@@ -610,6 +1055,118 @@ class ImageGen:
             ElementType.DEBUG_GRID: self._draw_debug_grid
         }
 
+        # Element types that need I/O before they can be drawn
+        self._prefetch_handlers = {
+            ElementType.ICON: self._prefetch_icon,
+            ElementType.ICON_SEQUENCE: self._prefetch_icon,
+            ElementType.DLIMG: self._prefetch_downloaded_image,
+        }
+
+        # Element types whose data is fetched for all elements at once
+        self._batch_prefetch_handlers = {
+            ElementType.PLOT: self._prefetch_plots,
+        }
+
+    def _get_hub(self):
+        """Get the hub this generator renders for.
+
+        hass.data[DOMAIN] also holds the shared tag registry and upload
+        queue, so the hub is looked up by entry ID when known and otherwise
+        by skipping those.
+
+        Returns:
+            Hub: The hub instance, or None if no hub is set up
+        """
+        component_data = self.hass.data.get(DOMAIN, {})
+        if self._entry is not None and self._entry.entry_id in component_data:
+            return component_data[self._entry.entry_id]
+        for key, value in component_data.items():
+            if key not in ("tag_registry", "upload_queue"):
+                return value
+        return None
+
+    def _get_render_workers(self) -> int:
+        """Get the configured number of render worker threads.
+
+        Returns:
+            int: Number of worker threads, at least 1
+        """
+        workers = DEFAULT_RENDER_WORKERS
+        if self._entry:
+            workers = self._entry.options.get("render_workers", DEFAULT_RENDER_WORKERS)
+        return max(1, int(workers))
+
+    def _get_plot_statistics_threshold(self) -> Optional[timedelta]:
+        """Get the plot duration from which long-term statistics are used.
+
+        Returns:
+            timedelta: The configured threshold, or None if disabled
+        """
+        hours = DEFAULT_PLOT_STATISTICS_HOURS
+        if self._entry:
+            hours = self._entry.options.get("plot_statistics_hours", DEFAULT_PLOT_STATISTICS_HOURS)
+        if not hours or hours <= 0:
+            return None
+        return timedelta(hours=hours)
+
+    def _get_image_fetch_options(self) -> dict:
+        """Get the configured TTL, size limit and timeout of image downloads.
+
+        Returns:
+            dict: Keyword arguments for ImageFetcher.async_fetch
+        """
+        options = self._entry.options if self._entry else {}
+        return {
+            "ttl": options.get("image_cache_ttl", DEFAULT_IMAGE_CACHE_TTL),
+            "max_size": options.get("image_max_size", DEFAULT_IMAGE_MAX_SIZE_MB) * 1024 * 1024,
+            "timeout": options.get("image_fetch_timeout", DEFAULT_IMAGE_FETCH_TIMEOUT),
+        }
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get the render worker pool, creating it if necessary.
+
+        Returns:
+            ThreadPoolExecutor: The bounded pool used for rasterization
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._render_workers,
+                thread_name_prefix=f"{DOMAIN}_render",
+            )
+        return self._executor
+
+    async def async_reload_config(self) -> None:
+        """Apply changed integration options.
+
+        Picks up changed font directories and replaces the render worker
+        pool if the configured worker count changed. Renders already
+        running on the old pool are allowed to finish.
+        """
+        await self.hass.async_add_executor_job(self._font_manager.reload_config)
+
+        workers = self._get_render_workers()
+        if workers == self._render_workers:
+            return
+
+        _LOGGER.debug("Render worker count changed from %d to %d", self._render_workers, workers)
+        self._render_workers = workers
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def async_shutdown(self) -> None:
+        """Shut down the render worker pool and drop cached data.
+
+        Pending renders that have not started yet are cancelled.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._history_cache.clear()
+        self._image_fetcher.clear()
+        self._bitmap_cache.clear()
+        self._entity_sources.clear()
+
     async def get_tag_info(self, entity_id: str) -> Optional[tuple[TagType, str]]:
         """Get tag type information for an entity.
 
@@ -632,7 +1189,9 @@ class ImageGen:
             if DOMAIN not in self.hass.data or not self.hass.data[DOMAIN]:
                 raise HomeAssistantError("OpenEPaperLink integration not properly configured")
 
-            hub = next(iter(self.hass.data[DOMAIN].values()))
+            hub = self._get_hub()
+            if hub is None:
+                raise HomeAssistantError("OpenEPaperLink integration not properly configured")
             if not hub.online:
                 raise HomeAssistantError("OpenEPaperLink AP is offline")
 
@@ -716,6 +1275,9 @@ class ImageGen:
         """
         if color is None:
             return None
+        if isinstance(color, tuple) and color in INDEX_COLORS:
+            # Already resolved by compile_payload
+            return color
         color_str = str(color).lower()
         if color_str in ("black", "b"):
             return BLACK
@@ -801,22 +1363,178 @@ class ImageGen:
         if not tag_type:
             raise HomeAssistantError("Failed to get tag type information")
 
-        # Get canvas dimensions from tag type
-        canvas_width = tag_type.width
-        canvas_height = tag_type.height
+        rendered = await self.render_image(tag_type, accent_color, service_data, error_collector)
 
-        # Get rotation and create base image
-        rotate = service_data.get("rotate", 0)
-        if rotate in (0, 180):
-            img = Image.new('RGBA', (canvas_width, canvas_height),
-                            color=self.get_index_color(service_data.get("background", "white"), accent_color))
-        else:
-            img = Image.new('RGBA', (canvas_height, canvas_width),
-                            color=self.get_index_color(service_data.get("background", "white"), accent_color))
+        self.async_save_image(entity_id, rendered.image_data)
 
-        pos_y = 0
+        return rendered.image_data
+
+    async def render_image(
+            self,
+            tag_type: TagType,
+            accent_color: str,
+            service_data: Dict[str, Any],
+            error_collector: list = None,
+            force: bool = False,
+            payload_hash: Optional[str] = None
+    ) -> RenderedImage:
+        """Render service data for a tag type without saving it.
+
+        The result only depends on the tag type, accent color and service
+        data, so it can be shared by all tags with the same hardware.
+
+        After prefetching, the resolved payload is fingerprinted. If a tag
+        was last sent an image with the same fingerprint, its bytes are
+        reused and rasterization is skipped.
+
+        Args:
+            tag_type: Tag type providing the canvas dimensions
+            accent_color: Accent color of the tag
+            service_data: Service data containing image parameters and payload
+            error_collector: Optional list to collect error messages
+            force: Always rasterize, even if a matching image is known
+            payload_hash: Hash of the payload from get_payload_hash, computed
+                if not given
+
+        Returns:
+            RenderedImage: JPEG image data and its content fingerprint
+        """
+        error_collector = error_collector if error_collector is not None else []
         payload = service_data.get("payload", [])
+        if payload_hash is None:
+            payload_hash = get_payload_hash(payload)
+
+        rotate = service_data.get("rotate", 0)
+        display_list = self.compile_payload(
+            payload, get_canvas_size(tag_type, rotate), accent_color, rotate, payload_hash
+        )
+
+        # Do all I/O on the event loop before handing off to the render pool
+        elements = await self._prefetch_elements(display_list, error_collector)
+
+        fingerprint = get_render_fingerprint(tag_type, accent_color, service_data, payload_hash, elements)
+        if not force:
+            for last_fingerprint, last_image in self._last_images.values():
+                if last_fingerprint == fingerprint:
+                    _LOGGER.debug("Reusing image with fingerprint %s", fingerprint[:12])
+                    return RenderedImage(last_image, fingerprint, cached=True)
+
+        image_data = await asyncio.get_running_loop().run_in_executor(
+            self._get_executor(),
+            partial(
+                self._render_image,
+                tag_type,
+                accent_color,
+                service_data,
+                elements,
+                error_collector,
+            ),
+        )
+        return RenderedImage(image_data, fingerprint)
 
+    def is_image_current(self, mac: str, fingerprint: str) -> bool:
+        """Check whether a tag was last sent an image with this fingerprint.
+
+        Args:
+            mac: MAC address of the tag
+            fingerprint: Fingerprint of the new image
+
+        Returns:
+            bool: True if uploading the image would not change the tag
+        """
+        last = self._last_images.get(mac)
+        return last is not None and last[0] == fingerprint
+
+    def remember_image(self, mac: str, fingerprint: str, image_data: bytes) -> None:
+        """Record the image that was last sent to a tag.
+
+        Args:
+            mac: MAC address of the tag
+            fingerprint: Fingerprint of the image
+            image_data: JPEG image data
+        """
+        self._last_images[mac] = (fingerprint, image_data)
+
+    def forget_image(self, mac: str) -> None:
+        """Forget the last image sent to a tag.
+
+        The next drawcustom call for the tag is uploaded even if its
+        content is unchanged.
+
+        Args:
+            mac: MAC address of the tag
+        """
+        self._last_images.pop(mac, None)
+
+    def async_save_image(self, entity_id: str, image_data: bytes) -> None:
+        """Store a generated image for the camera entity of a tag.
+
+        Writes the image to the web directory in the background and
+        notifies the tag's camera entity once it is saved.
+
+        Args:
+            entity_id: The entity ID the image was generated for
+            image_data: JPEG image data
+        """
+
+        # Save files in executor
+        async def save_files():
+            """Save generated image to web directory."""
+            web_path = get_image_path(self.hass, entity_id)
+
+            # Ensure directory exists
+            os.makedirs(os.path.dirname(web_path), exist_ok=True)
+
+            def _save_file():
+                with open(web_path, 'wb') as f:
+                    f.write(image_data)
+
+            await self.hass.async_add_executor_job(_save_file)
+            async_dispatcher_send(self.hass, f"{SIGNAL_TAG_IMAGE_UPDATE}_{entity_id.split('.')[1].upper()}", False)
+
+        # Start saving files in the background
+        self.hass.async_create_task(save_files())
+
+    def compile_payload(
+            self,
+            payload: List[Dict[str, Any]],
+            canvas_size: Tuple[int, int],
+            accent_color: str = "red",
+            rotate: int = 0,
+            payload_hash: Optional[str] = None
+    ) -> DisplayList:
+        """Compile a payload into a read-only display list for a canvas.
+
+        Hidden elements are dropped and every remaining element is
+        validated once. Positions and sizes in COORDINATE_KEYS are resolved
+        to pixels for the canvas, and color names in COLOR_KEYS to palette
+        colors, so draw handlers do not parse them again. Compiled payloads
+        are cached by payload hash, canvas size, accent color and rotation,
+        so repeated service calls with the same payload skip compilation.
+
+        Args:
+            payload: List of element dictionaries
+            canvas_size: Size of the canvas the elements are drawn on
+            accent_color: Accent color of the tag
+            rotate: Rotation of the rendered image
+            payload_hash: Hash of the payload from get_payload_hash, computed
+                if not given
+
+        Returns:
+            DisplayList: The drawable elements and validation errors
+        """
+        if payload_hash is None:
+            payload_hash = get_payload_hash(payload)
+        key = (payload_hash, tuple(canvas_size), accent_color, rotate)
+
+        display_list = self._display_lists.get(key)
+        if display_list is not None:
+            self._display_lists.move_to_end(key)
+            return display_list
+
+        coords = CoordinateParser(*canvas_size)
+        ops = []
+        errors = []
         for i, element in enumerate(payload):
             if not self.should_show_element(element):
                 continue
@@ -824,11 +1542,162 @@ class ImageGen:
             try:
                 # Validate element and get its type
                 element_type = validate_element(element)
+                resolved = self._resolve_element(element_type, element, coords)
+                ops.append(DrawOp(i, element_type, _freeze(resolved)))
+
+            except (ValueError, KeyError) as e:
+                error_msg = f"Element {i + 1}: {str(e)}"
+                _LOGGER.error(error_msg)
+                errors.append(error_msg)
+
+        display_list = DisplayList(tuple(ops), tuple(errors))
+        self._display_lists[key] = display_list
+        if len(self._display_lists) > DISPLAY_LIST_CACHE_SIZE:
+            self._display_lists.popitem(last=False)
+        return display_list
+
+    def _resolve_element(
+            self,
+            element_type: ElementType,
+            element: Dict[str, Any],
+            coords: CoordinateParser
+    ) -> Dict[str, Any]:
+        """Resolve the positions and colors of an element for a canvas.
+
+        Values that cannot be resolved are kept as they are, so the draw
+        handler reports them like before.
+
+        Args:
+            element_type: Validated element type
+            element: Element dictionary
+            coords: Coordinate parser for the canvas
+
+        Returns:
+            dict: A copy of the element with resolved values
+        """
+        resolved = dict(element)
+        for key, axis in COORDINATE_KEYS.get(element_type, {}).items():
+            if key not in element:
+                continue
+            value = element[key]
+            if axis == "points":
+                try:
+                    resolved[key] = [(coords.parse_x(x), coords.parse_y(y)) for x, y in value]
+                except (TypeError, ValueError):
+                    pass
+            elif axis == "x":
+                resolved[key] = coords.parse_x(value)
+            elif axis == "y":
+                resolved[key] = coords.parse_y(value)
+            else:
+                resolved[key] = coords.parse_size(value, is_width=axis == "width")
+
+        for key in COLOR_KEYS.get(element_type, ()):
+            value = element.get(key)
+            # Empty values fall back to other keys in some handlers
+            if isinstance(value, str) and value:
+                resolved[key] = self.get_index_color(value)
+        return resolved
+
+    async def _prefetch_elements(
+            self,
+            display_list: DisplayList,
+            error_collector: list
+    ) -> List[DrawOp]:
+        """Fetch everything the elements of a display list need.
+
+        Runs on the event loop. Element types with a prefetch handler get
+        their external data loaded so the draw handlers never have to do
+        I/O. All fetches run concurrently; element types with a batch
+        handler (plots) fetch the data of all their elements together.
+
+        Args:
+            display_list: Compiled payload from compile_payload
+            error_collector: List to collect error messages
+
+        Returns:
+            list: Draw ops ready for drawing
+        """
+        error_collector.extend(display_list.errors)
+        ops = display_list.ops
+
+        # Start every fetch at once: one job per element, or one per
+        # element type for types with a batch handler
+        jobs = []
+        batches: Dict[ElementType, List[int]] = {}
+        for position, op in enumerate(ops):
+            if op.element_type in self._batch_prefetch_handlers:
+                batches.setdefault(op.element_type, []).append(position)
+            elif op.element_type in self._prefetch_handlers:
+                jobs.append(([position], False, self._prefetch_handlers[op.element_type](op.element)))
+        for element_type, positions in batches.items():
+            handler = self._batch_prefetch_handlers[element_type]
+            jobs.append((positions, True, handler([ops[position].element for position in positions])))
+
+        results = await asyncio.gather(*(job for _, _, job in jobs), return_exceptions=True)
+
+        outcomes: Dict[int, Any] = {}
+        for (positions, is_batch, _), result in zip(jobs, results):
+            if isinstance(result, asyncio.CancelledError):
+                raise result
+            if is_batch and not isinstance(result, BaseException):
+                outcomes.update(zip(positions, result))
+            else:
+                outcomes.update((position, result) for position in positions)
+
+        elements = []
+        for position, op in enumerate(ops):
+            outcome = outcomes.get(position, op.element)
+            if not isinstance(outcome, BaseException):
+                elements.append(DrawOp(op.index, op.element_type, outcome, True) if position in outcomes else op)
+            elif isinstance(outcome, (ValueError, KeyError)):
+                error_msg = f"Element {op.index + 1}: {str(outcome)}"
+                _LOGGER.error(error_msg)
+                error_collector.append(error_msg)
+            else:
+                error_msg = f"Element {op.index + 1} (type '{op.element.get('type', 'unknown')}'): {str(outcome)}"
+                _LOGGER.error(error_msg)
+                error_collector.append(error_msg)
+
+        return elements
+
+    def _render_image(
+            self,
+            tag_type: TagType,
+            accent_color: str,
+            service_data: Dict[str, Any],
+            elements: List[DrawOp],
+            error_collector: list
+    ) -> bytes:
+        """Rasterize prefetched elements and encode the result as JPEG.
+
+        Runs in a render worker thread and must not touch the event loop.
+
+        Args:
+            tag_type: Tag type providing the canvas dimensions
+            accent_color: Accent color of the tag
+            service_data: Service data containing background and rotation
+            elements: Prefetched elements from _prefetch_elements
+            error_collector: List to collect error messages
+
+        Returns:
+            bytes: JPEG image data
+        """
+        # Get rotation and create base image
+        rotate = service_data.get("rotate", 0)
+        background = self.get_index_color(service_data.get("background", "white"), accent_color)
+        img = create_palette_canvas(tag_type, get_canvas_size(tag_type, rotate), background)
 
+        pos_y = 0
+        for op in elements:
+            i, element_type, element = op.index, op.element_type, op.element
+            if img.mode == 'P' and needs_true_color(element_type, element):
+                img = img.convert('RGBA')
+            try:
                 # Get the appropriate handler and call it
                 handler = self._draw_handlers.get(element_type)
                 if handler:
-                    pos_y = await handler(img, element, pos_y)
+                    pos_y = handler(img, element, pos_y)
                 else:
                     error_msg = f"No handler found for element type: {element_type}"
                     _LOGGER.warning(error_msg)
@@ -855,29 +1724,34 @@ class ImageGen:
         # Create BytesIO object for the JPEG data
         img_byte_arr = io.BytesIO()
         rgb_image.save(img_byte_arr, format='JPEG', quality="maximum")
-        image_data = img_byte_arr.getvalue()
+        return img_byte_arr.getvalue()
 
-        # Save files in executor
-        async def save_files():
-            """Save generated image to web directory."""
-            web_path = get_image_path(self.hass, entity_id)
+    async def _prefetch_icon(self, element: dict) -> dict:
+        """Make sure the MDI index is loaded for icon elements.
 
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(web_path), exist_ok=True)
+        The index is shared by the whole process and only read from disk
+        once. Draw handlers only read it.
 
-            def _save_file():
-                with open(web_path, 'wb') as f:
-                    f.write(image_data)
+        Args:
+            element: Element dictionary with icon properties
 
-            await self.hass.async_add_executor_job(_save_file)
-            async_dispatcher_send(self.hass, f"{SIGNAL_TAG_IMAGE_UPDATE}_{entity_id.split('.')[1].upper()}", False)
+        Returns:
+            dict: The unchanged element
 
-        # Start saving files in the background
-        self.hass.async_create_task(save_files())
+        Raises:
+            HomeAssistantError: If the index cannot be loaded
+        """
+        if self._mdi_index is None:
+            try:
+                self._mdi_index = await self.hass.async_add_executor_job(
+                    get_mdi_index, self.hass.config.path(".storage")
+                )
+            except Exception as e:
+                raise HomeAssistantError(f"Failed to load MDI metadata: {str(e)}")
 
-        return image_data
+        return element
 
-    async def _draw_text(self, img: Image, element: dict, pos_y: int) -> int:
+    def _draw_text(self, img: Image, element: dict, pos_y: int) -> int:
         """Draw (coloured) text with optional wrapping or ellipsis.
 
         Renders text with support for multiple formatting options:
@@ -887,6 +1761,7 @@ class ImageGen:
         - Text truncation with ellipsis
         - Multiple anchoring options
         - Font selection and sizing
+        - Fitting the font size to a box with fit
 
         Args:
             img: PIL Image to draw on
@@ -896,22 +1771,16 @@ class ImageGen:
         Returns:
             int: Updated Y position after drawing
         """
-        self.check_required_arguments(element, ["x", "value"], "text")
+        fit = element.get('fit', False)
+        if fit:
+            self.check_required_arguments(element, TEXT_FIT_REQUIRED_FIELDS, "text")
+        else:
+            self.check_required_arguments(element, ["x", "value"], "text")
 
         draw = ImageDraw.Draw(img)
         draw.fontmode = "1"
         coords = CoordinateParser(img.width, img.height)
 
-        x = coords.parse_x(element['x'])
-        if "y" not in element:
-            y = pos_y + element.get('y_padding', 10)
-        else:
-            y = coords.parse_y(element['y'])
-        # Get text properties
-        size = coords.parse_size(element.get('size', 20), is_width=False)
-        font_name = element.get('font', "ppb.ttf")
-        font = self._font_manager.get_font(font_name, size)
-
         # Get alignment and default color
         align = element.get('align', "left")
         default_color = self.get_index_color(element.get('color', "black"))
@@ -923,33 +1792,32 @@ class ImageGen:
         # Process text content
         text = str(element['value'])
         max_width = element.get('max_width')
+        font_name = element.get('font', "ppb.ttf")
+
+        if fit:
+            x, y, font, final_text = self._fit_text(
+                draw, coords, element, text, font_name, align, spacing, stroke_width
+            )
+            anchor = 'la'
+            max_width = None
+        else:
+            x = coords.parse_x(element['x'])
+            if "y" not in element:
+                y = pos_y + element.get('y_padding', 10)
+            else:
+                y = coords.parse_y(element['y'])
+            # Get text properties
+            size = coords.parse_size(element.get('size', 20), is_width=False)
+            font = self._font_manager.get_font(font_name, size)
+            final_text = text
 
         # Handle text wrapping if max_width is specified
-        final_text = text
         if max_width is not None:
+            # Measure like draw.textlength does, using the draw's font mode
             if element.get('truncate', False):
-                if draw.textlength(text, font=font) > max_width:
-                    ellipsis = "..."
-                    truncated = text
-                    while truncated and draw.textlength(truncated + ellipsis, font=font) > max_width:
-                        truncated = truncated[:-1]
-                    final_text = truncated + ellipsis
+                final_text = truncate_text(font, text, max_width, mode=draw.fontmode)
             else:
-                words = text.split()
-                lines = []
-                current_line = []
-
-                for word in words:
-                    test_line = ' '.join(current_line + [word])
-                    if not current_line or draw.textlength(test_line, font=font) <= max_width:
-                        current_line.append(word)
-                    else:
-                        lines.append(' '.join(current_line))
-                        current_line = [word]
-
-                if current_line:
-                    lines.append(' '.join(current_line))
-                final_text = '\n'.join(lines)
+                final_text = '\n'.join(wrap_lines(font, text, max_width, mode=draw.fontmode))
 
         # Set appropriate anchor based on line count
         if not anchor:
@@ -1005,6 +1873,106 @@ class ImageGen:
             )
             return bbox[3]
 
+    def _fit_text(
+            self,
+            draw: ImageDraw.ImageDraw,
+            coords: CoordinateParser,
+            element: dict,
+            text: str,
+            font_name: str,
+            align: str,
+            spacing: int,
+            stroke_width: int
+    ) -> Tuple[int, int, ImageFont.FreeTypeFont, str]:
+        """Find the largest font size at which text fits its box.
+
+        Bisects the font size between min_size and size (by default the
+        box height), so only O(log n) layouts are measured. At every
+        candidate size the text is wrapped to the box width, keeping
+        explicit line breaks. Color markup is measured without its tags.
+
+        Args:
+            draw: ImageDraw instance used for measuring
+            coords: Coordinate parser for the canvas
+            element: Text element with x_start, y_start, x_end and y_end
+            text: Text to fit
+            font_name: Font file name
+            align: Horizontal alignment inside the box (left, center, right)
+            spacing: Line spacing in pixels
+            stroke_width: Outline width in pixels
+
+        Returns:
+            tuple: (x, y, font, text) to draw with the 'la' anchor
+        """
+        x_start = coords.parse_x(element['x_start'])
+        x_end = coords.parse_x(element['x_end'])
+        y_start = coords.parse_y(element['y_start'])
+        y_end = coords.parse_y(element['y_end'])
+        box_width = x_end - x_start
+        box_height = y_end - y_start
+
+        parse_colors = element.get('parse_colors', False)
+        min_size = max(1, int(element.get('min_size', 1)))
+        max_size = coords.parse_size(element.get('size', box_height), is_width=False)
+        max_size = max(min_size, max_size)
+
+        def layout(size: int):
+            font = self._font_manager.get_font(font_name, size)
+            if parse_colors:
+                # Segments are drawn on one line, so colored text is not wrapped
+                fitted = text
+                measured = ''.join(segment.text for segment in self._parse_colored_text(text))
+            else:
+                fitted = '\n'.join(
+                    '\n'.join(wrap_lines(font, paragraph, box_width, mode=draw.fontmode))
+                    for paragraph in text.split('\n')
+                )
+                measured = fitted
+            bbox = draw.textbbox(
+                (0, 0), measured, font=font, anchor='la', spacing=spacing, stroke_width=stroke_width
+            )
+            return font, fitted, bbox
+
+        def fits(bbox) -> bool:
+            return bbox[2] - bbox[0] <= box_width and bbox[3] - bbox[1] <= box_height
+
+        best = layout(min_size)
+        low, high = min_size + 1, max_size
+        while low <= high:
+            middle = (low + high) // 2
+            candidate = layout(middle)
+            if fits(candidate[2]):
+                best = candidate
+                low = middle + 1
+            else:
+                high = middle - 1
+
+        font, fitted, bbox = best
+        text_width = bbox[2] - bbox[0]
+        text_height = bbox[3] - bbox[1]
+
+        # Position the text block inside the box
+        match align:
+            case "center":
+                x = x_start + (box_width - text_width) / 2
+            case "right":
+                x = x_end - text_width
+            case _:
+                x = x_start
+        match element.get('valign', "top"):
+            case "middle":
+                y = y_start + (box_height - text_height) / 2
+            case "bottom":
+                y = y_end - text_height
+            case _:
+                y = y_start
+
+        if parse_colors and align in ("center", "right"):
+            # Colored segments are aligned around x by _calculate_segment_positions
+            x = x + text_width / 2 if align == "center" else x + text_width
+
+        return int(x - bbox[0]), int(y - bbox[1]), font, fitted
+
     @staticmethod
     def _get_wrapped_text(text: str, font: ImageFont.ImageFont, line_length: int) -> str:
         """Wrap text to fit within a given width.
@@ -1019,14 +1987,7 @@ class ImageGen:
         Returns:
             str: Text with newlines inserted for wrapping
         """
-        lines = ['']
-        for word in text.split():
-            line = f'{lines[-1]} {word}'.strip()
-            if font.getlength(line) <= line_length:
-                lines[-1] = line
-            else:
-                lines.append(word)
-        return '\n'.join(lines)
+        return '\n'.join(wrap_lines(font, text, line_length))
 
     @staticmethod
     def _parse_colored_text(text: str) -> List[TextSegment]:
@@ -1094,7 +2055,7 @@ class ImageGen:
             tuple: (modified segments with positions, total width)
         """
 
-        total_width = sum(font.getlength(segment.text) for segment in segments)
+        total_width = sum(text_length(font, segment.text) for segment in segments)
 
         current_x = start_x
         match alignment.lower():
@@ -1110,11 +2071,11 @@ class ImageGen:
 
         for segment in segments:
             segment.start_x = int(current_x)
-            current_x += font.getlength(segment.text)
+            current_x += text_length(font, segment.text)
 
         return segments, total_width
 
-    async def _draw_multiline(self, img: Image, element: dict, pos_y: int) -> int:
+    def _draw_multiline(self, img: Image, element: dict, pos_y: int) -> int:
         """Draw multiline text with delimiter.
 
         Renders multiple lines of text separated by a delimiter character.
@@ -1198,7 +2159,7 @@ class ImageGen:
 
         return max_y
 
-    async def _draw_line(self, img: Image, element: dict, pos_y: int) -> int:
+    def _draw_line(self, img: Image, element: dict, pos_y: int) -> int:
         """Draw line element.
 
      Renders a straight line between two points, with options for color,
@@ -1363,7 +2324,7 @@ class ImageGen:
 
         return result[0], result[1], result[2], result[3]
 
-    async def _draw_rectangle(self, img: Image, element: dict, pos_y: int) -> int:
+    def _draw_rectangle(self, img: Image, element: dict, pos_y: int) -> int:
         """Draw rectangle element.
 
         Renders a rectangle with options for fill, outline, and rounded corners.
@@ -1412,11 +2373,12 @@ class ImageGen:
 
         return y_end
 
-    async def _draw_rectangle_pattern(self, img: Image, element: dict, pos_y: int) -> int:
+    def _draw_rectangle_pattern(self, img: Image, element: dict, pos_y: int) -> int:
         """Draw repeated rectangle pattern.
 
         Renders a grid of rectangles with consistent spacing, useful for
-        creating regular patterns or grids.
+        creating regular patterns or grids. All cells are identical, so one
+        cell is rasterized and stamped at every position.
 
         Args:
             img: PIL Image to draw on
@@ -1433,8 +2395,6 @@ class ImageGen:
             "rectangle_pattern"
         )
 
-        draw = ImageDraw.Draw(img)
-
         # Get pattern properties
         fill = self.get_index_color(element.get('fill'))
         outline = self.get_index_color(element.get('outline', "black"))
@@ -1444,32 +2404,43 @@ class ImageGen:
             element.get('corners', "all" if 'radius' in element else "")
         )
 
-        max_y = element['y_start']
-
-        # Draw rectangle grid
-        for x in range(element["x_repeat"]):
-            for y in range(element["y_repeat"]):
-                # Calculate rectangle position
-                x_pos = element['x_start'] + x * (element['x_offset'] + element['x_size'])
-                y_pos = element['y_start'] + y * (element['y_offset'] + element['y_size'])
+        x_size = element['x_size']
+        y_size = element['y_size']
+        origins = [
+            (element['x_start'] + x * (element['x_offset'] + x_size),
+             element['y_start'] + y * (element['y_offset'] + y_size))
+            for x in range(element["x_repeat"])
+            for y in range(element["y_repeat"])
+        ]
 
-                # Draw individual rectangle
-                draw.rounded_rectangle(
-                    (x_pos, y_pos,
-                     x_pos + element['x_size'],
-                     y_pos + element['y_size']),
-                    fill=fill,
-                    outline=outline,
-                    width=width,
-                    radius=radius,
-                    corners=corners
-                )
+        def draw_cell(cell_draw, ink, x_pos, y_pos):
+            cell_draw.rounded_rectangle(
+                (x_pos, y_pos, x_pos + x_size, y_pos + y_size),
+                fill=ink(fill),
+                outline=ink(outline),
+                width=width,
+                radius=radius,
+                corners=corners
+            )
 
-                max_y = max(max_y, y_pos + element['y_size'])
+        # Rasterize one cell and stamp it, unless positions are fractional.
+        # Outlines wider than half the cell reach outside of it.
+        integral = (
+            all(isinstance(value, int) for value in (x_size, y_size, width))
+            and all(isinstance(x_pos, int) and isinstance(y_pos, int) for x_pos, y_pos in origins)
+        )
+        if len(origins) > 1 and integral:
+            margin = width + 1
+            stamp = make_stamp(img, (-margin, -margin, x_size + 1 + margin, y_size + 1 + margin), draw_cell)
+            stamp.paste_all(img, origins)
+        else:
+            draw = ImageDraw.Draw(img)
+            for x_pos, y_pos in origins:
+                draw_cell(draw, lambda color: color, x_pos, y_pos)
 
-        return max_y
+        return max([element['y_start']] + [y_pos + y_size for _, y_pos in origins])
 
-    async def _draw_polygon(self, img: Image, element: dict, pos_y: int) -> int:
+    def _draw_polygon(self, img: Image, element: dict, pos_y: int) -> int:
         """Draw a polygon.
 
         Renders a polygon defined by a list of vertex coordinates.
@@ -1503,7 +2474,7 @@ class ImageGen:
 
         return pos_y
 
-    async def _draw_circle(self, img: Image, element: dict, pos_y: int) -> int:
+    def _draw_circle(self, img: Image, element: dict, pos_y: int) -> int:
         """Draw circle element.
 
         Renders a circle with options for fill and outline.
@@ -1544,7 +2515,7 @@ class ImageGen:
 
         return y + element['radius']
 
-    async def _draw_ellipse(self, img: Image, element: dict, pos_y: int) -> int:
+    def _draw_ellipse(self, img: Image, element: dict, pos_y: int) -> int:
         """Draw ellipse element.
 
         Renders an ellipse with options for fill and outline.
@@ -1587,7 +2558,7 @@ class ImageGen:
 
         return y_end
 
-    async def _draw_arc(self, img: Image, element: dict, pos_y: int):
+    def _draw_arc(self, img: Image, element: dict, pos_y: int):
         """Draw an arc or pie slice.
 
         Renders an arc (outline) or pie slice (filled) based on center point,
@@ -1652,7 +2623,7 @@ class ImageGen:
 
         return pos_y
 
-    async def _draw_icon(self, img: Image, element: dict, pos_y: int) -> int:
+    def _draw_icon(self, img: Image, element: dict, pos_y: int) -> int:
         """Draw Material Design Icons.
 
         Renders an icon from the Material Design Icons font at the specified
@@ -1683,46 +2654,14 @@ class ImageGen:
         x = coords.parse_x(element['x'])
         y = coords.parse_y(element['y'])
 
-        # Load MDI font and metadata
-        font_file = os.path.join(os.path.dirname(__file__), 'materialdesignicons-webfont.ttf')
-        meta_file = os.path.join(os.path.dirname(__file__), "materialdesignicons-webfont_meta.json")
-
-        try:
-            def load_meta():
-                with open(meta_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-
-            mdi_data = await self.hass.async_add_executor_job(load_meta)
-        except Exception as e:
-            raise HomeAssistantError(f"Failed to load MDI metadata: {str(e)}")
-
-        # Find icon codepoint
+        # MDI index is loaded by _prefetch_icon before rendering
         icon_name = element['value']
-        if icon_name.startswith("mdi:"):
-            icon_name = icon_name[4:]
-
-        chr_hex = None
-        # Search direct matches
-        for icon in mdi_data:
-            if icon['name'] == icon_name:
-                chr_hex = icon['codepoint']
-                break
-
-        # Search aliases if no direct match
-        if not chr_hex:
-            for icon in mdi_data:
-                if 'aliases' in icon and icon_name in icon['aliases']:
-                    chr_hex = icon['codepoint']
-                    break
-
-        if not chr_hex:
-            raise HomeAssistantError(f"Invalid icon name: {icon_name}")
+        icon_chr = lookup_icon(self._mdi_index, icon_name)
+        if not icon_chr:
+            raise HomeAssistantError(f"Invalid icon name: {icon_name.removeprefix('mdi:')}")
 
         # Get icon properties
-        def load_font():
-            return ImageFont.truetype(font_file, element['size'])
-
-        font = await self.hass.async_add_executor_job(load_font)
+        font = get_mdi_font(element['size'])
         anchor = element.get('anchor', "la")
         fill = self.get_index_color(
             element.get('color') or element.get('fill', "black")
@@ -1734,7 +2673,7 @@ class ImageGen:
         try:
             draw.text(
                 (x, y),
-                chr(int(chr_hex, 16)),
+                icon_chr,
                 fill=fill,
                 font=font,
                 anchor=anchor,
@@ -1747,17 +2686,19 @@ class ImageGen:
         # Calculate vertical position using text bounds
         bbox = draw.textbbox(
             (x, y),
-            chr(int(chr_hex, 16)),
+            icon_chr,
             font=font,
             anchor=anchor
         )
         return bbox[3]
 
-    async def _draw_icon_sequence(self, img: Image, element: dict, pos_y: int) -> int:
+    def _draw_icon_sequence(self, img: Image, element: dict, pos_y: int) -> int:
         """Draw a sequence of icons in a specified direction.
 
         Renders multiple icons in a sequence with consistent spacing,
         useful for creating icon-based status indicators or legends.
+        Icons that repeat, like the stars of a rating, are rasterized once
+        and stamped.
 
         Args:
             img: PIL Image to draw on
@@ -1791,69 +2732,55 @@ class ImageGen:
         stroke_fill = self.get_index_color(element.get('stroke_fill', 'white'))
         direction = element.get('direction', 'right')  # right, down, up, left
 
-        # Load MDI font and metadata
-        font_file = os.path.join(os.path.dirname(__file__), 'materialdesignicons-webfont.ttf')
-        meta_file = os.path.join(os.path.dirname(__file__), "materialdesignicons-webfont_meta.json")
-
-        try:
-            def load_meta():
-                with open(meta_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-
-            mdi_data = await self.hass.async_add_executor_job(load_meta)
-        except Exception as e:
-            raise HomeAssistantError(f"Failed to load MDI metadata: {str(e)}")
-
-        # Load font
-        def load_font():
-            return ImageFont.truetype(font_file, size)
-
-        font = await self.hass.async_add_executor_job(load_font)
+        # MDI index is loaded by _prefetch_icon before rendering
+        font = get_mdi_font(size)
 
         max_y = y_start
         max_x = x_start
         current_x = x_start
         current_y = y_start
 
+        # Icons used more than once are rasterized once and stamped
+        icon_counts = Counter(icon_name.removeprefix("mdi:") for icon_name in element['icons'])
+        stamps = {}
+
+        def draw_icon(icon_draw, ink, x, y):
+            icon_draw.text(
+                (x, y),
+                icon_chr,
+                fill=ink(fill),
+                font=font,
+                anchor=anchor,
+                stroke_width=stroke_width,
+                stroke_fill=ink(stroke_fill)
+            )
+
         # Draw each icon in sequence
         for icon_name in element['icons']:
-            if icon_name.startswith("mdi:"):
-                icon_name = icon_name[4:]
-
-            # Find icon codepoint
-            chr_hex = None
-            # Search direct matches
-            for icon in mdi_data:
-                if icon['name'] == icon_name:
-                    chr_hex = icon['codepoint']
-                    break
-
-            # Search aliases if no direct match
-            if not chr_hex:
-                for icon in mdi_data:
-                    if 'aliases' in icon and icon_name in icon['aliases']:
-                        chr_hex = icon['codepoint']
-                        break
-
-            if not chr_hex:
+            icon_name = icon_name.removeprefix("mdi:")
+
+            # Find icon character
+            icon_chr = lookup_icon(self._mdi_index, icon_name)
+            if not icon_chr:
                 _LOGGER.warning(f"Invalid icon name: {icon_name}")
                 continue
 
             # Draw icon
             try:
-                draw.text(
-                    (current_x, current_y),
-                    chr(int(chr_hex, 16)),
-                    fill=fill,
-                    font=font,
-                    anchor=anchor,
-                    stroke_width=stroke_width,
-                    stroke_fill=stroke_fill
-                )
+                if icon_counts[icon_name] > 1 and isinstance(current_x, int) and isinstance(current_y, int):
+                    if icon_chr not in stamps:
+                        left, top, right, bottom = draw.textbbox(
+                            (0, 0), icon_chr, font=font, anchor=anchor, stroke_width=stroke_width
+                        )
+                        stamps[icon_chr] = make_stamp(img, (left - 2, top - 2, right + 2, bottom + 2), draw_icon)
+                    stamps[icon_chr].paste(img, (current_x, current_y))
+                else:
+                    draw_icon(draw, lambda color: color, current_x, current_y)
+
                 # Calculate bounds for this icon
                 bbox = draw.textbbox(
                     (current_x, current_y),
-                    chr(int(chr_hex, 16)),
+                    icon_chr,
                     font=font,
                     anchor=anchor
                 )
@@ -1875,10 +2802,12 @@ class ImageGen:
 
         return max(max_y, current_y)
 
-    async def _draw_qrcode(self, img: Image, element: dict, pos_y: int) -> int:
+    def _draw_qrcode(self, img: Image, element: dict, pos_y: int) -> int:
         """Draw QR code element.
 
         Generates and renders a QR code with the specified data and properties.
+        Bitmaps are memoized by render_qr_code, so a label showing the same
+        data on every refresh only builds its QR code once.
 
         Args:
             img: PIL Image to draw on
@@ -1910,27 +2839,21 @@ class ImageGen:
         boxsize = element.get('boxsize', 2)
 
         try:
-            # Create QR code instance
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_H,
-                box_size=boxsize,
-                border=border,
+            # Render the QR code, or reuse the bitmap of an identical one
+            qr_img = render_qr_code(
+                str(element['data']),
+                qrcode.constants.ERROR_CORRECT_H,
+                boxsize,
+                border,
+                tuple(color[:3]),  # Convert RGBA to RGB
+                tuple(bgcolor[:3]),
             )
 
-            # Add data and generate QR code
-            qr.add_data(element['data'])
-            qr.make(fit=True)
-
-            # Create QR code image
-            qr_img = qr.make_image(fill_color=color[:3], back_color=bgcolor[:3])  # Convert RGBA to RGB
-            qr_img = qr_img.convert("RGBA")
-
-            # Calculate position
-            position = (x, y)
-
-            # Paste QR code onto main image
-            img.paste(qr_img, position, qr_img)
+            # Paste QR code onto main image, it is fully opaque and only
+            # uses palette colors, so it maps exactly onto a palette canvas
+            if img.mode == 'P':
+                qr_img = qr_img.quantize(palette=img, dither=Image.Dither.NONE)
+            img.paste(qr_img, (x, y))
 
             # Return bottom position
             return y + qr_img.height
@@ -1938,22 +2861,30 @@ class ImageGen:
         except Exception as e:
             raise HomeAssistantError(f"Failed to generate QR code: {str(e)}")
 
-    async def _draw_downloaded_image(self, img: Image, element: dict, pos_y: int) -> int:
-        """Draw downloaded or local image.
+    async def _prefetch_downloaded_image(self, element: dict) -> dict:
+        """Fetch the source image of a dlimg element.
+
+        Resolves image/camera entities to their picture URL and loads the
+        raw image bytes from a URL, data URI or local path, so that decoding
+        and compositing can happen in the render worker. Web images are
+        served by the image fetcher's cache while younger than the
+        configured TTL.
 
-        Downloads and renders an image from a URL, or loads and renders
-        an image from a local path or data URI.
+        Image/camera entities are versioned by their last state update. If
+        the processed bitmap of the current version is cached, the picture
+        is not downloaded at all; a new version drops the tiles of the
+        previous one.
 
         Args:
-            img: PIL Image to draw on
             element: Element dictionary with image properties
-            pos_y: Current Y position for automatic positioning
 
         Returns:
-            int: Updated Y position after drawing
+            dict: Copy of the element with the cached tile under "_tile",
+                or the raw bytes under "_image_data". For entities, the
+                bitmap cache source is under "_source".
 
         Raises:
-            HomeAssistantError: If image loading or processing fails
+            HomeAssistantError: If the image cannot be loaded
         """
         self.check_required_arguments(
             element,
@@ -1961,25 +2892,31 @@ class ImageGen:
             "dlimg"
         )
 
+        url = element['url']
+        is_entity = url.startswith(('image.', 'camera.'))
         try:
-            # Get image properties
-            pos_x = element['x']
-            pos_y = element['y']
-            target_size = (element['xsize'], element['ysize'])
-            rotate = element.get('rotate', 0)
-            resize_method = element.get('resize_method', 'stretch')
-
             # Check if URL is an image entity
-            if element['url'].startswith('image.') or element['url'].startswith('camera.'):
+            if is_entity:
                 # Get state of the image entity
-                state = self.hass.states.get(element['url'])
+                state = self.hass.states.get(url)
                 if not state:
-                    raise HomeAssistantError(f"Image entity {element['url']} not found")
+                    raise HomeAssistantError(f"Image entity {url} not found")
+
+                source = ("entity", url, state.last_updated.timestamp())
+                previous = self._entity_sources.get(url)
+                if previous != source:
+                    if previous is not None:
+                        self._bitmap_cache.discard(previous)
+                    self._entity_sources[url] = source
+
+                tile = self._bitmap_cache.get(self._bitmap_key(element, source))
+                if tile is not None:
+                    return {**element, "_source": source, "_tile": tile}
 
                 # Get image URL from entity attributes
                 image_url = state.attributes.get("entity_picture")
                 if not image_url:
-                    raise HomeAssistantError(f"No image URL found for entity {element['url']}")
+                    raise HomeAssistantError(f"No image URL found for entity {url}")
 
                 # If the URL is relative, make it absolute using HA's base URL
                 if image_url.startswith("/"):
@@ -1987,76 +2924,316 @@ class ImageGen:
                     image_url = f"{base_url}{image_url}"
 
                 # Update URL to the actual image URL
-                element['url'] = image_url
+                url = image_url
 
             # Load image based on URL type
-            if element['url'].startswith(('http://', 'https://')):
-                # Download web image
-                response = await self.hass.async_add_executor_job(
-                    requests.get, element['url'])
-                if response.status_code != 200:
-                    raise HomeAssistantError(f"Failed to download image: HTTP {response.status_code}")
-                source_img = Image.open(io.BytesIO(response.content))
-
-            elif element['url'].startswith('data:'):
+            if url.startswith(('http://', 'https://')):
+                # Download web image, entity pictures are always revalidated
+                options = self._get_image_fetch_options()
+                if is_entity:
+                    options["ttl"] = 0
+                image_data = await self._image_fetcher.async_fetch(url, **options)
+
+            elif url.startswith('data:'):
                 # Handle data URI
                 try:
-                    header, encoded = element['url'].split(',', 1)
+                    header, encoded = url.split(',', 1)
                     if ';base64' in header:
-                        decoded = base64.b64decode(encoded)
+                        image_data = base64.b64decode(encoded)
                     else:
-                        decoded = urllib.parse.unquote_to_bytes(encoded)
-                    source_img = Image.open(io.BytesIO(decoded))
+                        image_data = urllib.parse.unquote_to_bytes(encoded)
                 except Exception as e:
                     raise HomeAssistantError(f"Invalid data URI: {str(e)}")
 
             else:
                 # Handle local file
-                if not element['url'].startswith('/'):
+                if not url.startswith('/'):
                     media_path = self.hass.config.path('media')
-                    full_path = os.path.join(media_path, element['url'])
+                    full_path = os.path.join(media_path, url)
                 else:
-                    full_path = element['url']
-                source_img = await self.hass.async_add_executor_job(Image.open, full_path)
+                    full_path = url
 
-            # Process image
-            if rotate:
-                source_img = source_img.rotate(-rotate, expand=True)
+                def read_file():
+                    with open(full_path, 'rb') as f:
+                        return f.read()
 
-            # Resize if needed
-            if source_img.size != target_size:
-                if resize_method in ['crop', 'cover', 'contain']:
-                    source_img = resizeimage.resize(resize_method, source_img, target_size)
-                elif resize_method != 'stretch':
-                    _LOGGER.warning(f"Warning: resize_method is set to unsupported method '{resize_method}', this will result in simple stretch resizing")
+                image_data = await self.hass.async_add_executor_job(read_file)
+
+        except HomeAssistantError:
+            raise
+        except Exception as e:
+            raise HomeAssistantError(f"Failed to process image: {str(e)}")
+
+        prefetched = {**element, "_image_data": image_data}
+        if is_entity:
+            prefetched["_source"] = source
+        return prefetched
 
-                if source_img.size != target_size:
-                    source_img = source_img.resize(target_size)
+    @staticmethod
+    def _bitmap_key(element: dict, source: tuple) -> tuple:
+        """Get the bitmap cache key of a dlimg element.
+
+        Args:
+            element: Element dictionary with image properties
+            source: Identity of the source image, content hash or entity
+                state version
+
+        Returns:
+            tuple: (source, xsize, ysize, resize_method, rotate)
+        """
+        return (
+            source,
+            element['xsize'],
+            element['ysize'],
+            element.get('resize_method', 'stretch'),
+            element.get('rotate', 0),
+        )
+
+    def _draw_downloaded_image(self, img: Image, element: dict, pos_y: int) -> int:
+        """Draw downloaded or local image.
+
+        Decodes the image bytes fetched by _prefetch_downloaded_image and
+        renders them at the requested position and size. Processed tiles
+        are cached by content hash (or entity state version) and target
+        geometry, so an unchanged image is only decoded and resized once.
+
+        Args:
+            img: PIL Image to draw on
+            element: Element dictionary with image properties
+            pos_y: Current Y position for automatic positioning
 
-            # Convert to RGBA
-            source_img = source_img.convert("RGBA")
+        Returns:
+            int: Updated Y position after drawing
+
+        Raises:
+            HomeAssistantError: If image processing fails
+        """
+        try:
+            # Get image properties
+            pos_x = element['x']
+            pos_y = element['y']
+            target_size = (element['xsize'], element['ysize'])
 
-            # Create temporary image for composition
-            temp_img = Image.new("RGBA", img.size)
-            temp_img.paste(source_img, (pos_x, pos_y), source_img)
+            source_img = element.get('_tile')
+            if source_img is None:
+                source = element.get('_source')
+                if source is None:
+                    source = ("content", hashlib.sha256(element['_image_data']).hexdigest())
+                    source_img = self._bitmap_cache.get(self._bitmap_key(element, source))
+                if source_img is None:
+                    source_img = self._process_downloaded_image(element)
+                    self._bitmap_cache.put(self._bitmap_key(element, source), source_img)
 
-            # Composite images
-            img_composite = Image.alpha_composite(img, temp_img)
-            img.paste(img_composite, (0, 0))
+            paste_tile(img, source_img, (pos_x, pos_y))
 
             return pos_y + target_size[1]
 
         except Exception as e:
             raise HomeAssistantError(f"Failed to process image: {str(e)}")
 
-    async def _draw_plot(self, img: Image, element: dict, pos_y: int) -> int:
+    @staticmethod
+    def _process_downloaded_image(element: dict) -> Image:
+        """Decode, rotate and resize the source image of a dlimg element.
+
+        Args:
+            element: Element dictionary with the raw bytes under "_image_data"
+
+        Returns:
+            Image: Image of the target size, "RGB" if it is fully opaque
+                and "RGBA" otherwise
+        """
+        target_size = (element['xsize'], element['ysize'])
+        rotate = element.get('rotate', 0)
+        resize_method = element.get('resize_method', 'stretch')
+
+        source_img = Image.open(io.BytesIO(element['_image_data']))
+
+        # Process image
+        if rotate:
+            source_img = source_img.rotate(-rotate, expand=True)
+
+        # Resize if needed
+        if source_img.size != target_size:
+            if resize_method in ['crop', 'cover', 'contain']:
+                source_img = resizeimage.resize(resize_method, source_img, target_size)
+            elif resize_method != 'stretch':
+                _LOGGER.warning(f"Warning: resize_method is set to unsupported method '{resize_method}', this will result in simple stretch resizing")
+
+            if source_img.size != target_size:
+                source_img = source_img.resize(target_size)
+
+        # Convert to RGBA, keep opaque images as RGB for paste_tile
+        source_img = source_img.convert("RGBA")
+        if source_img.getextrema()[3][0] == 255:
+            return source_img.convert("RGB")
+        return source_img
+
+    def _get_plot_statistics_period(self, element: dict, duration: timedelta) -> Optional[str]:
+        """Get the statistics period a plot element is drawn from.
+
+        Args:
+            element: Element dictionary with plot properties
+            duration: Time range of the plot
+
+        Returns:
+            str: "5minute" or "hour", or None to use the state history
+        """
+        use_statistics = element.get("statistics", "auto")
+        if use_statistics == "auto":
+            threshold = self._get_plot_statistics_threshold()
+            use_statistics = threshold is not None and duration >= threshold
+        if not use_statistics:
+            return None
+        return "5minute" if duration <= PLOT_SHORT_TERM_STATISTICS_MAX else "hour"
+
+    async def _prefetch_plots(self, elements: List[dict]) -> List[dict | Exception]:
+        """Fetch the recorder data needed by all plot elements of a payload.
+
+        Plots spanning at least the configured statistics threshold (or
+        with "statistics" set to true) read the recorder's 5-minute or
+        hourly mean/min/max statistics instead of every state row. Entities
+        without mean statistics fall back to the state history, which is
+        served by the history cache so repeated renders only fetch the
+        states recorded since the previous one.
+
+        Instead of one set of queries per plot, the entities of all plots
+        are merged: one statistics query per period and one history
+        lookup, each covering the longest requested duration. Every plot
+        then gets the part of the result within its own time range, so
+        the render worker only has to process and draw.
+
+        Args:
+            elements: Plot element dictionaries
+
+        Returns:
+            list: Per element, a copy of the element with the time range
+                under "_start" and "_end", the numeric history under
+                "_series" and statistics rows under "_statistics", or the
+                exception that prevented fetching its data
+        """
+        end = dt.now()
+        specs = []
+        for element in elements:
+            try:
+                self.check_required_arguments(element, ["data"], "plot")
+                duration = timedelta(seconds=element.get("duration", 60 * 60 * 24))
+                specs.append((
+                    element,
+                    end - duration,
+                    [plot["entity"] for plot in element["data"]],
+                    self._get_plot_statistics_period(element, duration),
+                ))
+            except Exception as e:
+                specs.append(e)
+        valid = [spec for spec in specs if not isinstance(spec, Exception)]
+
+        try:
+            recorder = get_instance(self.hass)
+
+            # One statistics query per period for all plots using it
+            statistics_by_period = {}
+            for period in {spec[3] for spec in valid if spec[3]}:
+                period_specs = [spec for spec in valid if spec[3] == period]
+                entity_ids = {entity_id for spec in period_specs for entity_id in spec[2]}
+                rows = await recorder.async_add_executor_job(partial(statistics_during_period,
+                                                                     self.hass,
+                                                                     min(spec[1] for spec in period_specs),
+                                                                     end,
+                                                                     entity_ids,
+                                                                     period,
+                                                                     None,
+                                                                     {"mean", "min", "max"}
+                                                                     ))
+                statistics_by_period[period] = rows
+
+            # Per plot, keep statistics rows within its range
+            plot_statistics = []
+            for element, start, entity_ids, period in valid:
+                statistics = {}
+                start_ts = start.timestamp()
+                for entity_id, entity_rows in statistics_by_period.get(period, {}).items():
+                    if entity_id not in entity_ids:
+                        continue
+                    entity_rows = [row for row in entity_rows if row["start"] >= start_ts]
+                    if any(row.get("mean") is not None for row in entity_rows):
+                        statistics[entity_id] = entity_rows
+                plot_statistics.append(statistics)
+
+            # One history lookup for everything else
+            history_specs = [
+                (spec, [entity_id for entity_id in spec[2] if entity_id not in statistics])
+                for spec, statistics in zip(valid, plot_statistics)
+            ]
+            history_ids = [entity_id for _, entity_ids in history_specs for entity_id in entity_ids]
+            history = {}
+            if history_ids:
+                history_start = min(spec[1] for spec, entity_ids in history_specs if entity_ids)
+                history = await self._history_cache.async_get(history_ids, history_start, end)
+        except Exception as e:
+            error = HomeAssistantError(f"Failed to draw plot: {str(e)}")
+            return [spec if isinstance(spec, Exception) else error for spec in specs]
+
+        results = iter(zip(history_specs, plot_statistics))
+        prefetched = []
+        for spec in specs:
+            if isinstance(spec, Exception):
+                prefetched.append(spec)
+                continue
+            ((element, start, _, _), entity_ids), statistics = next(results)
+            all_series = {
+                entity_id: series_since(*history[entity_id], start.timestamp())
+                for entity_id in entity_ids
+                if entity_id in history
+            }
+            prefetched.append(
+                {**element, "_start": start, "_end": end, "_series": all_series, "_statistics": statistics}
+            )
+        return prefetched
+
+    @staticmethod
+    def _statistics_to_points(
+            rows: list[dict],
+            value_scale: float
+    ) -> tuple[tuple[np.ndarray, np.ndarray], Optional[tuple[np.ndarray, np.ndarray, np.ndarray]]]:
+        """Convert recorder statistics rows to plot points.
+
+        Each row is placed at the middle of its period.
+
+        Args:
+            rows: Statistics rows with "start", "end", "mean", "min" and "max"
+            value_scale: Factor applied to all values
+
+        Returns:
+            tuple: ((timestamps, means), envelope) where the envelope is a
+                (timestamps, lows, highs) tuple of arrays, or None if the
+                rows have no min/max
+        """
+        rows = [row for row in rows if row.get("mean") is not None]
+        timestamps = np.array([(row["start"] + row.get("end", row["start"])) / 2 for row in rows], dtype=float)
+        means = np.array([row["mean"] for row in rows], dtype=float) * value_scale
+
+        bounded = [row.get("min") is not None and row.get("max") is not None for row in rows]
+        if not any(bounded):
+            return (timestamps, means), None
+        mask = np.array(bounded)
+        scaled_min = np.array([row["min"] if ok else 0 for row, ok in zip(rows, bounded)], dtype=float) * value_scale
+        scaled_max = np.array([row["max"] if ok else 0 for row, ok in zip(rows, bounded)], dtype=float) * value_scale
+        envelope = (
+            timestamps[mask],
+            np.minimum(scaled_min, scaled_max)[mask],
+            np.maximum(scaled_min, scaled_max)[mask],
+        )
+        return (timestamps, means), envelope
+
+    def _draw_plot(self, img: Image, element: dict, pos_y: int) -> int:
         """Draw plot of Home Assistant sensor data.
 
         Creates a line plot visualization of historical data from Home Assistant
         entities with customizable axes, legends, and styling.
 
-        This is one of the most complex drawing methods, handling data retrieval,
-        scaling, and rendering of multiple data series and plot components.
+        This is one of the most complex drawing methods, handling scaling and
+        rendering of multiple data series and plot components. The history
+        itself is fetched beforehand by _prefetch_plots.
 
         Args:
             img: PIL Image to draw on
@@ -2069,12 +3246,6 @@ class ImageGen:
         Raises:
             HomeAssistantError: If plot generation fails
         """
-        self.check_required_arguments(
-            element,
-            ["data"],
-            "plot"
-        )
-
         try:
             draw = ImageDraw.Draw(img)
 
@@ -2087,9 +3258,9 @@ class ImageGen:
             height = y_end - y_start + 1
 
             # Get time range
-            duration = timedelta(seconds=element.get("duration", 60 * 60 * 24))
-            end = dt.now()
-            start = end - duration
+            start = element["_start"]
+            end = element["_end"]
+            duration = end - start
 
             # Set up font
             font_name = element.get("font", "ppb.ttf")
@@ -2098,58 +3269,46 @@ class ImageGen:
             min_v = element.get("low")
             max_v = element.get("high")
 
-            # Fetch sensor data
-            all_states = await get_instance(self.hass).async_add_executor_job(partial(get_significant_states,
-                                                                                      self.hass,
-                                                                                      start_time=start,
-                                                                                      entity_ids=[plot["entity"] for
-                                                                                                  plot in
-                                                                                                  element["data"]],
-                                                                                      significant_changes_only=False,
-                                                                                      minimal_response=True,
-                                                                                      no_attributes=False
-                                                                                      ))
+            all_series = element["_series"]
+            all_statistics = element.get("_statistics", {})
 
             # Process data and find min/max if not specified
             raw_data = []
+            envelopes = []
             for plot in element["data"]:
-                if plot["entity"] not in all_states:
-                    raise HomeAssistantError(f"No recorded data found for {plot['entity']}")
-
-                states = all_states[plot["entity"]]
-                state_obj = states[0]
-                states[0] = {
-                    "state": state_obj.state,
-                    "last_changed": str(state_obj.last_changed)
-                }
-
-                # Convert states to points
-                points = []
                 value_scale = plot.get("value_scale", 1.0)
-                for state in states:
-                    try:
-                        value = float(state["state"]) * value_scale
-                        timestamp = datetime.fromisoformat(state["last_changed"])
-                        points.append((timestamp, value))
-                    except (ValueError, TypeError):
-                        continue
+                envelope = None
 
-                if not points:
+                if plot["entity"] in all_statistics:
+                    # Convert statistics to mean points and a min/max envelope
+                    points, envelope = self._statistics_to_points(all_statistics[plot["entity"]], value_scale)
+                    if not plot.get("envelope", True):
+                        envelope = None
+                else:
+                    if plot["entity"] not in all_series:
+                        raise HomeAssistantError(f"No recorded data found for {plot['entity']}")
+
+                    # Scale the numeric history as a whole
+                    timestamps, series_values = all_series[plot["entity"]]
+                    points = (
+                        np.frombuffer(timestamps, dtype=float),
+                        np.frombuffer(series_values, dtype=float) * value_scale,
+                    )
+
+                if not len(points[0]):
                     continue
 
                 # Update min/max
-                values = [p[1] for p in points]
-                if min_v is None:
-                    min_v = min(values) if values else None
-                else:
-                    min_v = min(min_v, min(values))
-
-                if max_v is None:
-                    max_v = max(values) if values else None
-                else:
-                    max_v = max(max_v, max(values))
+                series_min = float(points[1].min())
+                series_max = float(points[1].max())
+                if envelope is not None and len(envelope[0]):
+                    series_min = min(series_min, float(envelope[1].min()))
+                    series_max = max(series_max, float(envelope[2].max()))
+                min_v = series_min if min_v is None else min(min_v, series_min)
+                max_v = series_max if max_v is None else max(max_v, series_max)
 
                 raw_data.append(points)
+                envelopes.append(envelope)
 
             if not raw_data:
                 raise HomeAssistantError("No valid data points found")
@@ -2590,15 +3749,22 @@ class ImageGen:
                             )
                     curr_time += timedelta(seconds=time_interval)
             # Draw data
-            for plot_data, plot_config in zip(raw_data, element["data"]):
+            start_ts = start.timestamp()
+            duration_s = duration.total_seconds()
+            plot_box = (diag_x, diag_y, diag_width, diag_height)
+            for plot_data, envelope, plot_config in zip(raw_data, envelopes, element["data"]):
+                # Draw the min/max band behind the line
+                if envelope is not None and len(envelope[0]) > 1:
+                    timestamps, lows, highs = envelope
+                    upper = to_screen(timestamps, highs, start_ts, duration_s, min_v, spread, plot_box)
+                    lower = to_screen(timestamps, lows, start_ts, duration_s, min_v, spread, plot_box)
+                    envelope_color = self.get_index_color(plot_config.get("envelope_color", "half_black"))
+                    band = clip_polygon(np.concatenate([upper, lower[::-1]]), plot_box)
+                    if len(band) > 2:
+                        draw.polygon(band.ravel().tolist(), fill=envelope_color)
+
                 # Convert data points to screen coordinates
-                points = []
-                for timestamp, value in plot_data:
-                    rel_time = (timestamp - start) / duration
-                    rel_value = (value - min_v) / spread
-                    x = round(diag_x + rel_time * (diag_width - 1))
-                    y = round(diag_y + (1 - rel_value) * (diag_height - 1))
-                    points.append((x, y))
+                points = to_screen(*plot_data, start_ts, duration_s, min_v, spread, plot_box)
 
                 # Draw line
                 if len(points) > 1:
@@ -2608,86 +3774,26 @@ class ImageGen:
                     smooth = plot_config.get("smooth", False)
                     steps = plot_config.get("smooth_steps", 10)
 
-                    if smooth and len(points) > 2:
-                        # Create a smoothed line using quadratic Bézier curves
-                        smooth_coords = []
-
-                        def catmull_rom(p0, p1, p2, p3, t):
-                            t2 = t * t
-                            t3 = t2 * t
-
-                            return (
-                                int(0.5 * (
-                                        (-t3 + 2 * t2 - t) * p0[0] +
-                                        (3 * t3 - 5 * t2 + 2) * p1[0] +
-                                        (-3 * t3 + 4 * t2 + t) * p2[0] +
-                                        (t3 - t2) * p3[0]
-                                )),
-                                int(0.5 * (
-                                        (-t3 + 2 * t2 - t) * p0[1] +
-                                        (3 * t3 - 5 * t2 + 2) * p1[1] +
-                                        (-3 * t3 + 4 * t2 + t) * p2[1] +
-                                        (t3 - t2) * p3[1]
-                                ))
-                            )
+                    # Cut the line where it leaves the plot area
+                    for piece in clip_polyline(points, plot_box):
+                        piece_smooth = smooth and len(piece) > 2
 
-                        smooth_coords.append(points[0])
-                        # Handle first segment specially (duplicate first point)
-                        if len(points) > 3:
-                            p0 = points[0]
-                            p1 = points[0]
-                            p2 = points[1]
-                            p3 = points[2]
-
-                            for i in range(1, steps):
-                                t = i / steps
-                                point = catmull_rom(p0, p1, p2, p3, t)
-                                smooth_coords.append(point)
-
-                        # Handle middle segments
-                        for i in range(len(points) - 3):
-                            p0 = points[i]
-                            p1 = points[i + 1]
-                            p2 = points[i + 2]
-                            p3 = points[i + 3]
-
-                            for j in range(steps):
-                                t = j / steps
-                                point = catmull_rom(p0, p1, p2, p3, t)
-                                smooth_coords.append(point)
-
-                        # Handle last segment specially (duplicate last point)
-                        if len(points) > 3:
-                            p0 = points[-3]
-                            p1 = points[-2]
-                            p2 = points[-1]
-                            p3 = points[-1]
-
-                            for i in range(1, steps):
-                                t = i / steps
-                                point = catmull_rom(p0, p1, p2, p3, t)
-                                smooth_coords.append(point)
-
-                        # Add last point
-                        smooth_coords.append(points[-1])
+                        # Create a smoothed line using Catmull-Rom splines
+                        line = catmull_rom_spline(piece, steps) if piece_smooth else piece
 
-                        draw.line(
-                            smooth_coords,
-                            fill=line_color,
-                            width=line_width,
-                            joint="curve"
-                        )
+                        # Bound drawing to the plot width, markers still use every point
+                        line = line[downsample_indices(
+                            line[:, 0], line[:, 1], plot_config.get("downsample", DOWNSAMPLE_MINMAX), diag_width
+                        )]
 
-                    else:
-                        draw.line(
-                            points,
-                            fill=line_color,
-                            width=line_width
-                        )
+                        if piece_smooth:
+                            draw.line(line.ravel().tolist(), fill=line_color, width=line_width, joint="curve")
+                        else:
+                            draw.line(line.ravel().tolist(), fill=line_color, width=line_width)
                     if plot_config.get("show_points", False):
                         point_size = plot_config.get("point_size", 3)
                         point_color = self.get_index_color(plot_config.get("point_color", "black"))
-                        for x, y in points:
+                        for x, y in marker_positions(points, plot_box).tolist():
                             draw.ellipse(
                                 [(x - point_size, y - point_size), (x + point_size, y + point_size)],
                                 fill=point_color
@@ -2697,7 +3803,7 @@ class ImageGen:
         except Exception as e:
             raise HomeAssistantError(f"Failed to draw plot: {str(e)}")
 
-    async def _draw_progress_bar(self, img: Image, element: dict, pos_y: int) -> int:
+    def _draw_progress_bar(self, img: Image, element: dict, pos_y: int) -> int:
         """Draw progress bar with optional percentage text.
 
         Renders a progress bar to visualize a percentage value, with options
@@ -2813,7 +3919,7 @@ class ImageGen:
 
         return y_end
 
-    async def _draw_diagram(self, img: Image, element: dict, pos_y: int) -> int:
+    def _draw_diagram(self, img: Image, element: dict, pos_y: int) -> int:
         """Draw diagram with optional bars.
 
         Renders a basic diagram with axes and optional bar chart elements.
@@ -2914,11 +4020,12 @@ class ImageGen:
 
         return pos_y + height
 
-    async def _draw_debug_grid(self, img: Image, element: dict, pos_y: int) -> int:
+    def _draw_debug_grid(self, img: Image, element: dict, pos_y: int) -> int:
         """Draw debug grid for layout assistance.
 
         Renders a grid with optional coordinate labels to help with positioning
-        other elements during development.
+        other elements during development. Grid lines are rasterized once
+        per direction and stamped.
 
         Args:
             img: PIL Image to draw on
@@ -2945,23 +4052,33 @@ class ImageGen:
         font = self._font_manager.get_font(font_name, label_font_size)
 
         # Helper to draw one line as dashed or solid
-        def draw_line_segment(p1, p2):
+        def draw_line_segment(line_draw, ink, p1, p2):
             if dashed:
                 self._draw_dashed_line(
-                    draw,
+                    line_draw,
                     p1,
                     p2,
                     dash_length,
                     space_length,
-                    fill=line_color,
+                    fill=ink(line_color),
                     width=1
                 )
             else:
-                draw.line([p1, p2], fill=line_color, width=1)
+                line_draw.line([p1, p2], fill=ink(line_color), width=1)
+
+        # All horizontal and all vertical lines are identical
+        horizontal = make_stamp(
+            img, (-1, -1, width + 2, 2),
+            lambda line_draw, ink, x, y: draw_line_segment(line_draw, ink, (x, y), (x + width, y))
+        )
+        vertical = make_stamp(
+            img, (-1, -1, 2, height + 2),
+            lambda line_draw, ink, x, y: draw_line_segment(line_draw, ink, (x, y), (x, y + height))
+        )
 
         # Horizontal lines
         for y in range(0, height, spacing):
-            draw_line_segment((0, y), (width, y))
+            horizontal.paste(img, (0, y))
 
             # Labels
             if show_labels and (y % label_step == 0):
@@ -2971,7 +4088,7 @@ class ImageGen:
 
         # Vertical lines
         for x in range(0, width, spacing):
-            draw_line_segment((x, 0), (x, height))
+            vertical.paste(img, (x, 0))
 
             # Labels
             if show_labels and (x % label_step == 0):
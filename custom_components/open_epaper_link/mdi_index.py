@@ -0,0 +1,169 @@
+"""Material Design Icons lookup for OpenEPaperLink image generation."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from functools import lru_cache
+
+from PIL import ImageFont
+
+_LOGGER = logging.getLogger(__name__)
+
+MDI_FONT_FILE = os.path.join(os.path.dirname(__file__), "materialdesignicons-webfont.ttf")
+MDI_META_FILE = os.path.join(os.path.dirname(__file__), "materialdesignicons-webfont_meta.json")
+
+# Name of the index file in Home Assistant's .storage directory
+MDI_INDEX_FILE = "open_epaper_link.mdi_index"
+
+# Bump when the layout of the index file changes
+INDEX_VERSION = 3
+
+_index: dict[str, int] | None = None
+_index_lock = threading.Lock()
+
+
+def build_mdi_index(meta: list[dict]) -> dict[str, int]:
+    """Build the icon name lookup from the MDI metadata.
+
+    Icon names take precedence over aliases. If several icons share an
+    alias, the first icon in the metadata wins, matching a linear search
+    of the metadata.
+
+    Args:
+        meta: Parsed materialdesignicons-webfont_meta.json
+
+    Returns:
+        dict: Mapping of icon name or alias to codepoint
+    """
+    index = {icon["name"]: int(icon["codepoint"], 16) for icon in meta}
+    for icon in meta:
+        for alias in icon.get("aliases", []):
+            index.setdefault(alias, int(icon["codepoint"], 16))
+    return index
+
+
+def _get_source_info() -> dict:
+    """Identify the current version of the MDI metadata.
+
+    Only stats the file, reading the metadata is what the index avoids.
+
+    Returns:
+        dict: Modification time and size of the metadata file
+    """
+    stat = os.stat(MDI_META_FILE)
+    return {
+        "source_mtime": stat.st_mtime_ns,
+        "source_size": stat.st_size,
+    }
+
+
+def _load_index_file(index_file: str, source: dict) -> dict[str, int] | None:
+    """Load the persisted index if it matches the current metadata.
+
+    Args:
+        index_file: Path of the stored index
+        source: Metadata file info from _get_source_info
+
+    Returns:
+        dict: The icon index, or None if it is missing or stale
+    """
+    try:
+        with open(index_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if data.get("version") != INDEX_VERSION or any(
+        data.get(key) != value for key, value in source.items()
+    ):
+        return None
+    return data.get("icons")
+
+
+def _save_index_file(index_file: str, index: dict[str, int], source: dict) -> None:
+    """Persist the index.
+
+    Failing to write is not an error, the index is simply rebuilt in the
+    next process.
+
+    Args:
+        index_file: Path to store the index at
+        index: Icon index to store
+        source: Info of the metadata file it was built from
+    """
+    data = {"version": INDEX_VERSION, **source, "icons": index}
+    tmp_file = f"{index_file}.tmp"
+    try:
+        os.makedirs(os.path.dirname(index_file), exist_ok=True)
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_file, index_file)
+    except OSError as err:
+        _LOGGER.debug("Could not store MDI index %s: %s", index_file, err)
+
+
+def get_mdi_index(storage_dir: str | None = None) -> dict[str, int]:
+    """Get the icon name lookup, loading it once per process.
+
+    Uses the compact index file in storage_dir when it was built from the
+    current metadata, checked by modification time and size.
+    Otherwise builds it from the full metadata and stores it there.
+
+    This does blocking I/O on first use and must be called from an
+    executor.
+
+    Args:
+        storage_dir: Directory for the index file, usually Home Assistant's
+            .storage directory. The index is not persisted if not given.
+
+    Returns:
+        dict: Mapping of icon name or alias to codepoint
+    """
+    global _index
+    if _index is not None:
+        return _index
+
+    with _index_lock:
+        if _index is None:
+            index_file = os.path.join(storage_dir, MDI_INDEX_FILE) if storage_dir else None
+            source = _get_source_info()
+            index = _load_index_file(index_file, source) if index_file else None
+            if index is None:
+                _LOGGER.debug("Building MDI index from %s", MDI_META_FILE)
+                with open(MDI_META_FILE, "r", encoding="utf-8") as f:
+                    index = build_mdi_index(json.load(f))
+                if index_file:
+                    _save_index_file(index_file, index, source)
+            _index = index
+    return _index
+
+
+def lookup_icon(index: dict[str, int], icon_name: str) -> str | None:
+    """Get the character for an icon name.
+
+    Args:
+        index: Icon index from get_mdi_index
+        icon_name: Icon name or alias, with or without "mdi:" prefix
+
+    Returns:
+        str: The icon character, or None if the name is unknown
+    """
+    if icon_name.startswith("mdi:"):
+        icon_name = icon_name[4:]
+    codepoint = index.get(icon_name)
+    return chr(codepoint) if codepoint is not None else None
+
+
+@lru_cache(maxsize=32)
+def get_mdi_font(size: int) -> ImageFont.FreeTypeFont:
+    """Get the MDI font at a given size.
+
+    Args:
+        size: Font size in pixels
+
+    Returns:
+        ImageFont.FreeTypeFont: The loaded icon font
+    """
+    return ImageFont.truetype(MDI_FONT_FILE, size)
@@ -0,0 +1,241 @@
+"""Vectorized plot geometry for OpenEPaperLink image generation."""
+from __future__ import annotations
+
+from functools import lru_cache
+
+import numpy as np
+
+
+def to_screen(
+        timestamps: np.ndarray,
+        values: np.ndarray,
+        start: float,
+        duration: float,
+        min_v: float,
+        spread: float,
+        box: tuple[int, int, int, int]
+) -> np.ndarray:
+    """Map data points to pixel coordinates of the plot area.
+
+    Coordinates are neither rounded nor limited to the plot area, so lines
+    can be clipped at the exact point where they leave it.
+
+    Args:
+        timestamps: UNIX timestamps of the points
+        values: Values of the points
+        start: UNIX timestamp at the left edge
+        duration: Seconds between the left and right edge
+        min_v: Value at the bottom edge
+        spread: Value range between the bottom and top edge
+        box: Plot area as (x, y, width, height)
+
+    Returns:
+        np.ndarray: Float (n, 2) array of screen coordinates
+    """
+    x0, y0, width, height = box
+    rel_time = (np.asarray(timestamps, dtype=float) - start) / duration
+    rel_value = (np.asarray(values, dtype=float) - min_v) / spread
+
+    points = np.empty((len(rel_time), 2), dtype=float)
+    points[:, 0] = x0 + rel_time * (width - 1)
+    points[:, 1] = y0 + (1 - rel_value) * (height - 1)
+    return points
+
+
+def _bounds(box: tuple[int, int, int, int]) -> tuple[np.ndarray, np.ndarray]:
+    """Get the lowest and highest pixel coordinates inside the plot area."""
+    x0, y0, width, height = box
+    return np.array([x0, y0], dtype=float), np.array([x0 + width - 1, y0 + height - 1], dtype=float)
+
+
+def _round(points: np.ndarray) -> np.ndarray:
+    """Round screen coordinates to pixels."""
+    return np.round(points).astype(np.int64).reshape(-1, 2)
+
+
+def clip_polyline(points: np.ndarray, box: tuple[int, int, int, int]) -> list[np.ndarray]:
+    """Clip a polyline to the plot area.
+
+    Every segment is clipped with the Liang-Barsky algorithm, so a segment
+    leaving the plot area ends where it crosses the edge and keeps its
+    slope. A line that leaves and re-enters the plot area is split into
+    separate pieces.
+
+    Args:
+        points: Float (n, 2) array of screen coordinates
+        box: Plot area as (x, y, width, height)
+
+    Returns:
+        list: Integer (m, 2) arrays of the visible pieces, each with at
+            least two points
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if len(points) < 2:
+        return []
+    low, high = _bounds(box)
+    begin = points[:-1]
+    delta = points[1:] - begin
+
+    # Parameters along each segment where it enters and leaves the area
+    t_enter = np.zeros(len(delta))
+    t_exit = np.ones(len(delta))
+    visible = np.ones(len(delta), dtype=bool)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for p, q in (
+            (-delta, begin - low),
+            (delta, high - begin),
+        ):
+            for axis in (0, 1):
+                p_axis, q_axis = p[:, axis], q[:, axis]
+                t = q_axis / p_axis
+                t_enter = np.where(p_axis < 0, np.maximum(t_enter, t), t_enter)
+                t_exit = np.where(p_axis > 0, np.minimum(t_exit, t), t_exit)
+                visible &= (p_axis != 0) | (q_axis >= 0)
+    visible &= t_enter <= t_exit
+
+    index = np.flatnonzero(visible)
+    if len(index) == 0:
+        return []
+    entered = begin[index] + t_enter[index, None] * delta[index]
+    left = begin[index] + t_exit[index, None] * delta[index]
+
+    # A segment continues the previous piece if both share an inside vertex
+    continues = np.zeros(len(index), dtype=bool)
+    continues[1:] = (np.diff(index) == 1) & (t_exit[index[:-1]] == 1) & (t_enter[index[1:]] == 0)
+
+    pairs = np.stack([entered, left], axis=1)
+    keep = np.stack([~continues, np.ones(len(index), dtype=bool)], axis=1)
+    coords = _round(pairs[keep])
+
+    # Each piece starts with the entry point of a segment that does not continue
+    offsets = np.cumsum(keep.sum(axis=1)) - keep.sum(axis=1)
+    return np.split(coords, offsets[~continues][1:])
+
+
+def clip_polygon(points: np.ndarray, box: tuple[int, int, int, int]) -> np.ndarray:
+    """Clip a polygon to the plot area.
+
+    Uses the Sutherland-Hodgman algorithm, one edge of the plot area at a
+    time. Edges crossing the plot area edge are cut where they cross it.
+
+    Args:
+        points: Float (n, 2) array of polygon vertices
+        box: Plot area as (x, y, width, height)
+
+    Returns:
+        np.ndarray: Integer (m, 2) array of the clipped vertices, empty if
+            the polygon is outside the plot area
+    """
+    polygon = np.asarray(points, dtype=float).reshape(-1, 2)
+    low, high = _bounds(box)
+    for axis, limit, sign in ((0, low[0], 1), (0, high[0], -1), (1, low[1], 1), (1, high[1], -1)):
+        if len(polygon) == 0:
+            break
+        previous = np.roll(polygon, 1, axis=0)
+        distance = sign * (polygon[:, axis] - limit)
+        previous_distance = np.roll(distance, 1)
+        inside = distance >= 0
+        crosses = inside != (previous_distance >= 0)
+
+        # Cut each crossing edge where it meets the limit
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = previous_distance / (previous_distance - distance)
+        crossing = previous + np.where(crosses, t, 0)[:, None] * (polygon - previous)
+        crossing[:, axis] = np.where(crosses, limit, crossing[:, axis])
+
+        pairs = np.stack([crossing, polygon], axis=1)
+        polygon = pairs[np.stack([crosses, inside], axis=1)]
+    return _round(polygon)
+
+
+def marker_positions(points: np.ndarray, box: tuple[int, int, int, int]) -> np.ndarray:
+    """Get the distinct positions at which point markers are drawn.
+
+    Points outside the plot area get no marker. Markers of the same size
+    and color at the same position draw the same pixels, so each position
+    only needs to be drawn once.
+
+    Args:
+        points: Float (n, 2) array of screen coordinates
+        box: Plot area as (x, y, width, height)
+
+    Returns:
+        np.ndarray: Integer (m, 2) array of unique points
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    low, high = _bounds(box)
+    inside = np.all((points >= low) & (points <= high), axis=1)
+    return np.unique(_round(points[inside]), axis=0)
+
+
+@lru_cache(maxsize=16)
+def _catmull_rom_basis(steps: int, first: int) -> np.ndarray:
+    """Get the Catmull-Rom basis weights for evenly spaced t values.
+
+    Args:
+        steps: Number of subdivisions per segment
+        first: First step index to evaluate (0 or 1)
+
+    Returns:
+        np.ndarray: Read-only (steps - first, 4) array of weights
+    """
+    t = np.arange(first, steps) / steps
+    t2 = t * t
+    t3 = t2 * t
+    basis = np.stack([
+        -t3 + 2 * t2 - t,
+        3 * t3 - 5 * t2 + 2,
+        -3 * t3 + 4 * t2 + t,
+        t3 - t2,
+    ], axis=1)
+    basis.flags.writeable = False
+    return basis
+
+
+def _evaluate(segments: np.ndarray, basis: np.ndarray) -> np.ndarray:
+    """Evaluate Catmull-Rom segments.
+
+    Args:
+        segments: (m, 4, 2) array of control points per segment
+        basis: (k, 4) array of weights
+
+    Returns:
+        np.ndarray: (m * k, 2) integer points, truncated like int()
+    """
+    weighted = (
+        basis[None, :, 0, None] * segments[:, None, 0, :]
+        + basis[None, :, 1, None] * segments[:, None, 1, :]
+        + basis[None, :, 2, None] * segments[:, None, 2, :]
+        + basis[None, :, 3, None] * segments[:, None, 3, :]
+    )
+    return np.trunc(0.5 * weighted).astype(np.int64).reshape(-1, 2)
+
+
+def catmull_rom_spline(points: np.ndarray, steps: int) -> np.ndarray:
+    """Smooth a polyline with a Catmull-Rom spline through its points.
+
+    All segments are evaluated at once. The first and last segment use
+    the duplicated end point as outer control point.
+
+    Args:
+        points: Integer (n, 2) array of points, n > 2
+        steps: Number of subdivisions per segment
+
+    Returns:
+        np.ndarray: Integer (m, 2) array of points along the curve
+    """
+    points = np.asarray(points)
+    parts = [points[:1]]
+    if len(points) > 3:
+        first = np.stack([points[0], points[0], points[1], points[2]])[None]
+        parts.append(_evaluate(first, _catmull_rom_basis(steps, 1)))
+
+        # Middle segments p[i]..p[i+3] as a strided (m, 4, 2) view
+        middle = np.lib.stride_tricks.sliding_window_view(points, 4, axis=0).transpose(0, 2, 1)
+        parts.append(_evaluate(middle, _catmull_rom_basis(steps, 0)))
+
+        last = np.stack([points[-3], points[-2], points[-1], points[-1]])[None]
+        parts.append(_evaluate(last, _catmull_rom_basis(steps, 1)))
+    parts.append(points[-1:])
+    return np.concatenate(parts)
+
@@ -0,0 +1,71 @@
+"""Memoized QR code rendering for OpenEPaperLink image generation."""
+from __future__ import annotations
+
+import math
+from bisect import bisect_left
+from functools import lru_cache
+
+import qrcode
+from PIL import Image
+from qrcode import util
+
+# Number of rendered QR code bitmaps kept in memory
+QR_CODE_CACHE_SIZE = 64
+
+
+def estimate_version(data: str, error_correction: int) -> int:
+    """Estimate the smallest QR code version that could hold the data.
+
+    Numeric mode, the densest encoding, needs 10 bits per 3 characters
+    plus a 4 bit mode indicator and at least an 8 bit length field, so
+    no version with less capacity can fit the data. Starting the version
+    search there gives the same version as starting at 1.
+
+    Args:
+        data: Text to encode
+        error_correction: qrcode.constants.ERROR_CORRECT_* level
+
+    Returns:
+        int: Lower bound for the version, between 1 and 40
+    """
+    needed_bits = 4 + 8 + math.ceil(len(data) * 10 / 3)
+    version = bisect_left(util.BIT_LIMIT_TABLE[error_correction], needed_bits, 1)
+    return min(version, 40)
+
+
+@lru_cache(maxsize=QR_CODE_CACHE_SIZE)
+def render_qr_code(
+        data: str,
+        error_correction: int,
+        box_size: int,
+        border: int,
+        fill_color: tuple[int, int, int],
+        back_color: tuple[int, int, int]
+) -> Image.Image:
+    """Render a QR code bitmap, memoized by content and style.
+
+    Building a QR code tries all eight mask patterns and draws the result
+    box by box, which is far more work than pasting it. Labels usually
+    show the same data on every refresh, so the finished bitmap is cached.
+    The returned image is shared and must not be modified.
+
+    Args:
+        data: Text to encode
+        error_correction: qrcode.constants.ERROR_CORRECT_* level
+        box_size: Pixels per module
+        border: Quiet zone width in modules
+        fill_color: RGB color of the dark modules
+        back_color: RGB color of the light modules
+
+    Returns:
+        Image: Opaque RGB bitmap of the QR code
+    """
+    qr = qrcode.QRCode(
+        version=estimate_version(data, error_correction),
+        error_correction=error_correction,
+        box_size=box_size,
+        border=border,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr.make_image(fill_color=fill_color, back_color=back_color).convert("RGB")
@@ -200,6 +200,16 @@ AP_SENSOR_TYPES: tuple[OpenEPaperLinkSensorEntityDescription, ...] = (
         entity_category=EntityCategory.DIAGNOSTIC,
         value_fn=lambda data: int(data.get("ps_ram_free", 0)),
         icon="mdi:memory",
+    ),
+    OpenEPaperLinkSensorEntityDescription(
+        key="upload_rate",
+        name="Upload Rate",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement="uploads/min",
+        suggested_display_precision=1,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda data: data.get("upload_rate"),
+        icon="mdi:upload-network",
     )
 )
 """Definitions for all AP-related sensor entities.
@@ -214,6 +224,7 @@ Sensor types include:
 - System metrics (heap, database size, uptime)
 - Tag statistics (count, low battery, timeout)
 - Operational state (AP state, run state)
+- Image upload rate chosen by the adaptive upload throttle
 
 Each sensor uses a value_fn to extract the relevant data from
 the hub's AP status dictionary.
@@ -2,20 +2,19 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from datetime import datetime
 from typing import Final
 
-import async_timeout
 import requests
 
-from requests_toolbelt import MultipartEncoder
-
 from homeassistant.core import HomeAssistant, ServiceCall
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from .const import DOMAIN
-from .imagegen import ImageGen
+from .imagegen import ImageGen, get_payload_hash
 from .tag_types import get_tag_types_manager
+from .upload_queue import PRIORITIES, PRIORITY_NORMAL, UploadQueueHandler
+from .uploader import MultipartBody, async_post_multipart
 from .util import send_tag_cmd, reboot_ap
 
 _LOGGER: Final = logging.getLogger(__name__)
@@ -126,123 +125,29 @@ async def get_entity_id_from_device_id(hass: HomeAssistant, device_id: str) -> s
     return f"{DOMAIN}.{domain_mac[1].lower()}"
 
 
-class UploadQueueHandler:
-    """Handle queued image uploads to the AP.
-
-    Manages a queue of image upload tasks to prevent overwhelming the AP with concurrent requests.
+def get_render_group_key(tag_type, accent_color: str, service_data: dict, payload_hash: str) -> tuple:
+    """Get the key identifying targets that render to the same image.
 
-    Features include:
+    Tags of the same hardware type with the same accent color produce
+    identical images for identical drawing parameters, so a drawcustom
+    call only has to render once per key.
 
-    - Maximum concurrent upload limit
-    - Cooldown period between uploads
-    - Task tracking and status reporting
+    Args:
+        tag_type: Tag type of the target
+        accent_color: Accent color of the target
+        service_data: Service data containing image parameters
+        payload_hash: Hash of the payload from get_payload_hash
 
-    This helps maintain AP stability while processing multiple image requests from different parts of Home Assistant.
+    Returns:
+        tuple: Hashable (hw_type, accent, rotate, background, payload) key
     """
-
-    def __init__(self, max_concurrent: int = 1, cooldown: float = 1.0):
-        """Initialize the upload queue handler.
-
-        Args:
-            max_concurrent: Maximum number of concurrent uploads (default: 1)
-            cooldown: Cooldown period in seconds between uploads (default: 1.0)
-        """
-        self._queue = asyncio.Queue()
-        self._processing = False
-        self._max_concurrent = max_concurrent
-        self._cooldown = cooldown
-        self._active_uploads = 0
-        self._last_upload = None
-        self._lock = asyncio.Lock()
-
-    def __str__(self):
-        """Return queue status string."""
-        return f"Queue(active={self._active_uploads}, size={self._queue.qsize()})"
-
-    async def add_to_queue(self, upload_func, *args, **kwargs):
-        """Add an upload task to the queue.
-
-        Queues an upload function with its arguments for later execution.
-        Starts the queue processor if it's not already running.
-
-        Args:
-            upload_func: Async function that performs the actual upload
-            *args: Positional arguments to pass to the upload function
-            **kwargs: Keyword arguments to pass to the upload function
-        """
-
-        entity_id = next((arg for arg in args if isinstance(arg, str) and "." in arg), "unknown")
-
-        _LOGGER.debug("Adding upload task to queue for %s. %s", entity_id, self)
-        # Add task to queue
-        await self._queue.put((upload_func, args, kwargs))
-
-        # Start processing queue if not already running
-        if not self._processing:
-            _LOGGER.debug("Starting upload queue processor for %s", entity_id)
-            asyncio.create_task(self._process_queue())
-
-    async def _process_queue(self):
-        """Process queued upload tasks.
-
-        Long-running task that processes the upload queue, respecting:
-
-        - Maximum concurrent upload limit
-        - Cooldown period between uploads
-
-        Handles errors in individual uploads without stopping queue processing.
-        This method runs until the queue is empty, then terminates.
-        """
-        self._processing = True
-        _LOGGER.debug("Upload queue processor started. %s", self)
-
-        try:
-            while not self._queue.empty():
-                async with self._lock:
-                    # Check if the upload limit has been reached
-                    if self._active_uploads >= self._max_concurrent:
-                        _LOGGER.debug("Hit concurrent upload limit (%d). Waiting...", self._max_concurrent)
-                        await asyncio.sleep(0.1)
-                        continue
-
-                    # Check cooldown period
-                    if self._last_upload:
-                        elapsed = (datetime.now() - self._last_upload).total_seconds()
-                        if elapsed < self._cooldown:
-                            _LOGGER.debug("In cooldown period (%.1f seconds remaining)",
-                                          self._cooldown - elapsed)
-                            await asyncio.sleep(self._cooldown - elapsed)
-
-                    # Get next task from queue
-                    upload_func, args, kwargs = await self._queue.get()
-
-                    entity_id = next((arg for arg in args if isinstance(arg, str) and "." in arg), "unknown")
-
-                    try:
-                        # Increment active uploads counter
-                        self._active_uploads += 1
-                        _LOGGER.debug("Starting upload for %s. %s", entity_id, self)
-
-                        # Perform upload
-                        _LOGGER.debug("Starting queued upload task")
-                        start_time = datetime.now()
-                        await upload_func(*args, **kwargs)
-                        duration = (datetime.now() - start_time).total_seconds()
-
-                        # Update last upload timestamp
-                        self._last_upload = datetime.now()
-                        _LOGGER.debug("Upload completed for %s in %.1f seconds", entity_id, duration)
-
-                    except Exception as err:
-                        _LOGGER.error("Error processing queued upload for %s: %s", entity_id, str(err))
-                    finally:
-                        # Decrement active upload counter
-                        self._active_uploads -= 1
-                        # Mark task as done
-                        self._queue.task_done()
-                        _LOGGER.debug("Upload task for %s finished. %s", entity_id, self)
-        finally:
-            self._processing = False
+    return (
+        tag_type.type_id,
+        accent_color,
+        service_data.get("rotate", 0),
+        service_data.get("background", "white"),
+        payload_hash,
+    )
 
 
 async def async_setup_services(hass: HomeAssistant) -> None:
@@ -263,8 +168,6 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         hass: Home Assistant instance
     """
 
-    upload_queue = UploadQueueHandler(max_concurrent=1, cooldown=1.0)
-
     async def get_hub():
         """Get the hub instance from Home Assistant data.
 
@@ -285,7 +188,22 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         """
         if DOMAIN not in hass.data or not hass.data[DOMAIN]:
             raise HomeAssistantError("Integration not configured")
-        return next(iter(hass.data[DOMAIN].values()))
+        # hass.data[DOMAIN] also holds the shared tag registry and upload queue
+        for entry in hass.config_entries.async_entries(DOMAIN):
+            if entry.entry_id in hass.data[DOMAIN]:
+                return hass.data[DOMAIN][entry.entry_id]
+        raise HomeAssistantError("Integration not configured")
+
+    # Stop the queue of a previous setup, so its dispatcher and throttle
+    # listener do not outlive it
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    previous_queue = domain_data.pop("upload_queue", None)
+    if previous_queue is not None:
+        await previous_queue.async_shutdown()
+
+    # Upload rate and concurrency follow the hub's adaptive throttle
+    upload_queue = UploadQueueHandler(throttle=(await get_hub()).upload_throttle)
+    domain_data["upload_queue"] = upload_queue
 
     async def drawcustom_service(service: ServiceCall) -> None:
         """Handle drawcustom service calls.
@@ -298,13 +216,16 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         - Background color and rotation
         - Dithering options
         - "Dry run" mode for testing
+        - Skipping tags that already show identical content, unless forced
+        - Upload priority, so interactive updates overtake bulk ones
 
         For each target device, the service:
 
-        1. Resolves device ID to entity ID
-        2. Generates image with the ImageGen component
-        3. Queues image upload to the AP
-        4. Collects and reports any errors
+        1. Resolves device ID to entity ID and tag type
+        2. Groups targets that would render the same image
+        3. Generates one image per group with the hub's ImageGen component
+        4. Queues image upload to the AP for every target in the group
+        5. Collects and reports any errors
 
         Args:
             service: Service call object with parameters and target devices
@@ -318,6 +239,12 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                 "AP is offline. Please check your network connection and AP status."
             )
 
+        priority = service.data.get("priority", PRIORITY_NORMAL)
+        if priority not in PRIORITIES:
+            raise HomeAssistantError(
+                f"Invalid priority: {priority}. Must be one of: {', '.join(PRIORITIES)}"
+            )
+
         label_ids = service.data.get("label_id", [])
         device_ids = service.data.get("device_id", [])
 
@@ -330,49 +257,26 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         for label_id in label_ids:
             device_ids.extend(await get_device_ids_from_label_id(hass, label_id))
 
-        generator = ImageGen(hass)
+        generator = hub.image_gen
         errors = []
 
-        # Process each device
+        # Serialize the payload once for grouping, compiling and fingerprinting
+        payload_hash = get_payload_hash(service.data.get("payload", []))
+
+        # Resolve all targets first and group those that render identically
+        targets = []
+        groups: dict[tuple, tuple] = {}
         for device_id in device_ids:
-            device_errors = []
             try:
                 # Get entity ID from device ID
                 entity_id = await get_entity_id_from_device_id(hass, device_id)
                 _LOGGER.debug("Processing device_id: %s (entity_id: %s)", device_id, entity_id)
 
                 try:
-                    # Generate image
-                    image_data = await generator.generate_custom_image(
-                        entity_id=entity_id,
-                        service_data=service.data,
-                        error_collector=device_errors
-                    )
-
-                    if device_errors:
-                        errors.extend([f"Device {entity_id}: {err}" for err in device_errors])
-                        _LOGGER.warning(
-                            "Completed with warnings for device %s:\n%s",
-                            device_id,
-                            "\n".join(device_errors)
-                        )
-
-                    if service.data.get("dry-run", False):
-                        _LOGGER.info("Dry run completed for %s", entity_id)
-                        continue
-
-                    # Queue the upload
-                    await upload_queue.add_to_queue(
-                        upload_image,
-                        hub,
-                        entity_id,
-                        image_data,
-                        service.data.get("dither", DITHER_DEFAULT),
-                        service.data.get("ttl", 60),
-                        service.data.get("preload_type", 0),
-                        service.data.get("preload_lut", 0)
-                    )
-
+                    tag_type, accent_color = await generator.get_tag_info(entity_id)
+                    group_key = get_render_group_key(tag_type, accent_color, service.data, payload_hash)
+                    groups.setdefault(group_key, (tag_type, accent_color))
+                    targets.append((device_id, entity_id, group_key))
                 except Exception as err:
                     error_msg = f"Error processing device {entity_id}: {str(err)}"
                     errors.append(error_msg)
@@ -385,16 +289,85 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                 _LOGGER.error(error_msg)
                 continue
 
+        force = service.data.get("force", False)
+
+        async def render_group(tag_type, accent_color):
+            """Render one image for a group of identical targets."""
+            group_errors = []
+            rendered = await generator.render_image(
+                tag_type, accent_color, service.data, group_errors, force=force, payload_hash=payload_hash
+            )
+            return rendered, group_errors
+
+        # Render each group once, letting the render pool work on them in parallel
+        _LOGGER.debug("Rendering %d image(s) for %d target(s)", len(groups), len(targets))
+        results = await asyncio.gather(
+            *(render_group(*group) for group in groups.values()),
+            return_exceptions=True
+        )
+        rendered = dict(zip(groups, results))
+
+        # Fan the rendered images out to their targets
+        for device_id, entity_id, group_key in targets:
+            try:
+                result = rendered[group_key]
+                if isinstance(result, Exception):
+                    raise result
+                image, device_errors = result
+
+                if device_errors:
+                    errors.extend([f"Device {entity_id}: {err}" for err in device_errors])
+                    _LOGGER.warning(
+                        "Completed with warnings for device %s:\n%s",
+                        device_id,
+                        "\n".join(device_errors)
+                    )
+
+                mac = entity_id.split(".")[1].upper()
+                if not force and generator.is_image_current(mac, image.fingerprint):
+                    _LOGGER.debug("Image for %s is unchanged, skipping upload", entity_id)
+                    continue
+
+                generator.async_save_image(entity_id, image.image_data)
+
+                if service.data.get("dry-run", False):
+                    _LOGGER.info("Dry run completed for %s", entity_id)
+                    continue
+
+                # Queue the upload
+                await upload_queue.add_to_queue(
+                    upload_image,
+                    hub,
+                    entity_id,
+                    image.image_data,
+                    service.data.get("dither", DITHER_DEFAULT),
+                    service.data.get("ttl", 60),
+                    service.data.get("preload_type", 0),
+                    service.data.get("preload_lut", 0),
+                    priority=priority,
+                    # Only clean renders may suppress later identical uploads
+                    fingerprint=None if device_errors else image.fingerprint
+                )
+
+            except Exception as err:
+                error_msg = f"Error processing device {entity_id}: {str(err)}"
+                errors.append(error_msg)
+                _LOGGER.error(error_msg)
+                continue
+
         if errors:
             raise HomeAssistantError("\n".join(errors))
 
     async def upload_image(hub, entity_id: str, img: bytes, dither: int, ttl: int,
-                           preload_type: int = 0, preload_lut: int = 0) -> None:
+                           preload_type: int = 0, preload_lut: int = 0,
+                           fingerprint: str | None = None) -> None:
         """Upload image to tag through AP.
 
         Sends an image to the AP for display on a specific tag using
         multipart/form-data POST request. Configures display parameters
-        such as dithering, TTL, and optional preloading.
+        such as dithering, TTL, and optional preloading. The body is
+        streamed over Home Assistant's shared session, which keeps the
+        connection to the AP alive between uploads.
 
         Will retry upload on timeout, with increasing backoff times
 
@@ -406,6 +379,8 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             ttl: Time-to-live in seconds
             preload_type: Type for image preloading (0=disabled)
             preload_lut: Look-up table for preloading
+            fingerprint: Content fingerprint recorded for the tag once the
+                upload succeeded, so identical images are not sent again
 
         Raises:
             HomeAssistantError: If upload fails or times out
@@ -420,41 +395,36 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         # Convert TTL fom seconds to minutes for the AP
         ttl_minutes = max(1, ttl // 60)
 
+        fields = [
+            ('mac', mac),
+            ('contentmode', "25"),
+            ('dither', str(dither)),
+            ('ttl', str(ttl_minutes)),
+            ('image', ('image.jpg', img, 'image/jpeg')),
+        ]
+
+        if preload_type > 0:
+            fields.extend([
+                ('preloadtype', str(preload_type)),
+                ('preloadlut', str(preload_lut)),
+            ])
+
+        # The body references the image without copying and is reused by retries
+        body = MultipartBody(fields)
+        session = async_get_clientsession(hass)
+
         backoff_delay = INITIAL_BACKOFF # Try up to MAX_RETRIES times to upload the image, retrying on TimeoutError.
 
         for attempt in range(1, MAX_RETRIES + 1):
             try:
+                status = await async_post_multipart(session, url, body)
 
-                # Create a new MultipartEncoder for each attempt
-                fields = {
-                    'mac': mac,
-                    'contentmode': "25",
-                    'dither': str(dither),
-                    'ttl': str(ttl_minutes),
-                    'image': ('image.jpg', img, 'image/jpeg'),
-                }
-
-                if preload_type > 0:
-                    fields.update({
-                        'preloadtype': str(preload_type),
-                        'preloadlut': str(preload_lut),
-                    })
-
-                mp_encoder = MultipartEncoder(fields=fields)
-
-                async with async_timeout.timeout(30):  # 30 second timeout for upload
-                    response = await hass.async_add_executor_job(
-                        lambda: requests.post(
-                            url,
-                            headers={'Content-Type': mp_encoder.content_type},
-                            data=mp_encoder
-                        )
-                    )
-
-                if response.status_code != 200:
+                if status != 200:
                     raise HomeAssistantError(
-                        f"Image upload failed for {entity_id} with status code: {response.status_code}"
+                        f"Image upload failed for {entity_id} with status code: {status}"
                     )
+                if fingerprint:
+                    hub.image_gen.remember_image(mac, fingerprint, img)
                 break
 
             except asyncio.TimeoutError:
@@ -543,9 +513,12 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         if isinstance(device_ids, str):
             device_ids = [device_ids]
 
+        hub = await get_hub()
         for device_id in device_ids:
             entity_id = await get_entity_id_from_device_id(hass, device_id)
             await send_tag_cmd(hass, entity_id, "clear")
+            # The tag no longer receives the last image, so it must be sent again
+            hub.image_gen.forget_image(entity_id.split(".")[1].upper())
 
     async def force_refresh_service(service: ServiceCall) -> None:
         """Handle force refresh service calls.
@@ -682,7 +655,8 @@ async def async_unload_services(hass: HomeAssistant) -> None:
 
     Removes all registered service handlers when the integration
     is unloaded. This prevents service calls to a non-existent
-    integration.
+    integration. The upload queue is shut down, dropping uploads that
+    have not started yet.
 
     Args:
         hass: Home Assistant instance
@@ -693,3 +667,7 @@ async def async_unload_services(hass: HomeAssistant) -> None:
     ]
     for service in services:
         hass.services.async_remove(DOMAIN, service)
+
+    upload_queue = hass.data.get(DOMAIN, {}).pop("upload_queue", None)
+    if upload_queue is not None:
+        await upload_queue.async_shutdown()
@@ -0,0 +1,112 @@
+"""Stamping of repeated primitives for OpenEPaperLink image generation."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+
+from PIL import Image, ImageDraw
+
+# Draws a primitive with its origin at (x, y), passing every color through
+# the ink function: draw_primitive(draw, ink, x, y)
+DrawPrimitive = Callable[[ImageDraw.ImageDraw, Callable[[Any], Any], int, int], None]
+
+
+def canvas_ink(img: Image.Image, color: Any) -> Any:
+    """Resolve a color to the ink ImageDraw would use on a canvas.
+
+    Palette canvases get the palette index of the color, adding it to the
+    canvas palette if needed, exactly as drawing on the canvas would.
+
+    Args:
+        img: Canvas the primitive is stamped onto
+        color: Color as accepted by ImageDraw, or None
+
+    Returns:
+        The color, or its palette index on "P" canvases
+    """
+    if color is None or img.mode != "P" or isinstance(color, int):
+        return color
+    return img.palette.getcolor(color, img)
+
+
+@dataclass(frozen=True)
+class Stamp:
+    """A primitive rasterized once for pasting at many positions.
+
+    Attributes:
+        tile: Pixels of the primitive, in the mode of the canvas
+        mask: "1" image of the pixels the primitive draws
+        offset: Position of the tile relative to the primitive's origin
+    """
+
+    tile: Image.Image
+    mask: Image.Image
+    offset: tuple[int, int] = (0, 0)
+
+    def paste(self, img: Image.Image, origin: tuple[int, int]) -> None:
+        """Draw the primitive with its origin at a canvas position.
+
+        Args:
+            img: Canvas to draw on
+            origin: Integer canvas position of the primitive's origin
+        """
+        img.paste(self.tile, (origin[0] + self.offset[0], origin[1] + self.offset[1]), self.mask)
+
+    def paste_all(self, img: Image.Image, origins: Iterable[tuple[int, int]]) -> None:
+        """Draw the primitive at several positions, in order.
+
+        Args:
+            img: Canvas to draw on
+            origins: Integer canvas positions of the primitive's origin
+        """
+        for origin in origins:
+            self.paste(img, origin)
+
+
+def make_stamp(
+        img: Image.Image,
+        box: tuple[int, int, int, int],
+        draw_primitive: DrawPrimitive
+) -> Stamp:
+    """Rasterize a primitive once so it can be stamped onto a canvas.
+
+    ImageDraw rasterizes at integer positions the same way wherever the
+    shape is, so pasting the tile gives the same pixels as drawing the
+    primitive again, as long as it is not anti-aliased and the positions
+    are integers. Text is drawn without anti-aliasing (fontmode "1").
+    The primitive is drawn twice: once in color and once into the mask,
+    which marks every pixel it draws.
+
+    Args:
+        img: Canvas the stamp will be pasted onto
+        box: (left, top, right, bottom) bounds of the primitive relative
+            to its origin; pixels outside are cut off
+        draw_primitive: Function drawing the primitive at its origin
+
+    Returns:
+        Stamp: The rasterized primitive
+    """
+    left, top, right, bottom = box
+    size = (max(1, right - left), max(1, bottom - top))
+
+    tile = Image.new(img.mode, size)
+    tile_draw = ImageDraw.Draw(tile)
+    tile_draw.fontmode = "1"
+    draw_primitive(tile_draw, lambda color: canvas_ink(img, color), -left, -top)
+
+    # Distinct inks stay distinct in the mask, ImageDraw skips outlines
+    # in the fill color
+    mask_inks: dict[Any, int] = {}
+
+    def mask_ink(color):
+        if color is None:
+            return None
+        ink = canvas_ink(img, color)
+        return mask_inks.setdefault(tuple(ink) if isinstance(ink, list) else ink, len(mask_inks) + 1)
+
+    mask = Image.new("L", size)
+    mask_draw = ImageDraw.Draw(mask)
+    mask_draw.fontmode = "1"
+    draw_primitive(mask_draw, mask_ink, -left, -top)
+
+    return Stamp(tile, mask.point(lambda value: 255 if value else 0, "1"), (left, top))
@@ -0,0 +1,152 @@
+"""Text measuring, truncation and wrapping for OpenEPaperLink image generation."""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+
+from PIL import ImageFont
+
+# Number of (font, text, mode) advance widths kept in memory
+TEXT_LENGTH_CACHE_SIZE = 8192
+
+# Advance widths keyed by (font path, size, text, mode). Keyed by the font
+# file rather than the font object, so the cache does not keep fonts alive
+# after the FontManager evicted them.
+_text_lengths: OrderedDict[tuple, float] = OrderedDict()
+_text_lengths_lock = threading.Lock()
+
+
+def text_length(font: ImageFont.FreeTypeFont, text: str, mode: str = "") -> float:
+    """Get the advance width of a string, memoized per font file and size.
+
+    Fonts are cached by the FontManager, so the same fonts are used for
+    every render and their measurements can be reused. Safe to call from
+    several render threads.
+
+    Args:
+        font: Font to measure with
+        text: Text to measure
+        mode: Font rendering mode. ImageDraw measures with its fontmode
+            ("1" for the bitmap rendering used here), which changes
+            hinting and therefore the width.
+
+    Returns:
+        float: Width of the text in pixels
+    """
+    key = (font.path, font.size, text, mode)
+    with _text_lengths_lock:
+        width = _text_lengths.get(key)
+        if width is not None:
+            _text_lengths.move_to_end(key)
+            return width
+
+    width = font.getlength(text, mode)
+    with _text_lengths_lock:
+        _text_lengths[key] = width
+        if len(_text_lengths) > TEXT_LENGTH_CACHE_SIZE:
+            _text_lengths.popitem(last=False)
+    return width
+
+
+def clear_text_length_cache() -> None:
+    """Forget all memoized text widths.
+
+    Called when the FontManager reloads its fonts, as font files may have
+    changed.
+    """
+    with _text_lengths_lock:
+        _text_lengths.clear()
+
+
+def truncate_text(
+        font: ImageFont.FreeTypeFont,
+        text: str,
+        max_width: float,
+        ellipsis: str = "...",
+        mode: str = ""
+) -> str:
+    """Shorten text with an ellipsis so it fits a width.
+
+    Binary searches for the longest prefix that still fits together with
+    the ellipsis, needing O(log n) measurements instead of one per
+    removed character.
+
+    Args:
+        font: Font to measure with
+        text: Text to truncate
+        max_width: Maximum width in pixels
+        ellipsis: Suffix marking the truncation
+        mode: Font rendering mode, see text_length
+
+    Returns:
+        str: The text unchanged if it fits, otherwise the truncated text
+    """
+    if text_length(font, text, mode) <= max_width:
+        return text
+
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if text_length(font, text[:middle] + ellipsis, mode) <= max_width:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low] + ellipsis
+
+
+def wrap_lines(
+        font: ImageFont.FreeTypeFont,
+        text: str,
+        max_width: float,
+        mode: str = ""
+) -> list[str]:
+    """Greedily wrap text on whitespace to fit a width.
+
+    Words are added to a line while the line fits; a word that is wider
+    than max_width on its own still gets a line of its own.
+
+    The break position of each line is first estimated by summing the
+    cached widths of the individual words, then confirmed by measuring
+    the joined line. Kerning and hinting make the sum slightly inexact,
+    so the estimate is corrected one word at a time, which typically
+    costs two measurements per line instead of one per word.
+
+    Args:
+        font: Font to measure with
+        text: Text to wrap
+        max_width: Maximum line width in pixels
+        mode: Font rendering mode, see text_length
+
+    Returns:
+        list: The wrapped lines
+    """
+    words = text.split()
+    space = text_length(font, " ", mode)
+    lines = []
+
+    def fits(start: int, end: int) -> bool:
+        return text_length(font, " ".join(words[start:end]), mode) <= max_width
+
+    start = 0
+    while start < len(words):
+        # Estimate where the line breaks from the individual word widths
+        end = start + 1
+        width = text_length(font, words[start], mode)
+        while end < len(words):
+            width += space + text_length(font, words[end], mode)
+            if width > max_width:
+                break
+            end += 1
+
+        # Correct the estimate against the measured line width
+        if fits(start, end):
+            while end < len(words) and fits(start, end + 1):
+                end += 1
+        else:
+            while end > start + 1 and not fits(start, end):
+                end -= 1
+
+        lines.append(" ".join(words[start:end]))
+        start = end
+
+    return lines
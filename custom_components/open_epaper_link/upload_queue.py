@@ -0,0 +1,430 @@
+"""Scheduling of image uploads to the OpenEPaperLink AP."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable
+
+from .upload_throttle import AdaptiveThrottle
+
+_LOGGER = logging.getLogger(__name__)
+
+PRIORITY_HIGH = "high"
+PRIORITY_NORMAL = "normal"
+PRIORITY_LOW = "low"
+
+# Upload priorities, most urgent first
+PRIORITIES = (PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW)
+
+# Share of upload starts each lane gets while all lanes have work
+DEFAULT_LANE_WEIGHTS = {PRIORITY_HIGH: 8, PRIORITY_NORMAL: 4, PRIORITY_LOW: 1}
+
+
+class TokenBucket:
+    """Token bucket limiting how often uploads start.
+
+    Tokens are added at a fixed rate up to a capacity, and every upload
+    takes one. A capacity of 1 spaces upload starts evenly, larger ones
+    allow short bursts after idle periods.
+
+    Attributes:
+        rate: Tokens added per second, infinite for no limit
+        capacity: Maximum number of tokens saved up
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        """Initialize a full token bucket.
+
+        Args:
+            rate: Tokens added per second, infinite for no limit
+            capacity: Maximum number of tokens saved up
+            clock: Monotonic time source in seconds
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+        self._changed = asyncio.Event()
+
+    def _refill(self) -> None:
+        """Add the tokens earned since the last update."""
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def set_rate(self, rate: float) -> None:
+        """Change the rate, waking a waiting acquire to recompute its delay.
+
+        Args:
+            rate: Tokens added per second, infinite for no limit
+        """
+        if not math.isinf(self.rate):
+            self._refill()
+        else:
+            self._tokens = self.capacity
+            self._updated = self._clock()
+        self.rate = rate
+        self._changed.set()
+
+    def delay(self) -> float:
+        """Get the seconds until a token is available.
+
+        Returns:
+            float: 0 if a token is available now
+        """
+        if math.isinf(self.rate):
+            return 0.0
+        self._refill()
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    async def acquire(self) -> None:
+        """Take a token, sleeping until one is available."""
+        while (delay := self.delay()) > 0:
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+        if not math.isinf(self.rate):
+            self._tokens -= 1
+
+
+@dataclass
+class Lane:
+    """Uploads of one priority and their wait statistics.
+
+    Attributes:
+        weight: Share of upload starts the lane gets while all lanes have work
+        order: Keys of the waiting uploads, oldest first
+        pass_value: Virtual time of the lane's next upload start
+        dispatched: Uploads started from the lane
+        total_wait: Seconds the started uploads waited in total
+        max_wait: Longest wait of a started upload, in seconds
+    """
+
+    weight: float
+    order: deque = field(default_factory=deque)
+    pass_value: float = 0.0
+    dispatched: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def stats(self) -> dict:
+        """Get the lane's depth and wait statistics.
+
+        Returns:
+            dict: Queue depth, weight, uploads started and average and
+                maximum wait in seconds
+        """
+        return {
+            "depth": len(self.order),
+            "weight": self.weight,
+            "dispatched": self.dispatched,
+            "avg_wait": self.total_wait / self.dispatched if self.dispatched else 0.0,
+            "max_wait": self.max_wait,
+        }
+
+
+class UploadQueueHandler:
+    """Handle queued image uploads to the AP.
+
+    Manages a queue of image upload tasks to prevent overwhelming the AP with concurrent requests.
+
+    Features include:
+
+    - Maximum concurrent upload limit
+    - Cooldown period between uploads
+    - Latest-wins coalescing of uploads queued for the same tag
+    - Priority lanes with weighted fair scheduling
+    - Task tracking and status reporting
+
+    The queue holds one entry per tag. Queuing an image for a tag that
+    already waits replaces the pending image in place, so the tag keeps
+    its position and only the newest image is sent. If the newer image
+    is more urgent, the tag moves to the back of the more urgent lane.
+
+    Every priority has its own lane, and lanes take turns by stride
+    scheduling: each lane advances its virtual time by 1/weight per
+    upload started, and the waiting lane with the lowest virtual time
+    goes next. With the default weights, a high priority upload waits
+    for at most one upload from each other lane, however long they are,
+    while low priority uploads still make progress. A lane that was
+    empty starts at the current virtual time, so idle time is not saved
+    up as credit.
+
+    A dispatcher task waits on a condition for queued uploads, takes a
+    concurrency slot from a semaphore and a token from the cooldown
+    bucket, and starts each upload as its own task, so up to
+    max_concurrent uploads run at the same time. Nothing polls: the
+    dispatcher sleeps until an upload is queued, a slot is freed or a
+    token is due.
+
+    With an adaptive throttle, the upload rate and the number of uploads
+    running at the same time follow the throttle, which adapts them to
+    the AP's load and is told the outcome of every upload.
+
+    This helps maintain AP stability while processing multiple image requests from different parts of Home Assistant.
+    """
+
+    def __init__(
+            self,
+            max_concurrent: int = 1,
+            cooldown: float = 1.0,
+            lane_weights: dict[str, float] | None = None,
+            throttle: AdaptiveThrottle | None = None
+    ):
+        """Initialize the upload queue handler.
+
+        Args:
+            max_concurrent: Maximum number of concurrent uploads (default: 1)
+            cooldown: Average seconds between upload starts (default: 1.0)
+            lane_weights: Weight per priority, DEFAULT_LANE_WEIGHTS if not given
+            throttle: Adaptive throttle replacing max_concurrent and cooldown
+        """
+        weights = lane_weights or DEFAULT_LANE_WEIGHTS
+        self._lanes = {priority: Lane(weights[priority]) for priority in PRIORITIES}
+        self._virtual_time = 0.0
+        self._pending: dict[object, list] = {}
+        self._coalesced = 0
+        self._throttle = throttle
+        self._remove_listener = None
+        if throttle is not None:
+            max_concurrent = throttle.max_concurrent
+            cooldown = 60 / throttle.rate
+            self._remove_listener = throttle.add_listener(self._apply_throttle)
+        self._max_concurrent = max_concurrent
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._bucket = TokenBucket(1 / cooldown if cooldown > 0 else math.inf)
+        self._condition = asyncio.Condition()
+        self._active_uploads = 0
+        self._dispatcher: asyncio.Task | None = None
+        self._uploads: set[asyncio.Task] = set()
+        self._closed = False
+
+    def __str__(self):
+        """Return queue status string."""
+        depths = "/".join(str(len(lane.order)) for lane in self._lanes.values())
+        return (f"Queue(active={self._active_uploads}, size={self.size}, "
+                f"lanes={depths}, coalesced={self._coalesced})")
+
+    @property
+    def size(self) -> int:
+        """Number of uploads waiting in all lanes."""
+        return len(self._pending)
+
+    @property
+    def coalesced(self) -> int:
+        """Number of queued uploads replaced by a newer image for the same tag."""
+        return self._coalesced
+
+    @property
+    def active_uploads(self) -> int:
+        """Number of uploads currently running."""
+        return self._active_uploads
+
+    @property
+    def stats(self) -> dict:
+        """Get queue statistics.
+
+        Returns:
+            dict: Running and coalesced uploads, and depth and wait
+                statistics per priority lane
+        """
+        return {
+            "active": self._active_uploads,
+            "coalesced": self._coalesced,
+            "lanes": {priority: lane.stats for priority, lane in self._lanes.items()},
+        }
+
+    def _apply_throttle(self) -> None:
+        """Follow a change of the throttle's rate or limits.
+
+        A higher concurrency takes effect when the next upload finishes.
+        """
+        self._bucket.set_rate(self._throttle.rate / 60)
+        for _ in range(self._throttle.max_concurrent - self._max_concurrent):
+            self._slots.release()
+            self._max_concurrent += 1
+
+    def _has_free_slot(self) -> bool:
+        """Check whether the throttle allows another upload to start."""
+        return self._throttle is None or self._active_uploads < self._throttle.concurrency
+
+    @staticmethod
+    def _get_entity_id(args: tuple) -> str:
+        """Find the tag entity ID among upload function arguments."""
+        return next((arg for arg in args if isinstance(arg, str) and "." in arg), "unknown")
+
+    async def add_to_queue(self, upload_func, *args, priority: str = PRIORITY_NORMAL, **kwargs):
+        """Add an upload task to the queue.
+
+        Queues an upload function with its arguments for later execution.
+        If an upload for the same tag is still waiting, it is replaced by
+        this one and keeps its place in the queue, unless this one is
+        more urgent. Starts the dispatcher if it's not already running.
+
+        Args:
+            upload_func: Async function that performs the actual upload
+            *args: Positional arguments to pass to the upload function
+            priority: Lane of the upload, one of PRIORITIES
+            **kwargs: Keyword arguments to pass to the upload function
+
+        Raises:
+            ValueError: If the priority is unknown
+            RuntimeError: If the queue has been shut down
+        """
+        if priority not in self._lanes:
+            raise ValueError(f"Unknown upload priority: {priority}")
+        if self._closed:
+            raise RuntimeError("Upload queue is shut down")
+
+        entity_id = self._get_entity_id(args)
+
+        # Uploads are keyed by tag MAC, uploads without a tag are never merged
+        key = entity_id.split(".")[1].upper() if entity_id != "unknown" else object()
+
+        async with self._condition:
+            pending = self._pending.get(key)
+            if pending is not None:
+                pending[1:4] = upload_func, args, kwargs
+                self._coalesced += 1
+                if PRIORITIES.index(priority) < PRIORITIES.index(pending[0]):
+                    self._lanes[pending[0]].order.remove(key)
+                    pending[0] = priority
+                    self._append(priority, key)
+                _LOGGER.debug("Replaced pending upload for %s with a newer image. %s", entity_id, self)
+            else:
+                _LOGGER.debug("Adding %s priority upload task to queue for %s. %s", priority, entity_id, self)
+                self._pending[key] = [priority, upload_func, args, kwargs, time.monotonic()]
+                self._append(priority, key)
+                self._condition.notify_all()
+
+        if self._dispatcher is None or self._dispatcher.done():
+            _LOGGER.debug("Starting upload queue dispatcher")
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    def _append(self, priority: str, key: object) -> None:
+        """Add a key to the back of a lane.
+
+        Args:
+            priority: Lane to add to
+            key: Key of the pending upload
+        """
+        lane = self._lanes[priority]
+        if not lane.order:
+            lane.pass_value = max(lane.pass_value, self._virtual_time)
+        lane.order.append(key)
+
+    def _next_lane(self) -> Lane:
+        """Pick the lane of the next upload.
+
+        Returns:
+            Lane: Waiting lane with the lowest virtual time, the most
+                urgent one on ties
+        """
+        waiting = [lane for lane in self._lanes.values() if lane.order]
+        return min(waiting, key=lambda lane: lane.pass_value)
+
+    async def join(self) -> None:
+        """Wait until the queue is empty and no upload is running."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self._pending and not self._active_uploads)
+
+    async def _dispatch(self) -> None:
+        """Start queued uploads as slots and tokens become available.
+
+        Long-running task that waits for queued uploads and starts them in
+        lane order, respecting:
+
+        - Maximum concurrent upload limit
+        - Cooldown period between uploads
+
+        Runs until the queue is shut down.
+        """
+        while True:
+            async with self._condition:
+                await self._condition.wait_for(lambda: self._pending)
+
+            await self._slots.acquire()
+            try:
+                async with self._condition:
+                    await self._condition.wait_for(self._has_free_slot)
+                await self._bucket.acquire()
+            except BaseException:
+                self._slots.release()
+                raise
+
+            async with self._condition:
+                # Get next task from the lane whose turn it is, with the
+                # latest image for its tag
+                lane = self._next_lane()
+                key = lane.order.popleft()
+                _, upload_func, args, kwargs, queued_at = self._pending.pop(key)
+
+                self._virtual_time = lane.pass_value
+                lane.pass_value += 1 / lane.weight
+                wait = time.monotonic() - queued_at
+                lane.dispatched += 1
+                lane.total_wait += wait
+                lane.max_wait = max(lane.max_wait, wait)
+                self._active_uploads += 1
+
+            task = asyncio.create_task(self._run_upload(upload_func, args, kwargs))
+            self._uploads.add(task)
+            task.add_done_callback(self._uploads.discard)
+
+    async def _run_upload(self, upload_func, args: tuple, kwargs: dict) -> None:
+        """Run one upload and free its slot.
+
+        Handles errors in individual uploads without affecting others.
+
+        Args:
+            upload_func: Async function that performs the actual upload
+            args: Positional arguments to pass to the upload function
+            kwargs: Keyword arguments to pass to the upload function
+        """
+        entity_id = self._get_entity_id(args)
+        _LOGGER.debug("Starting upload for %s. %s", entity_id, self)
+        start_time = time.monotonic()
+        try:
+            await upload_func(*args, **kwargs)
+            _LOGGER.debug("Upload completed for %s in %.1f seconds", entity_id, time.monotonic() - start_time)
+            if self._throttle is not None:
+                self._throttle.record_success()
+        except Exception as err:
+            _LOGGER.error("Error processing queued upload for %s: %s", entity_id, str(err))
+            if self._throttle is not None:
+                self._throttle.record_failure()
+        finally:
+            self._slots.release()
+            async with self._condition:
+                self._active_uploads -= 1
+                self._condition.notify_all()
+            _LOGGER.debug("Upload task for %s finished. %s", entity_id, self)
+
+    async def async_shutdown(self) -> None:
+        """Stop the queue.
+
+        Drops uploads that have not started, cancels running ones and
+        waits for them to finish. Later calls to add_to_queue fail.
+        """
+        self._closed = True
+        if self._remove_listener is not None:
+            self._remove_listener()
+            self._remove_listener = None
+        tasks = [task for task in (self._dispatcher, *self._uploads) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        if self._pending:
+            _LOGGER.debug("Dropped %d queued upload(s) on shutdown", len(self._pending))
+        for lane in self._lanes.values():
+            lane.order.clear()
+        self._pending.clear()
@@ -0,0 +1,225 @@
+"""Adaptive throttling of image uploads based on AP load."""
+from __future__ import annotations
+
+import logging
+import time
+from typing import Callable
+
+from .const import (
+    DEFAULT_UPLOAD_MAX_CONCURRENT,
+    DEFAULT_UPLOAD_MAX_PENDING,
+    DEFAULT_UPLOAD_MAX_RATE,
+    DEFAULT_UPLOAD_MIN_HEAP_KB,
+    DEFAULT_UPLOAD_MIN_RATE,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Upload rate the throttle starts at, in uploads per minute
+INITIAL_UPLOAD_RATE = 60
+
+# Uploads per minute added by each increase
+RATE_INCREASE = 6
+
+# Factor the rate and concurrency are multiplied with by each decrease
+DECREASE_FACTOR = 0.5
+
+# Seconds between two adjustments in the same direction
+ADJUST_INTERVAL = 10
+
+# Free PSRAM below which uploads are slowed down, in bytes; APs without
+# PSRAM report 0 and are not judged by it
+MIN_PS_RAM_FREE = 256 * 1024
+
+
+def _is_known_state(state: str | None) -> bool:
+    """Check whether an AP state reading carries information.
+
+    Sys messages without a state code are reported by the hub as
+    "Unknown: None", which says nothing about the AP's load.
+
+    Args:
+        state: AP state or run state as reported by the hub
+
+    Returns:
+        bool: True if the state is a recognized state name
+    """
+    return state is not None and not state.startswith("Unknown")
+
+
+class AdaptiveThrottle:
+    """AIMD controller for the upload rate and concurrency.
+
+    Works like TCP congestion control: while the AP is healthy, every
+    successful upload may raise the rate by RATE_INCREASE uploads per
+    minute, and once the rate is at its maximum, the concurrency by one.
+    When the AP looks overloaded or an upload fails, rate and concurrency
+    are halved. Increases and decreases are each spaced ADJUST_INTERVAL
+    apart, so one burst of bad news halves the rate once and the AP gets
+    time to recover before the rate climbs again.
+
+    The AP is considered overloaded when it is not online and running,
+    its free heap or PSRAM is low, or too many tags are still waiting
+    for an image.
+
+    Attributes:
+        min_rate: Lowest upload rate, in uploads per minute
+        max_rate: Highest upload rate, in uploads per minute
+        max_concurrent: Most uploads running at the same time
+        min_heap: Free AP heap below which uploads slow down, in bytes
+        max_pending: Tags waiting for an image above which uploads slow down
+        rate: Current upload rate, in uploads per minute
+        concurrency: Current number of uploads allowed at the same time
+        overload: Why the AP was last considered overloaded, or None
+    """
+
+    def __init__(
+            self,
+            min_rate: float = DEFAULT_UPLOAD_MIN_RATE,
+            max_rate: float = DEFAULT_UPLOAD_MAX_RATE,
+            max_concurrent: int = DEFAULT_UPLOAD_MAX_CONCURRENT,
+            min_heap: int = DEFAULT_UPLOAD_MIN_HEAP_KB * 1024,
+            max_pending: int = DEFAULT_UPLOAD_MAX_PENDING,
+            clock: Callable[[], float] = time.monotonic
+    ):
+        """Initialize the throttle at the initial rate and one upload at a time.
+
+        Args:
+            min_rate: Lowest upload rate, in uploads per minute
+            max_rate: Highest upload rate, in uploads per minute
+            max_concurrent: Most uploads running at the same time
+            min_heap: Free AP heap below which uploads slow down, in bytes
+            max_pending: Tags waiting for an image above which uploads slow down
+            clock: Monotonic time source in seconds
+        """
+        self._clock = clock
+        self._listeners: list[Callable[[], None]] = []
+        self._last_increase = float("-inf")
+        self._last_decrease = float("-inf")
+        self.overload: str | None = None
+        self.rate = INITIAL_UPLOAD_RATE
+        self.concurrency = 1
+        self.configure(min_rate, max_rate, max_concurrent, min_heap, max_pending)
+
+    def configure(
+            self,
+            min_rate: float,
+            max_rate: float,
+            max_concurrent: int,
+            min_heap: int,
+            max_pending: int
+    ) -> None:
+        """Change the limits, keeping the current rate within them.
+
+        Args:
+            min_rate: Lowest upload rate, in uploads per minute
+            max_rate: Highest upload rate, in uploads per minute
+            max_concurrent: Most uploads running at the same time
+            min_heap: Free AP heap below which uploads slow down, in bytes
+            max_pending: Tags waiting for an image above which uploads slow down
+        """
+        self.min_rate = min_rate
+        self.max_rate = max(min_rate, max_rate)
+        self.max_concurrent = max(1, max_concurrent)
+        self.min_heap = min_heap
+        self.max_pending = max_pending
+        self.rate = min(max(self.rate, self.min_rate), self.max_rate)
+        self.concurrency = min(self.concurrency, self.max_concurrent)
+        self._notify()
+
+    def add_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Register a function called whenever rate or concurrency change.
+
+        Args:
+            listener: Function called without arguments
+
+        Returns:
+            Callable: Function removing the listener
+        """
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def _notify(self) -> None:
+        """Call the listeners."""
+        for listener in list(self._listeners):
+            listener()
+
+    def _set(self, rate: float, concurrency: int) -> None:
+        """Apply a new rate and concurrency and notify the listeners if they changed."""
+        if (rate, concurrency) == (self.rate, self.concurrency):
+            return
+        self.rate = rate
+        self.concurrency = concurrency
+        self._notify()
+
+    def _find_overload(self, ap_status: dict, pending_tags: int) -> str | None:
+        """Check AP telemetry for signs of overload.
+
+        Args:
+            ap_status: AP status as reported by the hub
+            pending_tags: Number of tags waiting for an image
+
+        Returns:
+            str: Description of the first problem found, or None if healthy
+        """
+        ap_state = ap_status.get("ap_state")
+        if _is_known_state(ap_state) and ap_state != "Online":
+            return f"AP state is {ap_state}"
+        run_state = ap_status.get("run_state")
+        if _is_known_state(run_state) and run_state != "Running":
+            return f"AP run state is {run_state}"
+        heap = ap_status.get("heap")
+        if heap is not None and heap < self.min_heap:
+            return f"free heap is {heap} bytes"
+        ps_ram_free = ap_status.get("ps_ram_free")
+        if ps_ram_free and ps_ram_free < MIN_PS_RAM_FREE:
+            return f"free PSRAM is {ps_ram_free} bytes"
+        if pending_tags > self.max_pending:
+            return f"{pending_tags} tags are waiting for an image"
+        return None
+
+    def observe(self, ap_status: dict, pending_tags: int) -> None:
+        """Update the AP's health from its telemetry.
+
+        Backs off if the AP looks overloaded.
+
+        Args:
+            ap_status: AP status as reported by the hub
+            pending_tags: Number of tags waiting for an image
+        """
+        self.overload = self._find_overload(ap_status, pending_tags)
+        if self.overload is not None:
+            self._decrease(self.overload)
+
+    def record_success(self) -> None:
+        """Speed up after a successful upload while the AP is healthy."""
+        now = self._clock()
+        if self.overload is not None or now - self._last_increase < ADJUST_INTERVAL:
+            return
+        if now - self._last_decrease < ADJUST_INTERVAL:
+            return
+        self._last_increase = now
+        if self.rate < self.max_rate:
+            self._set(min(self.max_rate, self.rate + RATE_INCREASE), self.concurrency)
+        else:
+            self._set(self.rate, min(self.max_concurrent, self.concurrency + 1))
+
+    def record_failure(self) -> None:
+        """Back off after a failed upload."""
+        self._decrease("upload failed")
+
+    def _decrease(self, reason: str) -> None:
+        """Halve rate and concurrency, at most once per ADJUST_INTERVAL.
+
+        Args:
+            reason: Why the AP is considered overloaded, for logging
+        """
+        now = self._clock()
+        if now - self._last_decrease < ADJUST_INTERVAL:
+            return
+        self._last_decrease = now
+        rate = max(self.min_rate, self.rate * DECREASE_FACTOR)
+        concurrency = max(1, int(self.concurrency * DECREASE_FACTOR))
+        if (rate, concurrency) != (self.rate, self.concurrency):
+            _LOGGER.debug("Slowing uploads to %.1f per minute: %s", rate, reason)
+        self._set(rate, concurrency)
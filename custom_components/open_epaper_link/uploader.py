@@ -0,0 +1,127 @@
+"""Streaming multipart image uploads to the OpenEPaperLink AP."""
+from __future__ import annotations
+
+import uuid
+from typing import AsyncIterator, Union
+
+import aiohttp
+
+from .const import UPLOAD_CONNECT_TIMEOUT, UPLOAD_READ_TIMEOUT, UPLOAD_TOTAL_TIMEOUT
+
+# Bytes handed to the transport per write
+UPLOAD_CHUNK_SIZE = 16 * 1024
+
+# A form field value: plain text or (filename, data, content type)
+FieldValue = Union[str, tuple[str, bytes, str]]
+
+
+class MultipartBody:
+    """multipart/form-data body streamed from memoryviews.
+
+    The parts are laid out once as a list of segments. Text headers are
+    encoded, file data is referenced through memoryviews instead of being
+    copied into one large buffer, and large files are cut into chunks of
+    UPLOAD_CHUNK_SIZE. The size is known up front, so the body is sent
+    with a Content-Length instead of chunked transfer encoding, which
+    embedded web servers like the AP's often do not handle.
+
+    The body can be streamed any number of times, so retries reuse it.
+
+    Attributes:
+        boundary: Multipart boundary string
+        content_type: Value of the Content-Type header
+        size: Length of the body in bytes
+    """
+
+    def __init__(self, fields: list[tuple[str, FieldValue]], boundary: str | None = None):
+        """Lay out a multipart body.
+
+        Args:
+            fields: (name, value) pairs in the order they are sent
+            boundary: Boundary string, random if not given
+        """
+        self.boundary = boundary or uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self._segments: list[memoryview] = []
+
+        for name, value in fields:
+            if isinstance(value, tuple):
+                filename, data, content_type = value
+                header = (
+                    f'--{self.boundary}\r\n'
+                    f'Content-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                    f'Content-Type: {content_type}\r\n\r\n'
+                )
+                self._segments.append(memoryview(header.encode()))
+                view = memoryview(data)
+                for offset in range(0, len(view), UPLOAD_CHUNK_SIZE):
+                    self._segments.append(view[offset:offset + UPLOAD_CHUNK_SIZE])
+                self._segments.append(memoryview(b"\r\n"))
+            else:
+                part = (
+                    f'--{self.boundary}\r\n'
+                    f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+                    f'{value}\r\n'
+                )
+                self._segments.append(memoryview(part.encode()))
+        self._segments.append(memoryview(f"--{self.boundary}--\r\n".encode()))
+        self.size = sum(len(segment) for segment in self._segments)
+
+    async def chunks(self) -> AsyncIterator[memoryview]:
+        """Stream the body.
+
+        Yields:
+            memoryview: Consecutive segments of the body
+        """
+        for segment in self._segments:
+            yield segment
+
+
+def upload_timeout() -> aiohttp.ClientTimeout:
+    """Get the per-phase timeouts of an upload attempt.
+
+    Returns:
+        ClientTimeout: Connect, read and total timeouts
+    """
+    return aiohttp.ClientTimeout(
+        total=UPLOAD_TOTAL_TIMEOUT,
+        sock_connect=UPLOAD_CONNECT_TIMEOUT,
+        sock_read=UPLOAD_READ_TIMEOUT,
+    )
+
+
+async def async_post_multipart(
+        session: aiohttp.ClientSession,
+        url: str,
+        body: MultipartBody,
+        timeout: aiohttp.ClientTimeout | None = None
+) -> int:
+    """Stream a multipart body to a URL.
+
+    The response is read to the end so the connection goes back to the
+    session's pool and the next upload to the AP can reuse it.
+
+    Args:
+        session: Client session with a keep-alive connection pool
+        url: URL to post to
+        body: Body to send
+        timeout: Timeouts of the request, upload_timeout() if not given
+
+    Returns:
+        int: HTTP status of the response
+
+    Raises:
+        asyncio.TimeoutError: If a phase of the request timed out
+        aiohttp.ClientError: If the request failed
+    """
+    async with session.post(
+            url,
+            data=body.chunks(),
+            headers={
+                "Content-Type": body.content_type,
+                "Content-Length": str(body.size),
+            },
+            timeout=timeout or upload_timeout()
+    ) as response:
+        await response.read()
+        return response.status
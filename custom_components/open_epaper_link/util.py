@@ -37,6 +37,17 @@ def get_image_path(hass: HomeAssistant, entity_id: str) -> str:
     """
     return hass.config.path("www/open_epaper_link/open_epaper_link."+ str(entity_id).lower() + ".jpg")
 
+def get_image_cache_dir(hass: HomeAssistant) -> str:
+    """Return the directory of the downloaded dlimg image cache.
+
+    Args:
+        hass: Home Assistant instance for config path access
+
+    Returns:
+        str: Absolute path to the cache directory
+    """
+    return hass.config.path(".storage", f"{DOMAIN}_image_cache")
+
 async def send_tag_cmd(hass: HomeAssistant, entity_id: str, cmd: str) -> bool:
     """Send a command to an ESL Tag.
 
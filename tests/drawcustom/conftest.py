@@ -137,7 +137,11 @@ def image_gen(mock_hass):
 
         instance.get_tag_info = mock_get_tag_info
 
-        return instance
+        yield instance
+
+    # Join the render worker threads so they don't outlive the test
+    if instance._executor is not None:
+        instance._executor.shutdown(wait=True)
 
 # Helper functions that might be needed across multiple test files
 def get_test_image_path(filename):
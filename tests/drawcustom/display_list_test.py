@@ -0,0 +1,63 @@
+"""Tests for payload compilation in ImageGen."""
+import pytest
+
+from custom_components.open_epaper_link.imagegen import BLACK, RED, ElementType
+
+CANVAS_SIZE = (296, 128)
+
+PAYLOAD = [
+    {'type': 'text', 'x': 10, 'y': 10, 'value': 'Hello'},
+    {'type': 'polygon', 'points': [[0, 0], [10, 0], [10, 10]], 'fill': 'black'},
+    {'type': 'line', 'x_start': 0, 'y_start': 0, 'x_end': 10, 'y_end': 10, 'visible': False},
+    {'type': 'rectangle', 'x_start': 0},
+    {'type': 'unknown'},
+]
+
+
+def test_compile_payload(image_gen):
+    """Test that hidden elements are dropped and invalid ones reported."""
+    display_list = image_gen.compile_payload(PAYLOAD, CANVAS_SIZE)
+
+    assert [op.index for op in display_list.ops] == [0, 1]
+    assert [op.element_type for op in display_list.ops] == [ElementType.TEXT, ElementType.POLYGON]
+    assert len(display_list.errors) == 2
+    assert display_list.errors[0].startswith("Element 4:")
+    assert display_list.errors[1] == "Element 5: Invalid element type: unknown"
+
+
+def test_display_list_is_immutable(image_gen):
+    """Test that compiled elements cannot be changed by draw handlers."""
+    op = image_gen.compile_payload(PAYLOAD, CANVAS_SIZE).ops[1]
+
+    with pytest.raises(TypeError):
+        op.element['fill'] = 'red'
+    assert op.element['points'] == ((0, 0), (10, 0), (10, 10))
+
+
+def test_compile_resolves_coordinates_and_colors(image_gen):
+    """Test that positions and colors are resolved for the canvas once."""
+    payload = [{
+        'type': 'rectangle', 'x_start': '10%', 'x_end': '50%', 'y_start': 5, 'y_end': '100%',
+        'fill': 'accent', 'outline': 'b', 'width': 2,
+    }]
+    element = image_gen.compile_payload(payload, CANVAS_SIZE).ops[0].element
+    assert (element['x_start'], element['x_end'], element['y_start'], element['y_end']) == (29, 148, 5, 128)
+    assert element['fill'] == RED
+    assert element['outline'] == BLACK
+    assert element['width'] == 2
+
+    # Rotated canvases have their width and height swapped
+    rotated = image_gen.compile_payload(payload, CANVAS_SIZE[::-1], rotate=90).ops[0].element
+    assert (rotated['x_start'], rotated['y_end']) == (12, 296)
+
+
+def test_compiled_payload_is_cached(image_gen):
+    """Test that an identical payload is compiled only once per canvas."""
+    first = image_gen.compile_payload(PAYLOAD, CANVAS_SIZE)
+    second = image_gen.compile_payload([dict(element) for element in PAYLOAD], CANVAS_SIZE)
+    assert second is first
+
+    changed = image_gen.compile_payload(PAYLOAD[:1], CANVAS_SIZE)
+    assert changed is not first
+    assert image_gen.compile_payload(PAYLOAD, CANVAS_SIZE[::-1], rotate=90) is not first
+    assert image_gen.compile_payload(PAYLOAD, CANVAS_SIZE, accent_color="yellow") is not first
@@ -0,0 +1,72 @@
+"""Tests for caching processed dlimg bitmaps."""
+import base64
+from datetime import timedelta
+from io import BytesIO
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from PIL import Image
+from homeassistant.core import State
+from homeassistant.util import dt
+
+
+def png_bytes(color, size=(40, 30)):
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def dlimg_service_data(url, **options):
+    return {
+        "background": "white",
+        "rotate": 0,
+        "payload": [{"type": "dlimg", "url": url, "x": 10, "y": 10, "xsize": 60, "ysize": 40, **options}]
+    }
+
+
+@pytest.mark.asyncio
+async def test_processed_bitmap_is_reused(image_gen, mock_tag_info):
+    """Test that the same image and geometry is only decoded once."""
+    tag_type, accent = mock_tag_info
+    url = "data:image/png;base64," + base64.b64encode(png_bytes("red")).decode()
+
+    with patch.object(image_gen, '_process_downloaded_image', wraps=image_gen._process_downloaded_image) as process:
+        first = await image_gen.render_image(tag_type, accent, dlimg_service_data(url))
+        second = await image_gen.render_image(tag_type, accent, dlimg_service_data(url))
+        assert process.call_count == 1
+
+        # A different geometry is a different tile
+        await image_gen.render_image(tag_type, accent, dlimg_service_data(url, rotate=90))
+        assert process.call_count == 2
+
+    assert second.image_data == first.image_data
+    assert image_gen._bitmap_cache.stats["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_entity_state_change_invalidates(image_gen, mock_tag_info, mock_hass):
+    """Test that camera pictures are only fetched again after a state change."""
+    tag_type, accent = mock_tag_info
+    updated = dt.utcnow()
+    state = State("camera.door", "idle", {"entity_picture": "http://example.com/door.jpg"},
+                  last_changed=updated, last_updated=updated)
+    mock_hass.states = MagicMock()
+    mock_hass.states.get.return_value = state
+    fetch = AsyncMock(side_effect=[png_bytes("red"), png_bytes("black")])
+
+    with patch.object(image_gen._image_fetcher, 'async_fetch', fetch):
+        first = await image_gen.render_image(tag_type, accent, dlimg_service_data("camera.door"))
+        cached = await image_gen.render_image(tag_type, accent, dlimg_service_data("camera.door"))
+        assert fetch.call_count == 1
+        assert cached.fingerprint == first.fingerprint
+
+        updated += timedelta(seconds=10)
+        mock_hass.states.get.return_value = State(
+            "camera.door", "idle", state.attributes, last_changed=updated, last_updated=updated
+        )
+        changed = await image_gen.render_image(tag_type, accent, dlimg_service_data("camera.door"))
+
+    assert fetch.call_count == 2
+    assert changed.fingerprint != first.fingerprint
+    # The tile of the previous state was dropped
+    assert image_gen._bitmap_cache.stats["tiles"] == 1
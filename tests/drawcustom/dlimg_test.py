@@ -0,0 +1,31 @@
+"""Tests for compositing dlimg images onto the canvas."""
+import numpy as np
+import pytest
+from PIL import Image
+
+from custom_components.open_epaper_link.imagegen import paste_tile
+
+
+def full_canvas_composite(img, tile, position):
+    """Composite a tile through a transparent canvas-sized layer."""
+    tile = tile.convert("RGBA")
+    layer = Image.new("RGBA", img.size)
+    layer.paste(tile, position, tile)
+    img.paste(Image.alpha_composite(img, layer), (0, 0))
+
+
+@pytest.mark.parametrize("position", [(10, 5), (-12, -7), (70, 40), (-30, 0), (100, 100)])
+@pytest.mark.parametrize("opaque", [False, True])
+def test_paste_tile_matches_full_canvas(position, opaque):
+    """Test that region compositing and direct pasting give the same pixels."""
+    rng = np.random.default_rng(7)
+    canvas = Image.fromarray(rng.integers(0, 256, (60, 80, 4), dtype=np.uint8), "RGBA")
+    tile = Image.fromarray(rng.integers(0, 256, (25, 20, 4), dtype=np.uint8), "RGBA")
+    if opaque:
+        tile = tile.convert("RGB")
+
+    expected = canvas.copy()
+    full_canvas_composite(expected, tile, position)
+    paste_tile(canvas, tile, position)
+
+    assert canvas.tobytes() == expected.tobytes()
@@ -0,0 +1,78 @@
+"""Tests for font caching in FontManager."""
+import os
+import shutil
+
+import pytest
+from unittest.mock import MagicMock
+
+from custom_components.open_epaper_link.imagegen import FontManager
+
+COMPONENT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "custom_components", "open_epaper_link"
+)
+
+
+@pytest.fixture
+def font_hass(tmp_path):
+    """Create a mock Home Assistant instance with an empty config dir."""
+    hass = MagicMock()
+    hass.config.path = lambda *args: os.path.join(str(tmp_path), *args)
+    return hass
+
+
+def test_font_cache_hits_and_misses(font_hass):
+    """Test that repeated requests are served from the cache."""
+    manager = FontManager(font_hass)
+
+    font = manager.get_font("ppb.ttf", 20)
+    assert manager.get_font("ppb.ttf", 20) is font
+    manager.get_font("ppb.ttf", 21)
+
+    stats = manager.stats
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["size"] == 2
+
+
+def test_font_cache_is_bounded(font_hass):
+    """Test that the least recently used font is evicted."""
+    manager = FontManager(font_hass, max_fonts=2)
+
+    first = manager.get_font("ppb.ttf", 10)
+    manager.get_font("ppb.ttf", 11)
+    manager.get_font("ppb.ttf", 10)  # Mark size 10 as recently used
+    manager.get_font("ppb.ttf", 12)  # Evicts size 11
+
+    stats = manager.stats
+    assert stats["size"] == 2
+    assert stats["evictions"] == 1
+    assert manager.get_font("ppb.ttf", 10) is first
+    assert manager.stats["misses"] == 3
+
+
+def test_reload_config_invalidates_on_change(font_hass, tmp_path):
+    """Test that changed font directories clear the cache on reload only."""
+    font_dir = tmp_path / "fonts"
+    font_dir.mkdir()
+    shutil.copy(os.path.join(COMPONENT_DIR, "rbm.ttf"), font_dir / "custom.ttf")
+
+    entry = MagicMock()
+    entry.options = {"custom_font_dirs": ""}
+    manager = FontManager(font_hass, entry)
+
+    fallback = manager.get_font("custom.ttf", 20)
+
+    # Options changed, but nothing happens until the listener reloads
+    entry.options = {"custom_font_dirs": str(font_dir)}
+    assert manager.get_font("custom.ttf", 20) is fallback
+
+    manager.reload_config()
+    assert manager.stats["size"] == 0
+    custom = manager.get_font("custom.ttf", 20)
+    assert custom is not fallback
+    assert custom.path == str(font_dir / "custom.ttf")
+
+    # Reloading unchanged options keeps the cache
+    manager.reload_config()
+    assert manager.get_font("custom.ttf", 20) is custom
@@ -0,0 +1,112 @@
+"""Tests for the palette canvas used while rendering."""
+from unittest.mock import patch
+
+import pytest
+from PIL import Image
+
+from custom_components.open_epaper_link.imagegen import (
+    BLACK,
+    ElementType,
+    HALF_RED,
+    RED,
+    WHITE,
+    YELLOW,
+    create_palette_canvas,
+    get_tag_palette,
+)
+
+IMAGEGEN = 'custom_components.open_epaper_link.imagegen'
+
+
+def test_palette_starts_with_color_table(mock_tag_info):
+    """Test that the tag colors come first and colors are unique."""
+    tag_type, _ = mock_tag_info
+    palette = get_tag_palette(tag_type)
+
+    table = [tuple(rgb) for rgb in tag_type.color_table.values()]
+    unique_table = list(dict.fromkeys(table))
+    assert palette[:len(unique_table)] == unique_table
+    assert len(palette) == len(set(palette))
+    for color in (WHITE, BLACK, RED, HALF_RED, YELLOW):
+        assert color[:3] in palette
+
+
+def test_palette_canvas_background(mock_tag_info):
+    """Test that the canvas is a palette image filled with the background."""
+    tag_type, _ = mock_tag_info
+    img = create_palette_canvas(tag_type, (20, 10), RED)
+
+    assert img.mode == 'P'
+    assert img.convert('RGBA').getcolors() == [(200, RED)]
+
+
+@pytest.mark.asyncio
+async def test_canvas_promoted_only_when_needed(image_gen, mock_tag_info):
+    """Test that only elements needing true color draw on an RGBA canvas."""
+    tag_type, accent = mock_tag_info
+    bar = {'type': 'progress_bar', 'x_start': 0, 'y_start': 40, 'x_end': 100, 'y_end': 60, 'progress': 50}
+    service_data = {
+        "background": "white",
+        "rotate": 0,
+        "payload": [
+            {'type': 'rectangle', 'x_start': 0, 'y_start': 0, 'x_end': 10, 'y_end': 10, 'fill': 'red'},
+            {'type': 'qrcode', 'data': 'test', 'x': 20, 'y': 20},
+            bar,
+            {**bar, 'show_percentage': True},
+        ]
+    }
+    modes = []
+
+    def record(original):
+        def wrapper(img, element, pos_y):
+            modes.append((element['type'], img.mode))
+            return original(img, element, pos_y)
+        return wrapper
+
+    handlers = {
+        ElementType.RECTANGLE: record(image_gen._draw_rectangle),
+        ElementType.QRCODE: record(image_gen._draw_qrcode),
+        ElementType.PROGRESS_BAR: record(image_gen._draw_progress_bar),
+    }
+    with patch.dict(image_gen._draw_handlers, handlers):
+        await image_gen.render_image(tag_type, accent, service_data)
+
+    assert modes == [('rectangle', 'P'), ('qrcode', 'P'), ('progress_bar', 'P'), ('progress_bar', 'RGBA')]
+
+
+@pytest.mark.parametrize("colors", [("black", "white"), ("red", "half_black"), ("accent", "yellow")])
+def test_qrcode_on_palette_canvas_matches_rgba(image_gen, mock_tag_info, colors):
+    """Test that a QR code pasted onto a palette canvas keeps its exact colors."""
+    tag_type, _ = mock_tag_info
+    element = {'type': 'qrcode', 'data': 'palette', 'x': 3, 'y': 5, 'color': colors[0], 'bgcolor': colors[1]}
+
+    palette_canvas = create_palette_canvas(tag_type, (80, 80), WHITE)
+    rgba_canvas = Image.new('RGBA', (80, 80), WHITE)
+    image_gen._draw_qrcode(palette_canvas, element, 0)
+    image_gen._draw_qrcode(rgba_canvas, element, 0)
+
+    assert palette_canvas.mode == 'P'
+    assert palette_canvas.convert('RGBA').tobytes() == rgba_canvas.tobytes()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("element", [
+    {'type': 'text', 'value': 'Stroked', 'x': 10, 'y': 10, 'size': 30,
+     'color': 'red', 'stroke_width': 2, 'stroke_fill': 'black'},
+    {'type': 'multiline', 'value': 'One|Two', 'delimiter': '|', 'x': 10, 'offset_y': 30,
+     'size': 24, 'stroke_width': 1, 'stroke_fill': 'red'},
+])
+async def test_stroked_text_matches_rgba_render(image_gen, mock_tag_info, element):
+    """Test that stroked text renders exactly like on an RGBA canvas."""
+    tag_type, accent = mock_tag_info
+    service_data = {"background": "white", "rotate": 0, "payload": [element]}
+
+    rendered = await image_gen.render_image(tag_type, accent, service_data, force=True)
+
+    def rgba_canvas(tag_type, size, background):
+        return Image.new('RGBA', size, background)
+
+    with patch(f'{IMAGEGEN}.create_palette_canvas', rgba_canvas):
+        expected = await image_gen.render_image(tag_type, accent, service_data, force=True)
+
+    assert rendered.image_data == expected.image_data
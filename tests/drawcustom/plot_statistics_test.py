@@ -0,0 +1,233 @@
+"""Tests for fetching plot data from recorder statistics and history."""
+import asyncio
+from datetime import timedelta
+from io import BytesIO
+from unittest.mock import MagicMock, patch
+
+import pytest
+from PIL import Image
+from homeassistant.core import State
+from homeassistant.util import dt
+
+from custom_components.open_epaper_link.imagegen import HALF_BLACK, ElementType
+
+IMAGEGEN = 'custom_components.open_epaper_link.imagegen'
+HISTORY_CACHE = 'custom_components.open_epaper_link.history_cache'
+CANVAS_SIZE = (296, 128)
+
+
+def make_statistics(duration, count=48):
+    """Create hourly-like statistics rows ending now."""
+    end = dt.utcnow().timestamp()
+    step = duration.total_seconds() / count
+    rows = []
+    for i in range(count):
+        start = end - duration.total_seconds() + i * step
+        mean = 20 + (i % 6)
+        rows.append({"start": start, "end": start + step, "mean": mean, "min": mean - 3, "max": mean + 3})
+    return rows
+
+
+def make_history(entity_id):
+    """Create a short state history for an entity."""
+    now = dt.now()
+    first = State(entity_id, "10", last_changed=now - timedelta(hours=2))
+    return [first, {"state": "12", "last_changed": str(now - timedelta(hours=1))}]
+
+
+@pytest.fixture
+def recorder():
+    """Run recorder jobs inline."""
+    instance = MagicMock()
+
+    async def run(func):
+        return func()
+
+    instance.async_add_executor_job = run
+    with patch(f'{IMAGEGEN}.get_instance', return_value=instance), \
+            patch(f'{HISTORY_CACHE}.get_instance', return_value=instance):
+        yield instance
+
+
+def plot_service_data(duration, **options):
+    return {
+        "background": "white",
+        "rotate": 0,
+        "payload": [{
+            "type": "plot",
+            "duration": int(duration.total_seconds()),
+            "data": [{"entity": "sensor.temperature"}, {"entity": "sensor.counter"}],
+            **options,
+        }]
+    }
+
+
+@pytest.mark.asyncio
+async def test_long_plot_uses_statistics(image_gen, mock_tag_info, recorder):
+    """Test that long durations read statistics and draw an envelope."""
+    tag_type, accent = mock_tag_info
+    duration = timedelta(days=30)
+    statistics = {"sensor.temperature": make_statistics(duration), "sensor.counter": [{"start": 0, "mean": None}]}
+
+    with patch(f'{IMAGEGEN}.statistics_during_period', return_value=statistics) as mock_statistics, \
+            patch(f'{HISTORY_CACHE}.get_significant_states',
+                  return_value={"sensor.counter": make_history("sensor.counter")}) as mock_history:
+        rendered = await image_gen.render_image(tag_type, accent, plot_service_data(duration))
+
+    args = mock_statistics.call_args.args
+    assert args[3] == {"sensor.temperature", "sensor.counter"}
+    assert args[4] == "hour"
+    assert args[6] == {"mean", "min", "max"}
+    # Only the entity without mean statistics is read from the history
+    assert mock_history.call_args.kwargs["entity_ids"] == ["sensor.counter"]
+
+    image = Image.open(BytesIO(rendered.image_data)).convert('RGB')
+    gray = sum(1 for pixel in image.getdata() if all(abs(c - HALF_BLACK[0]) < 20 for c in pixel))
+    assert gray > 100
+
+
+@pytest.mark.asyncio
+async def test_short_plot_uses_history(image_gen, mock_tag_info, recorder):
+    """Test that short durations keep reading the state history."""
+    tag_type, accent = mock_tag_info
+    history = {
+        "sensor.temperature": make_history("sensor.temperature"),
+        "sensor.counter": make_history("sensor.counter"),
+    }
+
+    with patch(f'{IMAGEGEN}.statistics_during_period') as mock_statistics, \
+            patch(f'{HISTORY_CACHE}.get_significant_states', return_value=history) as mock_history:
+        await image_gen.render_image(tag_type, accent, plot_service_data(timedelta(hours=24)))
+
+    mock_statistics.assert_not_called()
+    assert mock_history.call_args.kwargs["entity_ids"] == ["sensor.temperature", "sensor.counter"]
+
+
+@pytest.mark.asyncio
+async def test_unavailable_series_is_skipped(image_gen, mock_tag_info, recorder):
+    """Test that an entity that was only unavailable does not fail the plot."""
+    tag_type, accent = mock_tag_info
+    now = dt.now()
+    history = {
+        "sensor.temperature": make_history("sensor.temperature"),
+        "sensor.counter": [State("sensor.counter", "unavailable", last_changed=now - timedelta(hours=2))],
+    }
+    errors = []
+
+    with patch(f'{IMAGEGEN}.statistics_during_period'), \
+            patch(f'{HISTORY_CACHE}.get_significant_states', return_value=history):
+        rendered = await image_gen.render_image(tag_type, accent, plot_service_data(timedelta(hours=24)), errors)
+
+    assert errors == []
+    image = Image.open(BytesIO(rendered.image_data)).convert('RGB')
+    assert any(pixel != (255, 255, 255) for pixel in image.getdata())
+
+
+@pytest.mark.asyncio
+async def test_default_downsampling_keeps_smoothing_and_markers(image_gen, mock_tag_info, recorder):
+    """Test that a dense smoothed series with markers renders like one drawn without downsampling."""
+    tag_type, accent = mock_tag_info
+    now = dt.now()
+    states = [
+        State("sensor.temperature", str(20 + (i * 7) % 11), last_changed=now - timedelta(seconds=60 * (1400 - i)))
+        for i in range(1400)
+    ]
+
+    def service_data(**options):
+        series = {"entity": "sensor.temperature", "smooth": True, "show_points": True, "point_size": 1, **options}
+        return {
+            "background": "white",
+            "rotate": 0,
+            "payload": [{"type": "plot", "duration": 86400, "data": [series]}],
+        }
+
+    with patch(f'{IMAGEGEN}.statistics_during_period'), \
+            patch(f'{HISTORY_CACHE}.get_significant_states', return_value={"sensor.temperature": states}):
+        default = await image_gen.render_image(tag_type, accent, service_data())
+        full = await image_gen.render_image(tag_type, accent, service_data(downsample="none"))
+
+    assert default.image_data == full.image_data
+
+
+@pytest.mark.asyncio
+async def test_statistics_period_and_override(image_gen, mock_tag_info, recorder):
+    """Test the 5-minute period and forcing statistics for short plots."""
+    tag_type, accent = mock_tag_info
+    duration = timedelta(hours=6)
+    statistics = {
+        "sensor.temperature": make_statistics(duration),
+        "sensor.counter": make_statistics(duration),
+    }
+
+    with patch(f'{IMAGEGEN}.statistics_during_period', return_value=statistics) as mock_statistics, \
+            patch(f'{HISTORY_CACHE}.get_significant_states') as mock_history:
+        await image_gen.render_image(tag_type, accent, plot_service_data(duration, statistics=True))
+
+    assert mock_statistics.call_args.args[4] == "5minute"
+    mock_history.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_plots_share_one_query(image_gen, mock_tag_info, recorder):
+    """Test that several plots are fetched with one merged history query."""
+    tag_type, accent = mock_tag_info
+    history = {
+        "sensor.temperature": make_history("sensor.temperature"),
+        "sensor.counter": make_history("sensor.counter"),
+    }
+    service_data = {
+        "background": "white",
+        "rotate": 0,
+        "payload": [
+            {"type": "plot", "duration": 3600, "data": [{"entity": "sensor.temperature"}]},
+            {"type": "plot", "duration": 3 * 3600, "data": [{"entity": "sensor.counter"}]},
+            {"type": "plot", "duration": 3 * 3600,
+             "data": [{"entity": "sensor.temperature"}, {"entity": "sensor.counter"}]},
+        ]
+    }
+
+    with patch(f'{IMAGEGEN}.statistics_during_period') as mock_statistics, \
+            patch(f'{HISTORY_CACHE}.get_significant_states', return_value=history) as mock_history:
+        ops = await image_gen._prefetch_elements(
+            image_gen.compile_payload(service_data["payload"], CANVAS_SIZE), []
+        )
+
+    mock_statistics.assert_not_called()
+    assert mock_history.call_count == 1
+    assert mock_history.call_args.kwargs["entity_ids"] == ["sensor.temperature", "sensor.counter"]
+    # The query covers the longest plot, each plot gets its own window
+    assert ops[1].element["_start"] == ops[2].element["_start"] < ops[0].element["_start"]
+    assert len(ops[0].element["_series"]["sensor.temperature"][0]) == 1
+    assert len(ops[2].element["_series"]["sensor.temperature"][0]) == 2
+    assert set(ops[2].element["_series"]) == {"sensor.temperature", "sensor.counter"}
+
+
+@pytest.mark.asyncio
+async def test_prefetch_runs_concurrently(image_gen, recorder):
+    """Test that elements fetch their data concurrently and keep their order."""
+    started = []
+    release = asyncio.Event()
+
+    async def slow_prefetch(element):
+        started.append(element["url"])
+        if len(started) == 2:
+            release.set()
+        await asyncio.wait_for(release.wait(), 1)
+        if element["url"] == "bad":
+            raise ValueError("Cannot load image")
+        return {**element, "_loaded": True}
+
+    payload = [
+        {"type": "dlimg", "url": "bad", "x": 0, "y": 0, "xsize": 10, "ysize": 10},
+        {"type": "rectangle", "x_start": 0, "y_start": 0, "x_end": 5, "y_end": 5},
+        {"type": "dlimg", "url": "good", "x": 0, "y": 0, "xsize": 10, "ysize": 10},
+    ]
+    errors = []
+    with patch.dict(image_gen._prefetch_handlers, {ElementType.DLIMG: slow_prefetch}):
+        ops = await image_gen._prefetch_elements(image_gen.compile_payload(payload, CANVAS_SIZE), errors)
+
+    # Both downloads were waiting at the same time
+    assert started == ["bad", "good"]
+    assert [op.index for op in ops] == [1, 2]
+    assert ops[1].element["_loaded"]
+    assert errors == ["Element 1: Cannot load image"]
@@ -0,0 +1,51 @@
+"""Tests for the content-addressed render cache in ImageGen."""
+import pytest
+from unittest.mock import patch
+
+SERVICE_DATA = {
+    "background": "white",
+    "rotate": 0,
+    "payload": [
+        {'type': 'rectangle', 'x_start': 10, 'y_start': 10, 'x_end': 100, 'y_end': 60, 'fill': 'red'},
+    ]
+}
+
+
+@pytest.mark.asyncio
+async def test_identical_payload_reuses_image(image_gen, mock_tag_info):
+    """Test that a known fingerprint skips rasterization."""
+    tag_type, accent = mock_tag_info
+    first = await image_gen.render_image(tag_type, accent, SERVICE_DATA)
+    assert not first.cached
+
+    image_gen.remember_image("TEST_TAG", first.fingerprint, first.image_data)
+    assert image_gen.is_image_current("TEST_TAG", first.fingerprint)
+
+    with patch.object(image_gen, '_render_image') as mock_render:
+        second = await image_gen.render_image(tag_type, accent, SERVICE_DATA)
+        mock_render.assert_not_called()
+
+    assert second.cached
+    assert second.fingerprint == first.fingerprint
+    assert second.image_data == first.image_data
+
+
+@pytest.mark.asyncio
+async def test_changed_payload_or_force_renders(image_gen, mock_tag_info):
+    """Test that changed content or force bypasses the cache."""
+    tag_type, accent = mock_tag_info
+    first = await image_gen.render_image(tag_type, accent, SERVICE_DATA)
+    image_gen.remember_image("TEST_TAG", first.fingerprint, first.image_data)
+
+    changed = {**SERVICE_DATA, "background": "black"}
+    second = await image_gen.render_image(tag_type, accent, changed)
+    assert not second.cached
+    assert second.fingerprint != first.fingerprint
+    assert not image_gen.is_image_current("TEST_TAG", second.fingerprint)
+
+    forced = await image_gen.render_image(tag_type, accent, SERVICE_DATA, force=True)
+    assert not forced.cached
+    assert forced.fingerprint == first.fingerprint
+
+    image_gen.forget_image("TEST_TAG")
+    assert not image_gen.is_image_current("TEST_TAG", first.fingerprint)
@@ -3,10 +3,11 @@ import os
 from io import BytesIO
 import pytest
 from unittest.mock import patch
-from PIL import Image
+from PIL import Image, ImageDraw
 
 from conftest import BASE_IMG_PATH, images_equal, save_image
 from homeassistant.exceptions import HomeAssistantError
+from custom_components.open_epaper_link.imagegen import CoordinateParser
 
 TEXT_IMG_PATH = os.path.join(BASE_IMG_PATH, 'text')
 
@@ -483,4 +484,54 @@ async def test_text_truncate(image_gen, mock_tag_info):
 #
 #         generated_img = Image.open(BytesIO(image_data))
 #         example_img = Image.open(os.path.join(TEXT_IMG_PATH, 'text_basic.png'))
-#         assert images_equal(generated_img, example_img), "Basic text rendering failed"
\ No newline at end of file
+#         assert images_equal(generated_img, example_img), "Basic text rendering failed"
+
+@pytest.mark.asyncio
+async def test_text_fit_largest_size(image_gen):
+    """Test that fit picks the largest font size that fits the box."""
+    img = Image.new('RGBA', (296, 128), 'white')
+    draw = ImageDraw.Draw(img)
+    draw.fontmode = "1"
+    coords = CoordinateParser(img.width, img.height)
+    element = {'type': 'text', 'value': 'Fit me into the box', 'fit': True,
+               'x_start': 10, 'y_start': 10, 'x_end': 200, 'y_end': 60}
+
+    image_gen._font_manager.get_font.reset_mock()
+    x, y, font, text = image_gen._fit_text(draw, coords, element, element['value'], 'ppb.ttf', 'left', 5, 0)
+
+    def box(size):
+        fitted = image_gen._fit_text(draw, coords, {**element, 'size': size, 'min_size': size},
+                                     element['value'], 'ppb.ttf', 'left', 5, 0)
+        bbox = draw.textbbox((fitted[0], fitted[1]), fitted[3], font=fitted[2], anchor='la', spacing=5)
+        return bbox
+
+    # O(log n) layouts for a 50 px high box
+    assert image_gen._font_manager.get_font.call_count <= 8
+
+    bbox = draw.textbbox((x, y), text, font=font, anchor='la', spacing=5)
+    assert bbox[0] >= 10 and bbox[1] >= 10 and bbox[2] <= 200 and bbox[3] <= 60
+
+    larger = box(font.size + 1)
+    assert larger[2] - larger[0] > 190 or larger[3] - larger[1] > 50
+
+
+@pytest.mark.asyncio
+async def test_text_fit_renders(image_gen, mock_tag_info):
+    """Test that fitted text is drawn only inside its box."""
+    service_data = {
+        "background": "white",
+        "rotate": 0,
+        "payload": [{
+            'type': 'text', 'value': 'Centered fit', 'fit': True, 'align': 'center', 'valign': 'middle',
+            'x_start': 50, 'y_start': 20, 'x_end': 250, 'y_end': 100, 'color': 'black'
+        }]
+    }
+
+    with patch('custom_components.open_epaper_link.imagegen.ImageGen.get_tag_info',
+               return_value=mock_tag_info):
+        image_data = await image_gen.generate_custom_image("open_epaper_link.test_tag", service_data)
+
+    generated_img = Image.open(BytesIO(image_data)).convert('L')
+    ink = generated_img.point(lambda value: 255 if value < 128 else 0).getbbox()
+    assert ink is not None
+    assert ink[0] >= 50 and ink[1] >= 20 and ink[2] <= 250 and ink[3] <= 100
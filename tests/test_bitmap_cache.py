@@ -0,0 +1,46 @@
+"""Tests for the processed bitmap cache."""
+from PIL import Image
+
+from custom_components.open_epaper_link.bitmap_cache import BitmapCache
+
+
+def tile(width=10, height=10):
+    return Image.new("RGBA", (width, height))
+
+
+def test_lru_eviction_within_budget():
+    """Test that the least recently used tiles are evicted over budget."""
+    cache = BitmapCache(max_bytes=3 * 400)
+    for name in ("a", "b", "c"):
+        cache.put((name, 10, 10), tile())
+    assert cache.get(("a", 10, 10)) is not None
+
+    cache.put(("d", 10, 10), tile())
+
+    assert cache.get(("b", 10, 10)) is None
+    assert cache.get(("a", 10, 10)) is not None
+    stats = cache.stats
+    assert stats["tiles"] == 3
+    assert stats["bytes"] == 1200
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+
+
+def test_oversized_tiles_are_not_cached():
+    """Test that a tile larger than the budget is skipped."""
+    cache = BitmapCache(max_bytes=100)
+    cache.put(("a",), tile())
+    assert cache.stats["tiles"] == 0
+
+
+def test_discard_source():
+    """Test dropping every geometry of one source."""
+    cache = BitmapCache()
+    cache.put((("entity", "camera.door", 1.0), 10, 10), tile())
+    cache.put((("entity", "camera.door", 1.0), 20, 20), tile(20, 20))
+    cache.put((("entity", "camera.yard", 1.0), 10, 10), tile())
+
+    assert cache.discard(("entity", "camera.door", 1.0)) == 2
+    assert cache.stats["tiles"] == 1
+    assert cache.stats["bytes"] == 400
@@ -0,0 +1,81 @@
+"""Tests for plot series downsampling."""
+import math
+import random
+
+import pytest
+from PIL import Image, ImageDraw
+
+from custom_components.open_epaper_link.downsample import (
+    downsample,
+    lttb,
+    min_max_per_column,
+)
+
+
+def noisy_series(count, width, seed=0):
+    """Create screen points with many samples per pixel column."""
+    rng = random.Random(seed)
+    points = []
+    for i in range(count):
+        x = round(i * (width - 1) / (count - 1))
+        y = round(50 + 40 * math.sin(i / 300) + rng.uniform(-8, 8))
+        points.append((x, y))
+    points[count // 3] = (points[count // 3][0], 0)  # A single spike
+    return points
+
+
+def rasterize(points):
+    """Draw a one pixel wide polyline and return its pixels."""
+    img = Image.new("1", (300, 120), 0)
+    ImageDraw.Draw(img).line(points, fill=1)
+    return img.tobytes()
+
+
+def test_min_max_per_column_is_pixel_identical():
+    points = noisy_series(20000, 296)
+
+    reduced = min_max_per_column(points)
+
+    assert len(reduced) <= 4 * 296
+    assert rasterize(reduced) == rasterize(points)
+
+
+def test_min_max_per_column_keeps_sparse_series():
+    points = [(0, 5), (3, 7), (4, 1), (9, 2)]
+    assert min_max_per_column(points) == points
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    points = noisy_series(20000, 296)
+
+    reduced = lttb(points, 300)
+
+    assert len(reduced) == 300
+    assert reduced[0] == points[0]
+    assert reduced[-1] == points[-1]
+    assert min(y for _, y in reduced) == 0
+    assert reduced == sorted(reduced, key=lambda p: p[0])
+
+
+def test_lttb_short_series_unchanged():
+    points = [(0, 1), (1, 2), (2, 3)]
+    assert lttb(points, 10) == points
+
+
+def test_downsample_method_selection():
+    points = noisy_series(5000, 100)
+
+    assert downsample(points, "none", 100) == points
+    assert len(downsample(points, "lttb", 100)) == 200
+    assert downsample(points, "minmax", 100) == min_max_per_column(points)
+    with pytest.raises(ValueError):
+        downsample(points, "average", 100)
+
+
+def test_downsample_keeps_series_that_fit_the_width():
+    points = [(0, 5), (0, 9), (0, 2), (0, 1), (0, 3), (1, 4)]
+
+    for method in ("none", "minmax", "lttb"):
+        assert downsample(points, method, 10) == points
+    with pytest.raises(ValueError):
+        downsample(points, "average", 10)
@@ -0,0 +1,187 @@
+"""Tests for the incremental plot history cache."""
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from homeassistant.core import State
+from homeassistant.util import dt
+
+from custom_components.open_epaper_link.history_cache import HistoryCache
+
+HISTORY_CACHE = 'custom_components.open_epaper_link.history_cache'
+NOW = dt.utcnow().replace(microsecond=0)
+
+
+class FakeRecorder:
+    """Serve state changes like get_significant_states with a minimal response."""
+
+    def __init__(self):
+        self.events = {}
+        self.queries = []
+
+    def record(self, entity_id, when, value):
+        self.events.setdefault(entity_id, []).append((when, value))
+
+    def get_significant_states(self, hass, start_time, entity_ids, include_start_time_state=True, **kwargs):
+        self.queries.append((start_time, tuple(entity_ids), include_start_time_state))
+        result = {}
+        for entity_id in entity_ids:
+            events = self.events.get(entity_id, [])
+            states = []
+            before = [event for event in events if event[0] <= start_time]
+            if include_start_time_state and before:
+                when, value = before[-1]
+                states.append(State(entity_id, value, last_changed=when, last_updated=when))
+            states += [
+                {"state": value, "last_changed": when.isoformat()}
+                for when, value in events if when > start_time
+            ]
+            if states:
+                result[entity_id] = states
+        return result
+
+
+@pytest.fixture
+def recorder():
+    fake = FakeRecorder()
+    instance = MagicMock()
+
+    async def run(func):
+        return func()
+
+    instance.async_add_executor_job = run
+    with patch(f'{HISTORY_CACHE}.get_instance', return_value=instance), \
+            patch(f'{HISTORY_CACHE}.get_significant_states', fake.get_significant_states):
+        yield fake
+
+
+def fill(recorder, entity_id, start, end, step=timedelta(minutes=1)):
+    when = start
+    while when <= end:
+        recorder.record(entity_id, when, str(when.minute))
+        when += step
+
+
+@pytest.mark.asyncio
+async def test_second_render_fetches_only_the_tail(recorder):
+    """Test that repeated renders append new states to the cached window."""
+    cache = HistoryCache(MagicMock())
+    fill(recorder, "sensor.power", NOW - timedelta(hours=30), NOW)
+    day = timedelta(hours=24)
+
+    first = await cache.async_get(["sensor.power"], NOW - day, NOW)
+    assert cache.stats["misses"] == 1
+
+    later = NOW + timedelta(minutes=5)
+    fill(recorder, "sensor.power", NOW + timedelta(minutes=1), later)
+    fetched_before = cache.stats["fetched_points"]
+    second = await cache.async_get(["sensor.power"], later - day, later)
+
+    # Only the five new states were read, starting at the newest cached point
+    assert cache.stats["hits"] == 1
+    assert cache.stats["fetched_points"] - fetched_before == 5
+    assert recorder.queries[-1] == (NOW, ("sensor.power",), False)
+
+    # The result equals a full fetch of the new window
+    reference = await HistoryCache(MagicMock()).async_get(["sensor.power"], later - day, later)
+    assert list(second["sensor.power"][0]) == list(reference["sensor.power"][0])
+    assert list(second["sensor.power"][1]) == list(reference["sensor.power"][1])
+    assert second["sensor.power"][0][-1] == later.timestamp()
+    assert first["sensor.power"][0][-1] == NOW.timestamp()
+
+
+@pytest.mark.asyncio
+async def test_old_points_are_evicted(recorder):
+    """Test that points older than the largest requested duration are dropped."""
+    cache = HistoryCache(MagicMock())
+    fill(recorder, "sensor.power", NOW - timedelta(hours=3), NOW)
+
+    await cache.async_get(["sensor.power"], NOW - timedelta(hours=1), NOW)
+    assert cache.stats["points"] == 61
+
+    later = NOW + timedelta(hours=2)
+    fill(recorder, "sensor.power", NOW + timedelta(minutes=1), later)
+    result = await cache.async_get(["sensor.power"], later - timedelta(hours=1), later)
+
+    # One hour of points plus the state at the start of the window
+    assert cache.stats["points"] == 61
+    assert result["sensor.power"][0][0] == (later - timedelta(hours=1)).timestamp()
+
+
+@pytest.mark.asyncio
+async def test_longer_duration_refetches(recorder):
+    """Test that a window reaching back further than the cache is fetched in full."""
+    cache = HistoryCache(MagicMock())
+    fill(recorder, "sensor.power", NOW - timedelta(hours=5), NOW)
+
+    await cache.async_get(["sensor.power"], NOW - timedelta(hours=1), NOW)
+    result = await cache.async_get(["sensor.power"], NOW - timedelta(hours=4), NOW)
+
+    assert cache.stats["misses"] == 2
+    assert len(result["sensor.power"][0]) == 4 * 60 + 1
+
+
+@pytest.mark.asyncio
+async def test_memory_limit_drops_least_recently_used(recorder):
+    """Test that the point limit evicts other entities first."""
+    cache = HistoryCache(MagicMock(), max_points=100)
+    for entity_id in ("sensor.a", "sensor.b"):
+        fill(recorder, entity_id, NOW - timedelta(hours=1), NOW)
+
+    await cache.async_get(["sensor.a"], NOW - timedelta(hours=1), NOW)
+    result = await cache.async_get(["sensor.b"], NOW - timedelta(hours=1), NOW)
+
+    assert "sensor.b" in result
+    stats = cache.stats
+    assert stats["evictions"] == 1
+    assert stats["entities"] == 1
+    assert stats["points"] <= 100
+
+
+@pytest.mark.asyncio
+async def test_non_numeric_states_are_skipped(recorder):
+    cache = HistoryCache(MagicMock())
+    recorder.record("sensor.power", NOW - timedelta(minutes=3), "1.5")
+    recorder.record("sensor.power", NOW - timedelta(minutes=2), "unavailable")
+    recorder.record("sensor.power", NOW - timedelta(minutes=1), "2.5")
+
+    result = await cache.async_get(["sensor.power"], NOW - timedelta(hours=1), NOW)
+
+    assert list(result["sensor.power"][1]) == [1.5, 2.5]
+    assert cache.stats["hit_rate"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_constant_entity_does_not_widen_other_tails(recorder):
+    """Test that each tail query starts at the entity's own newest point."""
+    cache = HistoryCache(MagicMock())
+    day = timedelta(hours=24)
+    recorder.record("sensor.constant", NOW - timedelta(days=3), "1")
+    fill(recorder, "sensor.power", NOW - timedelta(hours=30), NOW)
+    await cache.async_get(["sensor.constant", "sensor.power"], NOW - day, NOW)
+
+    later = NOW + timedelta(minutes=5)
+    fill(recorder, "sensor.power", NOW + timedelta(minutes=1), later)
+    recorder.queries.clear()
+    await cache.async_get(["sensor.constant", "sensor.power"], later - day, later)
+
+    queries = {entity_ids: start_time for start_time, entity_ids, _ in recorder.queries}
+    assert queries[("sensor.power",)] == NOW
+    assert queries[("sensor.constant",)] == NOW - day
+    assert cache.stats["hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_unavailable_entity_gets_empty_series(recorder):
+    """Test that an entity without numeric states is returned empty, not dropped."""
+    cache = HistoryCache(MagicMock())
+    recorder.record("sensor.offline", NOW - timedelta(minutes=30), "unavailable")
+    recorder.record("sensor.offline", NOW - timedelta(minutes=10), "unknown")
+    recorder.record("sensor.power", NOW - timedelta(minutes=5), "3.5")
+
+    entity_ids = ["sensor.offline", "sensor.power", "sensor.missing"]
+    for _ in range(2):
+        result = await cache.async_get(entity_ids, NOW - timedelta(hours=1), NOW)
+        assert len(result["sensor.offline"][0]) == 0
+        assert list(result["sensor.power"][1]) == [3.5]
+        assert "sensor.missing" not in result
@@ -3,11 +3,16 @@ import sys
 import types
 from pathlib import Path
 from types import SimpleNamespace
+import random
+import struct
 import zlib
 
+import pytest
+from PIL import Image
 
-def load_decoder():
-    """Import decode_esl_raw with minimal package scaffolding."""
+
+def load_module():
+    """Import image_decompressor with minimal package scaffolding."""
     pkg = types.ModuleType("custom_components")
     sys.modules["custom_components"] = pkg
     open_pkg = types.ModuleType("custom_components.open_epaper_link")
@@ -36,7 +41,12 @@ def load_decoder():
         "custom_components",
     ]:
         sys.modules.pop(name, None)
-    return module.decode_esl_raw
+    return module
+
+
+def load_decoder():
+    """Import decode_esl_raw with minimal package scaffolding."""
+    return load_module().decode_esl_raw
 
 
 def make_tag(bpp=1):
@@ -110,3 +120,144 @@ def test_decode_esl_raw_g5():
     data = len(payload).to_bytes(4, "little") + payload
     result = decode_esl_raw(data, tag)
     assert result == plane
+
+
+def reference_bitmap(data, tag):
+    """Map decoded plane data to an upright RGB image, like to_image."""
+    width, height = tag.width, tag.height
+    if tag.rotatebuffer % 2:
+        width, height = height, width
+    img = Image.new("RGB", (width, height), "white")
+    pixels = img.load()
+    color_table = {k: tuple(v) for k, v in tag.color_table.items()}
+    if tag.bpp <= 2:
+        bytes_per_row = (width + 7) // 8
+        plane_size = bytes_per_row * height
+        color_key = next((k for k in color_table if k not in ["black", "white"]), "white")
+        for y in range(height):
+            for x in range(width):
+                offset = y * bytes_per_row + x // 8
+                mask = 0x80 >> (x % 8)
+                black = data[offset] & mask
+                color = tag.bpp == 2 and data[plane_size + offset] & mask
+                if black:
+                    pixels[x, y] = color_table["black"]
+                elif color:
+                    pixels[x, y] = color_table[color_key]
+                else:
+                    pixels[x, y] = color_table["white"]
+    else:
+        colors = list(color_table.values())
+        bytes_per_row = (width * tag.bpp + 7) // 8
+        for y in range(height):
+            for x in range(width):
+                byte = data[y * bytes_per_row + x // 2]
+                index = byte >> 4 if x % 2 == 0 else byte & 0x0F
+                if index < len(colors):
+                    pixels[x, y] = colors[index]
+    transpose = {1: Image.Transpose.ROTATE_270, 2: Image.Transpose.ROTATE_180,
+                 3: Image.Transpose.ROTATE_90}.get(tag.rotatebuffer)
+    return img.transpose(transpose) if transpose is not None else img
+
+
+def random_tag_image(tag, seed):
+    """Create an image using only colors the tag can show."""
+    colors = [tuple(v) for v in tag.color_table.values()]
+    if tag.bpp == 1:
+        colors = colors[:2]
+    rng = random.Random(seed)
+    img = Image.new("RGB", (tag.width, tag.height))
+    img.putdata([rng.choice(colors) for _ in range(tag.width * tag.height)])
+    return img
+
+
+@pytest.mark.parametrize("codec", ["zlib", "g5", "raw"])
+@pytest.mark.parametrize("bpp", [1, 2, 4])
+@pytest.mark.parametrize("rotatebuffer", [0, 1, 3])
+def test_encode_esl_raw_round_trip(codec, bpp, rotatebuffer):
+    module = load_module()
+    tag = SimpleNamespace(
+        name="test",
+        width=19,
+        height=10,
+        bpp=bpp,
+        rotatebuffer=rotatebuffer,
+        color_table={
+            "white": [255, 255, 255],
+            "black": [0, 0, 0],
+            "red": [255, 0, 0],
+        },
+    )
+    img = random_tag_image(tag, bpp)
+
+    encoded = module.encode_esl_raw(img, tag, codec=codec, rows_per_block=4)
+    planes = module.decode_esl_raw(encoded, tag)
+
+    assert planes == module.image_to_planes(img, tag)
+    assert reference_bitmap(planes, tag).tobytes() == img.tobytes()
+
+
+def test_encode_esl_raw_block_layout():
+    module = load_module()
+    tag = make_tag(2)
+    img = Image.new("RGB", (8, 8), "white")
+
+    encoded = module.encode_esl_raw(img, tag, codec="raw", rows_per_block=3)
+
+    headers = []
+    offset = 0
+    while offset < len(encoded):
+        size = int.from_bytes(encoded[offset:offset + 4], "little")
+        headers.append(struct.unpack("<HHBB", encoded[offset + 4:offset + 10]))
+        offset += 4 + size
+    assert headers == [
+        (0, 3, 0, 0), (3, 3, 0, 0), (6, 2, 0, 0),
+        (0, 3, 0, 1), (3, 3, 0, 1), (6, 2, 0, 1),
+    ]
+
+
+def test_encode_esl_raw_avoids_zlib_lookalike_header():
+    """A block starting at row 376 would be parsed as zlib."""
+    module = load_module()
+    tag = SimpleNamespace(
+        name="test", width=16, height=400, bpp=1, rotatebuffer=0,
+        color_table={"white": [255, 255, 255], "black": [0, 0, 0]},
+    )
+    img = random_tag_image(tag, 0)
+
+    for codec in ("g5", "raw"):
+        encoded = module.encode_esl_raw(img, tag, codec=codec, rows_per_block=8)
+        assert module.decode_esl_raw(encoded, tag) == module.image_to_planes(img, tag)
+
+
+def test_encode_esl_raw_single_row_zlib_lookalike_header():
+    """Single row blocks cannot be shortened, row 376 is stored as zlib."""
+    module = load_module()
+    tag = SimpleNamespace(
+        name="test", width=16, height=400, bpp=1, rotatebuffer=0,
+        color_table={"white": [255, 255, 255], "black": [0, 0, 0]},
+    )
+    img = random_tag_image(tag, 1)
+
+    for codec in ("g5", "raw"):
+        encoded = module.encode_esl_raw(img, tag, codec=codec, rows_per_block=1)
+        assert module.decode_esl_raw(encoded, tag) == module.image_to_planes(img, tag)
+
+
+def test_encode_esl_raw_rejects_wrong_size():
+    module = load_module()
+    with pytest.raises(ValueError):
+        module.encode_esl_raw(Image.new("RGB", (4, 4)), make_tag(1))
+
+
+def test_g5_round_trip():
+    module = load_module()
+    rng = random.Random(1)
+    rows = bytes(
+        rng.choice([0x00, 0xFF, rng.randrange(256)]) for _ in range(2000)
+    ) + bytes(300) + bytes([0xFF] * 40)
+
+    encoded = module.encode_g5(rows)
+
+    assert len(encoded) < len(rows)
+    assert module.decode_g5(encoded, len(rows)) == rows
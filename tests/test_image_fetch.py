@@ -0,0 +1,163 @@
+"""Tests for the cached dlimg image fetcher."""
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import MagicMock, patch
+
+import pytest
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.open_epaper_link.image_fetch import ImageFetcher
+
+IMAGE_FETCH = 'custom_components.open_epaper_link.image_fetch'
+BODY = b"\x89PNG" + bytes(range(256)) * 16
+
+
+class FakeContent:
+    """Stream a body in chunks like aiohttp's StreamReader."""
+
+    def __init__(self, body):
+        self.body = body
+
+    async def iter_chunked(self, size):
+        for offset in range(0, len(self.body), size):
+            yield self.body[offset:offset + size]
+
+
+class FakeResponse:
+    def __init__(self, status, body=b"", headers=None):
+        self.status = status
+        self.headers = headers or {}
+        self.content_length = len(body) if body else None
+        self.content = FakeContent(body)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+
+class ImageServer:
+    """Serve an image with an ETag like a client session and count the requests."""
+
+    url = "http://example.com/image.png"
+    missing_url = "http://example.com/missing.png"
+
+    def __init__(self):
+        self.body = BODY
+        self.etag = '"v1"'
+        self.delay = 0
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        return self._respond(url, headers or {}, timeout)
+
+    @asynccontextmanager
+    async def _respond(self, url, headers, timeout):
+        self.requests.append(headers)
+        if self.delay > timeout.total:
+            await asyncio.sleep(timeout.total)
+            raise asyncio.TimeoutError()
+        await asyncio.sleep(self.delay)
+        if url == self.missing_url:
+            yield FakeResponse(404)
+        elif headers.get("If-None-Match") == self.etag:
+            yield FakeResponse(304, headers={"ETag": self.etag})
+        else:
+            yield FakeResponse(200, self.body, {"ETag": self.etag})
+
+
+@pytest.fixture
+def server():
+    image_server = ImageServer()
+    with patch(f'{IMAGE_FETCH}.async_get_clientsession', return_value=image_server):
+        yield image_server
+
+
+@pytest.fixture
+def hass():
+    instance = MagicMock()
+
+    async def run(func, *args):
+        return func(*args)
+
+    instance.async_add_executor_job = run
+    return instance
+
+
+async def test_fresh_entries_skip_the_server(hass, server, tmp_path):
+    """Test that bodies younger than the TTL are served from memory."""
+    fetcher = ImageFetcher(hass, str(tmp_path))
+
+    assert await fetcher.async_fetch(server.url) == BODY
+    assert await fetcher.async_fetch(server.url) == BODY
+
+    assert len(server.requests) == 1
+    assert fetcher.stats["memory_hits"] == 1
+    assert fetcher.stats["bytes_downloaded"] == len(BODY)
+    assert fetcher.stats["bytes_saved"] == len(BODY)
+
+
+async def test_stale_entries_are_revalidated(hass, server, tmp_path):
+    """Test conditional requests once the TTL has expired."""
+    fetcher = ImageFetcher(hass, str(tmp_path))
+    await fetcher.async_fetch(server.url, ttl=0)
+
+    assert await fetcher.async_fetch(server.url, ttl=0) == BODY
+    assert server.requests[1]["If-None-Match"] == '"v1"'
+    assert fetcher.stats["not_modified"] == 1
+
+    # A changed image is downloaded again
+    server.body = b"new image"
+    server.etag = '"v2"'
+    assert await fetcher.async_fetch(server.url, ttl=0) == b"new image"
+    assert fetcher.stats["downloads"] == 2
+
+
+async def test_disk_cache_survives_restart(hass, server, tmp_path):
+    """Test that a new fetcher revalidates the body stored on disk."""
+    await ImageFetcher(hass, str(tmp_path)).async_fetch(server.url)
+
+    fetcher = ImageFetcher(hass, str(tmp_path))
+    assert await fetcher.async_fetch(server.url) == BODY
+    assert fetcher.stats["disk_hits"] == 1
+    assert len(server.requests) == 1
+
+    assert await ImageFetcher(hass, str(tmp_path)).async_fetch(server.url, ttl=0) == BODY
+    assert server.requests[-1]["If-None-Match"] == '"v1"'
+
+
+async def test_concurrent_requests_share_a_download(hass, server):
+    """Test that simultaneous requests for a URL download it once."""
+    server.delay = 0.05
+    fetcher = ImageFetcher(hass)
+
+    bodies = await asyncio.gather(*(fetcher.async_fetch(server.url) for _ in range(5)))
+
+    assert bodies == [BODY] * 5
+    assert len(server.requests) == 1
+
+
+async def test_limits_and_errors(hass, server):
+    """Test the size limit, timeout and HTTP errors."""
+    fetcher = ImageFetcher(hass)
+
+    with pytest.raises(HomeAssistantError, match="too large"):
+        await fetcher.async_fetch(server.url, max_size=100)
+    with pytest.raises(HomeAssistantError, match="HTTP 404"):
+        await fetcher.async_fetch(server.missing_url)
+
+    server.delay = 1
+    with pytest.raises(HomeAssistantError, match="Failed to download image"):
+        await fetcher.async_fetch(server.url, timeout=0.05)
+
+
+async def test_memory_budget(hass, server):
+    """Test that the memory cache stays within its budget."""
+    fetcher = ImageFetcher(hass, memory_budget=len(BODY) - 1)
+
+    await fetcher.async_fetch(server.url)
+    await fetcher.async_fetch(server.url)
+
+    assert fetcher.stats["memory_entries"] == 0
+    assert len(server.requests) == 2
@@ -0,0 +1,104 @@
+"""Tests for the Material Design Icons index."""
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.open_epaper_link import mdi_index
+
+META = [
+    {"name": "home", "codepoint": "F02DC", "aliases": ["house"]},
+    {"name": "house", "codepoint": "F0001", "aliases": []},
+    {"name": "account", "codepoint": "F0004", "aliases": ["person", "user"]},
+    {"name": "account-box", "codepoint": "F0006", "aliases": ["user"]},
+]
+
+
+def linear_lookup(meta, icon_name):
+    """Reference lookup matching the original linear metadata scan."""
+    for icon in meta:
+        if icon["name"] == icon_name:
+            return int(icon["codepoint"], 16)
+    for icon in meta:
+        if icon_name in icon.get("aliases", []):
+            return int(icon["codepoint"], 16)
+    return None
+
+
+@pytest.mark.parametrize("name", ["home", "house", "person", "user", "missing"])
+def test_index_matches_linear_search(name):
+    """Names win over aliases and the first alias owner wins."""
+    index = mdi_index.build_mdi_index(META)
+    assert index.get(name) == linear_lookup(META, name)
+
+
+def test_lookup_icon_strips_prefix():
+    """The mdi: prefix is optional."""
+    index = mdi_index.build_mdi_index(META)
+    assert mdi_index.lookup_icon(index, "mdi:home") == chr(0xF02DC)
+    assert mdi_index.lookup_icon(index, "person") == chr(0xF0004)
+    assert mdi_index.lookup_icon(index, "mdi:missing") is None
+
+
+def test_index_is_persisted_and_reused(tmp_path, monkeypatch):
+    """The index is built once, stored and reloaded while fresh."""
+    meta_file = tmp_path / "meta.json"
+    meta_file.write_text(json.dumps(META))
+    storage_dir = tmp_path / ".storage"
+    index_file = storage_dir / mdi_index.MDI_INDEX_FILE
+    monkeypatch.setattr(mdi_index, "MDI_META_FILE", str(meta_file))
+    monkeypatch.setattr(mdi_index, "_index", None)
+
+    index = mdi_index.get_mdi_index(str(storage_dir))
+    assert index == mdi_index.build_mdi_index(META)
+    assert index_file.exists()
+    assert mdi_index.get_mdi_index(str(storage_dir)) is index
+
+    # A fresh process loads the stored index without reading the metadata
+    monkeypatch.setattr(mdi_index, "_index", None)
+    stored = json.loads(index_file.read_text())
+    stored["icons"]["from-index-file"] = 1
+    index_file.write_text(json.dumps(stored))
+    real_open = open
+
+    def guarded_open(file, *args, **kwargs):
+        assert file != str(meta_file), "metadata file was read"
+        return real_open(file, *args, **kwargs)
+
+    with patch("builtins.open", guarded_open):
+        assert "from-index-file" in mdi_index.get_mdi_index(str(storage_dir))
+
+    # Changed metadata invalidates the stored index
+    monkeypatch.setattr(mdi_index, "_index", None)
+    meta_file.write_text(json.dumps(META[:2]))
+    assert "from-index-file" not in mdi_index.get_mdi_index(str(storage_dir))
+
+
+def test_stale_mtime_invalidates_index(tmp_path, monkeypatch):
+    """A touched metadata file is reindexed."""
+    meta_file = tmp_path / "meta.json"
+    meta_file.write_text(json.dumps(META))
+    monkeypatch.setattr(mdi_index, "MDI_META_FILE", str(meta_file))
+    monkeypatch.setattr(mdi_index, "_index", None)
+    mdi_index.get_mdi_index(str(tmp_path))
+
+    index_file = tmp_path / mdi_index.MDI_INDEX_FILE
+    stored = json.loads(index_file.read_text())
+    stored["icons"]["from-index-file"] = 1
+    index_file.write_text(json.dumps(stored))
+
+    os.utime(meta_file, ns=(0, stored["source_mtime"] + 1))
+    monkeypatch.setattr(mdi_index, "_index", None)
+    assert "from-index-file" not in mdi_index.get_mdi_index(str(tmp_path))
+
+
+def test_index_without_storage_is_not_persisted(tmp_path, monkeypatch):
+    """Without a storage directory the index is only kept in memory."""
+    meta_file = tmp_path / "meta.json"
+    meta_file.write_text(json.dumps(META))
+    monkeypatch.setattr(mdi_index, "MDI_META_FILE", str(meta_file))
+    monkeypatch.setattr(mdi_index, "_index", None)
+
+    assert mdi_index.get_mdi_index() == mdi_index.build_mdi_index(META)
+    assert os.listdir(tmp_path) == ["meta.json"]
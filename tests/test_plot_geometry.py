@@ -0,0 +1,100 @@
+"""Tests for the vectorized plot geometry."""
+import random
+
+import numpy as np
+import pytest
+
+from custom_components.open_epaper_link.plot_geometry import (
+    catmull_rom_spline,
+    clip_polygon,
+    clip_polyline,
+    marker_positions,
+    to_screen,
+)
+
+BOX = (10, 5, 101, 51)  # x from 10 to 110, y from 5 to 55
+
+
+def reference_spline(points, steps):
+    """Point by point Catmull-Rom smoothing as previously done in _draw_plot."""
+    def catmull_rom(p0, p1, p2, p3, t):
+        t2 = t * t
+        t3 = t2 * t
+        return tuple(
+            int(0.5 * ((-t3 + 2 * t2 - t) * p0[k] + (3 * t3 - 5 * t2 + 2) * p1[k]
+                       + (-3 * t3 + 4 * t2 + t) * p2[k] + (t3 - t2) * p3[k]))
+            for k in (0, 1)
+        )
+
+    coords = [points[0]]
+    if len(points) > 3:
+        coords += [catmull_rom(points[0], points[0], points[1], points[2], i / steps) for i in range(1, steps)]
+    for i in range(len(points) - 3):
+        coords += [catmull_rom(*points[i:i + 4], j / steps) for j in range(steps)]
+    if len(points) > 3:
+        coords += [catmull_rom(points[-3], points[-2], points[-1], points[-1], i / steps) for i in range(1, steps)]
+    coords.append(points[-1])
+    return coords
+
+
+@pytest.mark.parametrize("count", [3, 4, 5, 200])
+@pytest.mark.parametrize("steps", [1, 4, 10])
+def test_spline_matches_reference(count, steps):
+    rng = random.Random(count * steps)
+    points = [(rng.randint(0, 295), rng.randint(0, 127)) for _ in range(count)]
+
+    result = catmull_rom_spline(np.array(points), steps)
+
+    assert [tuple(p) for p in result.tolist()] == reference_spline(points, steps)
+
+
+def test_to_screen_maps_points():
+    timestamps = np.array([1000.0, 1050.0, 1100.0, 900.0])
+    values = np.array([0.0, 5.0, 10.0, 20.0])
+
+    points = to_screen(timestamps, values, 1000.0, 100.0, 0.0, 10.0, BOX)
+
+    assert points.tolist() == [
+        [10, 55],  # Bottom left
+        [60, 30],  # Center
+        [110, 5],  # Top right
+        [-90, -45],  # Before the start and above the range, left for clipping
+    ]
+
+
+def test_clip_polyline_keeps_slope_at_window_start():
+    # Rises from (-90, 55) to (110, 5), crossing the left edge at y = 30
+    points = to_screen(np.array([900.0, 1100.0]), np.array([0.0, 10.0]), 1000.0, 100.0, 0.0, 10.0, BOX)
+
+    assert [piece.tolist() for piece in clip_polyline(points, BOX)] == [[[10, 30], [110, 5]]]
+
+
+def test_clip_polyline_splits_at_range_edges():
+    points = np.array([[20.0, 30.0], [40.0, 0.0], [60.0, 30.0], [80.0, 100.0], [100.0, 30.0]])
+
+    pieces = clip_polyline(points, BOX)
+
+    assert [piece.tolist() for piece in pieces] == [
+        [[20, 30], [37, 5]],
+        [[43, 5], [60, 30], [67, 55]],
+        [[93, 55], [100, 30]],
+    ]
+
+
+def test_clip_polyline_inside_and_outside():
+    inside = np.array([[20.0, 30.0], [20.0, 30.0], [30.0, 40.0]])
+    assert [piece.tolist() for piece in clip_polyline(inside, BOX)] == [inside.tolist()]
+    assert clip_polyline(np.array([[0.0, 0.0], [5.0, 0.0]]), BOX) == []
+    assert clip_polyline(np.array([[20.0, 30.0]]), BOX) == []
+
+
+def test_clip_polygon_cuts_at_edges():
+    band = np.array([[-90.0, 30.0], [60.0, 0.0], [60.0, 40.0], [-90.0, 50.0]])
+
+    assert clip_polygon(band, BOX).tolist() == [[10, 10], [35, 5], [60, 5], [60, 40], [10, 43]]
+    assert clip_polygon(np.array([[0.0, 0.0], [5.0, 0.0], [5.0, 3.0]]), BOX).tolist() == []
+
+
+def test_marker_positions_are_unique_and_inside():
+    points = np.array([[11, 12], [11, 12], [13, 14], [11, 12], [5, 12], [13, 60]])
+    assert marker_positions(points, BOX).tolist() == [[11, 12], [13, 14]]
@@ -0,0 +1,55 @@
+"""Tests for memoized QR code rendering."""
+import pytest
+import qrcode
+
+from custom_components.open_epaper_link.qr_code import estimate_version, render_qr_code
+
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+
+
+def best_fit_from_one(data, error_correction):
+    qr = qrcode.QRCode(error_correction=error_correction)
+    qr.add_data(data)
+    return qr.best_fit(start=1)
+
+
+@pytest.mark.parametrize("error_correction", [
+    qrcode.constants.ERROR_CORRECT_L,
+    qrcode.constants.ERROR_CORRECT_H,
+])
+@pytest.mark.parametrize("data", [
+    "1",
+    "12345678901234567890" * 10,
+    "HTTPS://EXAMPLE.COM/P/ABC-123",
+    "https://shop.example.com/p/0123456789abcdef?ref=label&size=xl",
+    "x" * 900,
+])
+def test_estimate_is_a_lower_bound(data, error_correction):
+    """Test that starting the search at the estimate finds the same version."""
+    version = best_fit_from_one(data, error_correction)
+    assert estimate_version(data, error_correction) <= version
+
+    qr = qrcode.QRCode(error_correction=error_correction)
+    qr.add_data(data)
+    assert qr.best_fit(start=estimate_version(data, error_correction)) == version
+
+
+def test_bitmap_is_memoized_and_identical():
+    """Test that cached bitmaps match a plain qrcode rendering."""
+    render_qr_code.cache_clear()
+    data = "https://shop.example.com/p/12345"
+
+    first = render_qr_code(data, qrcode.constants.ERROR_CORRECT_H, 3, 1, BLACK, WHITE)
+    second = render_qr_code(data, qrcode.constants.ERROR_CORRECT_H, 3, 1, BLACK, WHITE)
+    assert second is first
+    assert render_qr_code.cache_info().hits == 1
+
+    qr = qrcode.QRCode(version=1, error_correction=qrcode.constants.ERROR_CORRECT_H, box_size=3, border=1)
+    qr.add_data(data)
+    qr.make(fit=True)
+    expected = qr.make_image(fill_color=BLACK, back_color=WHITE).convert("RGB")
+    assert first.tobytes() == expected.tobytes()
+
+    # Any style change is a different bitmap
+    assert render_qr_code(data, qrcode.constants.ERROR_CORRECT_H, 3, 2, BLACK, WHITE) is not first
@@ -0,0 +1,102 @@
+"""Tests for drawcustom service helpers."""
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from custom_components.open_epaper_link.const import DOMAIN
+from custom_components.open_epaper_link.imagegen import RenderedImage, get_payload_hash
+from custom_components.open_epaper_link.services import async_setup_services, get_render_group_key
+from custom_components.open_epaper_link.upload_throttle import AdaptiveThrottle
+
+SERVICES = "custom_components.open_epaper_link.services"
+
+
+PAYLOAD = [{"type": "text", "x": 10, "y": 10, "value": "Hello", "size": 20}]
+PAYLOAD_HASH = get_payload_hash(PAYLOAD)
+
+
+def test_render_group_key_same_hardware():
+    """Tags with the same hardware and accent share a render."""
+    data = {"rotate": 0, "background": "white", "payload": PAYLOAD}
+    key_a = get_render_group_key(SimpleNamespace(type_id=1), "red", data, PAYLOAD_HASH)
+    key_b = get_render_group_key(SimpleNamespace(type_id=1), "red", dict(data), PAYLOAD_HASH)
+    assert key_a == key_b
+    assert hash(key_a) == hash(key_b)
+
+
+def test_render_group_key_differs():
+    """Hardware type and accent color split targets into groups."""
+    data = {"rotate": 0, "background": "white", "payload": PAYLOAD}
+    base = get_render_group_key(SimpleNamespace(type_id=1), "red", data, PAYLOAD_HASH)
+    assert get_render_group_key(SimpleNamespace(type_id=2), "red", data, PAYLOAD_HASH) != base
+    assert get_render_group_key(SimpleNamespace(type_id=1), "yellow", data, PAYLOAD_HASH) != base
+    assert get_render_group_key(
+        SimpleNamespace(type_id=1), "red", {**data, "rotate": 90}, PAYLOAD_HASH
+    ) != base
+    assert get_render_group_key(
+        SimpleNamespace(type_id=1), "red", data, get_payload_hash(PAYLOAD * 2)
+    ) != base
+
+
+class FakeImageGen:
+    """Render every request to the same image, like a tag type sharing a payload."""
+
+    async def get_tag_info(self, entity_id):
+        return SimpleNamespace(type_id=1), "red"
+
+    async def render_image(self, tag_type, accent_color, service_data, errors, force=False, payload_hash=None):
+        return RenderedImage(b"jpeg", "fingerprint")
+
+    def is_image_current(self, mac, fingerprint):
+        return False
+
+    def async_save_image(self, entity_id, image_data):
+        pass
+
+
+async def test_drawcustom_queues_every_target_of_a_shared_render():
+    """Test that one render shared by several tags is queued for each of them."""
+    entry = SimpleNamespace(entry_id="entry")
+    hub = SimpleNamespace(online=True, image_gen=FakeImageGen(), upload_throttle=AdaptiveThrottle())
+    hass = MagicMock()
+    hass.data = {DOMAIN: {"entry": hub}}
+    hass.config_entries.async_entries.return_value = [entry]
+
+    async def entity_for_device(hass, device_id):
+        return f"{DOMAIN}.{device_id}"
+
+    with patch(f"{SERVICES}.get_entity_id_from_device_id", entity_for_device), \
+            patch(f"{SERVICES}.UploadQueueHandler.add_to_queue", new_callable=AsyncMock) as add_to_queue:
+        await async_setup_services(hass)
+        handlers = {call.args[1]: call.args[2] for call in hass.services.async_register.call_args_list}
+        await handlers["drawcustom"](SimpleNamespace(data={
+            "device_id": ["aa01", "bb02", "cc03"],
+            "payload": PAYLOAD,
+            "background": "white",
+        }))
+        await hass.data[DOMAIN]["upload_queue"].async_shutdown()
+
+    queued = [call.args[2] for call in add_to_queue.call_args_list]
+    assert queued == [f"{DOMAIN}.aa01", f"{DOMAIN}.bb02", f"{DOMAIN}.cc03"]
+    assert all(call.args[3] == b"jpeg" for call in add_to_queue.call_args_list)
+
+
+async def test_setup_shuts_down_previous_upload_queue():
+    """Test that setting up the services again stops the old upload queue."""
+    entry = SimpleNamespace(entry_id="entry")
+    throttle = AdaptiveThrottle()
+    hub = SimpleNamespace(online=True, image_gen=FakeImageGen(), upload_throttle=throttle)
+    hass = MagicMock()
+    hass.data = {DOMAIN: {"entry": hub}}
+    hass.config_entries.async_entries.return_value = [entry]
+
+    await async_setup_services(hass)
+    first_queue = hass.data[DOMAIN]["upload_queue"]
+    await async_setup_services(hass)
+    second_queue = hass.data[DOMAIN]["upload_queue"]
+
+    assert second_queue is not first_queue
+    assert first_queue._closed
+    assert not second_queue._closed
+    # Only the current queue still follows the throttle
+    assert len(throttle._listeners) == 1
+    await second_queue.async_shutdown()
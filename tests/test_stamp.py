@@ -0,0 +1,64 @@
+"""Tests for stamping repeated primitives."""
+import pytest
+from PIL import Image, ImageDraw
+
+from custom_components.open_epaper_link.stamp import make_stamp
+
+PALETTE = [255, 255, 255, 0, 0, 0, 255, 0, 0]
+
+
+def new_canvas(mode):
+    if mode == "P":
+        img = Image.new("P", (60, 50), 0)
+        img.putpalette(PALETTE)
+        return img
+    return Image.new(mode, (60, 50), (255, 255, 255, 255))
+
+
+def rounded_cell(width, radius, fill, outline):
+    def draw_cell(draw, ink, x, y):
+        draw.rounded_rectangle(
+            [(x, y), (x + 9, y + 7)],
+            radius=radius,
+            fill=ink(fill),
+            outline=ink(outline),
+            width=width
+        )
+    return draw_cell
+
+
+@pytest.mark.parametrize("mode", ["P", "RGBA"])
+@pytest.mark.parametrize("width,radius,fill,outline", [
+    (1, 0, (255, 0, 0), (0, 0, 0)),
+    (2, 3, (0, 0, 0), (255, 0, 0)),
+    (6, 2, (255, 0, 0), (0, 0, 0)),
+    (3, 0, None, (0, 0, 0)),
+    (1, 2, (0, 0, 0), (0, 0, 0)),
+])
+def test_stamp_matches_direct_drawing(mode, width, radius, fill, outline):
+    """Test that stamping gives the same pixels as drawing every cell."""
+    draw_cell = rounded_cell(width, radius, fill, outline)
+    origins = [(x, y) for x in range(-4, 60, 13) for y in range(-3, 50, 11)]
+
+    expected = new_canvas(mode)
+    draw = ImageDraw.Draw(expected)
+    for x, y in origins:
+        draw_cell(draw, lambda color: color, x, y)
+
+    stamped = new_canvas(mode)
+    margin = width + 1
+    make_stamp(stamped, (-margin, -margin, 10 + margin, 8 + margin), draw_cell).paste_all(stamped, origins)
+
+    assert stamped.tobytes() == expected.tobytes()
+
+
+def test_stamp_adds_missing_palette_colors():
+    """Test that colors missing from the palette are added like drawing does."""
+    img = new_canvas("P")
+    stamp = make_stamp(img, (0, 0, 4, 4), lambda draw, ink, x, y: draw.rectangle(
+        [(x, y), (x + 3, y + 3)], fill=ink((0, 0, 255))
+    ))
+    stamp.paste(img, (10, 10))
+
+    assert img.convert("RGB").getpixel((11, 11)) == (0, 0, 255)
+    assert img.convert("RGB").getpixel((14, 14)) == (255, 255, 255)
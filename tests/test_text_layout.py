@@ -0,0 +1,104 @@
+"""Tests for text measuring, truncation and wrapping."""
+import gc
+import os
+import random
+import weakref
+from unittest.mock import patch
+
+import pytest
+from PIL import ImageFont
+
+from custom_components.open_epaper_link.text_layout import (
+    clear_text_length_cache,
+    text_length,
+    truncate_text,
+    wrap_lines,
+)
+
+FONT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "custom_components", "open_epaper_link"
+)
+
+WORDS = ["a", "to", "the", "quick", "brown", "fox", "jumps", "over", "lazy",
+         "dog", "AVAVAV", "Temperature", "Wohnzimmer", "23.5°C", "illuminance"]
+
+
+@pytest.fixture(params=[("ppb.ttf", 20), ("rbm.ttf", 13)])
+def font(request):
+    """Load one of the bundled fonts."""
+    name, size = request.param
+    return ImageFont.truetype(os.path.join(FONT_DIR, name), size)
+
+
+def naive_truncate(font, text, max_width, mode):
+    """Reference truncation removing one character at a time."""
+    if font.getlength(text, mode) <= max_width:
+        return text
+    truncated = text
+    while truncated and font.getlength(truncated + "...", mode) > max_width:
+        truncated = truncated[:-1]
+    return truncated + "..."
+
+
+def naive_wrap(font, text, max_width, mode):
+    """Reference greedy wrapping measuring every candidate line."""
+    lines = []
+    current_line = []
+    for word in text.split():
+        test_line = " ".join(current_line + [word])
+        if not current_line or font.getlength(test_line, mode) <= max_width:
+            current_line.append(word)
+        else:
+            lines.append(" ".join(current_line))
+            current_line = [word]
+    if current_line:
+        lines.append(" ".join(current_line))
+    return lines
+
+
+@pytest.mark.parametrize("mode", ["", "1"])
+def test_matches_reference_layout(font, mode):
+    """Truncation and wrapping match the one-step-at-a-time versions."""
+    rng = random.Random(42)
+    for _ in range(25):
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 12)))
+        max_width = rng.randint(5, 300)
+        assert truncate_text(font, text, max_width, mode=mode) == naive_truncate(font, text, max_width, mode)
+        assert wrap_lines(font, text, max_width, mode=mode) == naive_wrap(font, text, max_width, mode)
+
+
+def test_text_length_is_memoized(font):
+    """Repeated measurements are served from the cache."""
+    expected = font.getlength("memoized")
+    text_length(font, "memoized")
+    with patch.object(font, "getlength") as getlength:
+        assert text_length(font, "memoized") == expected
+        getlength.assert_not_called()
+
+    # Cleared when the font manager reloads its fonts
+    clear_text_length_cache()
+    with patch.object(font, "getlength", return_value=1.0) as getlength:
+        assert text_length(font, "memoized") == 1.0
+        getlength.assert_called_once()
+    clear_text_length_cache()
+
+
+def test_text_length_cache_does_not_keep_fonts(font):
+    """Cached widths are shared by equal fonts and do not keep them alive."""
+    reloaded = ImageFont.truetype(font.path, font.size)
+    text_length(reloaded, "shared")
+    with patch.object(font, "getlength") as getlength:
+        text_length(font, "shared")
+        getlength.assert_not_called()
+
+    ref = weakref.ref(reloaded)
+    del reloaded
+    gc.collect()
+    assert ref() is None
+
+
+def test_long_word_gets_own_line(font):
+    """A word wider than the limit is not split or dropped."""
+    assert wrap_lines(font, "a illuminance b", 10) == ["a", "illuminance", "b"]
+    assert truncate_text(font, "illuminance", 1) == "..."
@@ -0,0 +1,262 @@
+"""Tests for the upload queue."""
+import asyncio
+
+import pytest
+
+from custom_components.open_epaper_link.upload_queue import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    PRIORITY_NORMAL,
+    TokenBucket,
+    UploadQueueHandler,
+)
+
+
+class Recorder:
+    """Upload function recording the images it was called with."""
+
+    def __init__(self):
+        self.uploads = []
+
+    async def __call__(self, hub, entity_id, img):
+        self.uploads.append((entity_id, img))
+
+
+class BlockingUploads:
+    """Upload function that runs until released and tracks concurrency."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.running = 0
+        self.peak = 0
+        self.started = []
+
+    async def __call__(self, hub, entity_id, img):
+        self.started.append(img)
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await self.release.wait()
+        finally:
+            self.running -= 1
+
+
+async def wait_until(condition, timeout=1.0):
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0)
+
+
+async def test_newer_image_replaces_pending_upload():
+    """Test that a tag waiting in the queue only gets its latest image."""
+    upload = Recorder()
+    queue = UploadQueueHandler(cooldown=0)
+
+    await queue.add_to_queue(upload, None, "open_epaper_link.aa01", b"a1")
+    await queue.add_to_queue(upload, None, "open_epaper_link.bb02", b"b1")
+    await queue.add_to_queue(upload, None, "open_epaper_link.aa01", b"a2")
+    await queue.add_to_queue(upload, None, "open_epaper_link.cc03", b"c1")
+    await queue.add_to_queue(upload, None, "open_epaper_link.aa01", b"a3")
+    await queue.join()
+
+    # The first tag keeps its place at the front of the queue
+    assert upload.uploads == [
+        ("open_epaper_link.aa01", b"a3"),
+        ("open_epaper_link.bb02", b"b1"),
+        ("open_epaper_link.cc03", b"c1"),
+    ]
+    assert queue.coalesced == 2
+    await queue.async_shutdown()
+
+
+async def test_uploads_after_start_are_not_merged():
+    """Test that an image queued after its tag's upload started is still sent."""
+    queue = UploadQueueHandler(cooldown=0)
+    uploads = []
+
+    async def upload(hub, entity_id, img):
+        uploads.append(img)
+        if img == b"first":
+            await queue.add_to_queue(upload, None, entity_id, b"second")
+
+    await queue.add_to_queue(upload, None, "open_epaper_link.aa01", b"first")
+    await wait_until(lambda: len(uploads) == 2)
+    await queue.join()
+
+    assert uploads == [b"first", b"second"]
+    assert queue.coalesced == 0
+    await queue.async_shutdown()
+
+
+@pytest.mark.parametrize("max_concurrent", [1, 2, 3])
+async def test_uploads_run_concurrently_up_to_the_limit(max_concurrent):
+    """Test that exactly max_concurrent uploads run at the same time."""
+    upload = BlockingUploads()
+    queue = UploadQueueHandler(max_concurrent=max_concurrent, cooldown=0)
+
+    for index in range(6):
+        await queue.add_to_queue(upload, None, f"open_epaper_link.tag{index}", index)
+    await wait_until(lambda: upload.running == max_concurrent)
+    await asyncio.sleep(0.01)
+
+    assert upload.running == max_concurrent
+    assert queue.active_uploads == max_concurrent
+    assert upload.started == list(range(max_concurrent))
+
+    upload.release.set()
+    await queue.join()
+    assert upload.peak == max_concurrent
+    assert upload.started == list(range(6))
+    await queue.async_shutdown()
+
+
+async def test_concurrent_uploads_overlap_in_time():
+    """Test that parallel uploads take the time of one, not the sum."""
+    queue = UploadQueueHandler(max_concurrent=4, cooldown=0)
+
+    async def upload(hub, entity_id):
+        await asyncio.sleep(0.1)
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    for index in range(4):
+        await queue.add_to_queue(upload, None, f"open_epaper_link.tag{index}")
+    await queue.join()
+
+    assert loop.time() - start < 0.3
+    await queue.async_shutdown()
+
+
+async def test_failed_upload_frees_its_slot():
+    """Test that an error in one upload does not block the queue."""
+    uploads = []
+
+    async def upload(hub, entity_id):
+        uploads.append(entity_id)
+        if entity_id.endswith("bad"):
+            raise RuntimeError("AP rejected the image")
+
+    queue = UploadQueueHandler(cooldown=0)
+    await queue.add_to_queue(upload, None, "open_epaper_link.bad")
+    await queue.add_to_queue(upload, None, "open_epaper_link.good")
+    await queue.join()
+
+    assert uploads == ["open_epaper_link.bad", "open_epaper_link.good"]
+    assert queue.active_uploads == 0
+    await queue.async_shutdown()
+
+
+def test_token_bucket_spaces_starts():
+    """Test that tokens refill at the configured rate up to the capacity."""
+    now = [0.0]
+    bucket = TokenBucket(rate=2.0, capacity=1.0, clock=lambda: now[0])
+
+    assert bucket.delay() == 0
+    bucket._tokens -= 1
+    assert bucket.delay() == pytest.approx(0.5)
+
+    now[0] = 0.25
+    assert bucket.delay() == pytest.approx(0.25)
+
+    # Idle time does not save up more than the capacity
+    now[0] = 10.0
+    assert bucket.delay() == 0
+    assert bucket._tokens == 1.0
+
+
+async def test_cooldown_limits_upload_rate():
+    """Test that upload starts are spaced by the cooldown."""
+    loop = asyncio.get_running_loop()
+    starts = []
+
+    async def upload(hub, entity_id):
+        starts.append(loop.time())
+
+    queue = UploadQueueHandler(max_concurrent=3, cooldown=0.05)
+    for index in range(3):
+        await queue.add_to_queue(upload, None, f"open_epaper_link.tag{index}")
+    await queue.join()
+
+    gaps = [later - earlier for earlier, later in zip(starts, starts[1:])]
+    assert all(gap >= 0.04 for gap in gaps)
+    await queue.async_shutdown()
+
+
+async def test_shutdown_cancels_uploads():
+    """Test that shutdown cancels running uploads and drops queued ones."""
+    upload = BlockingUploads()
+    queue = UploadQueueHandler(cooldown=0)
+    await queue.add_to_queue(upload, None, "open_epaper_link.aa01", b"a")
+    await queue.add_to_queue(upload, None, "open_epaper_link.bb02", b"b")
+    await wait_until(lambda: upload.running == 1)
+
+    await queue.async_shutdown()
+
+    assert upload.running == 0
+    assert upload.started == [b"a"]
+    assert str(queue) == "Queue(active=0, size=0, lanes=0/0/0, coalesced=0)"
+    with pytest.raises(RuntimeError):
+        await queue.add_to_queue(upload, None, "open_epaper_link.cc03", b"c")
+
+
+async def test_lanes_share_uploads_by_weight():
+    """Test that busy lanes get upload starts in proportion to their weight."""
+    upload = Recorder()
+    queue = UploadQueueHandler(cooldown=0)
+    for priority in (PRIORITY_LOW, PRIORITY_NORMAL, PRIORITY_HIGH):
+        for index in range(20):
+            await queue.add_to_queue(upload, None, f"open_epaper_link.{priority}{index}", priority, priority=priority)
+    await queue.join()
+
+    first_cycle = [priority for _, priority in upload.uploads[:13]]
+    assert first_cycle.count(PRIORITY_HIGH) == 8
+    assert first_cycle.count(PRIORITY_NORMAL) == 4
+    assert first_cycle.count(PRIORITY_LOW) == 1
+    assert len(upload.uploads) == 60
+    await queue.async_shutdown()
+
+
+async def test_high_priority_overtakes_bulk_uploads():
+    """Test that an interactive upload waits behind at most one bulk upload."""
+    upload = BlockingUploads()
+    queue = UploadQueueHandler(cooldown=0)
+    for index in range(50):
+        await queue.add_to_queue(upload, None, f"open_epaper_link.shelf{index}", index, priority=PRIORITY_LOW)
+    await wait_until(lambda: upload.running == 1)
+
+    await queue.add_to_queue(upload, None, "open_epaper_link.door", "door", priority=PRIORITY_HIGH)
+    upload.release.set()
+    await queue.join()
+
+    assert upload.started.index("door") == 1
+    stats = queue.stats["lanes"]
+    assert stats[PRIORITY_HIGH]["dispatched"] == 1
+    assert stats[PRIORITY_LOW]["dispatched"] == 50
+    assert stats[PRIORITY_LOW]["max_wait"] >= stats[PRIORITY_LOW]["avg_wait"] > 0
+    assert all(lane["depth"] == 0 for lane in stats.values())
+    await queue.async_shutdown()
+
+
+async def test_urgent_image_moves_pending_tag_to_its_lane():
+    """Test that coalescing keeps the most urgent priority of both images."""
+    upload = Recorder()
+    queue = UploadQueueHandler(cooldown=0)
+    await queue.add_to_queue(upload, None, "open_epaper_link.aa01", b"a1", priority=PRIORITY_LOW)
+    await queue.add_to_queue(upload, None, "open_epaper_link.bb02", b"b1", priority=PRIORITY_HIGH)
+    await queue.add_to_queue(upload, None, "open_epaper_link.aa01", b"a2", priority=PRIORITY_HIGH)
+    await queue.add_to_queue(upload, None, "open_epaper_link.bb02", b"b2", priority=PRIORITY_LOW)
+
+    lanes = queue.stats["lanes"]
+    assert (lanes[PRIORITY_HIGH]["depth"], lanes[PRIORITY_LOW]["depth"]) == (2, 0)
+    await queue.join()
+
+    assert upload.uploads == [("open_epaper_link.bb02", b"b2"), ("open_epaper_link.aa01", b"a2")]
+    assert queue.coalesced == 2
+    await queue.async_shutdown()
+
+
+async def test_unknown_priority_is_rejected():
+    """Test that uploads need a known priority."""
+    queue = UploadQueueHandler(cooldown=0)
+    with pytest.raises(ValueError):
+        await queue.add_to_queue(Recorder(), None, "open_epaper_link.aa01", b"a", priority="urgent")
@@ -0,0 +1,189 @@
+"""Tests for adaptive upload throttling."""
+import asyncio
+
+import pytest
+
+from custom_components.open_epaper_link.hub import Hub
+from custom_components.open_epaper_link.upload_queue import UploadQueueHandler
+from custom_components.open_epaper_link.upload_throttle import (
+    ADJUST_INTERVAL,
+    INITIAL_UPLOAD_RATE,
+    RATE_INCREASE,
+    AdaptiveThrottle,
+)
+
+HEALTHY = {"ap_state": "Online", "run_state": "Running", "heap": 120000, "ps_ram_free": 2000000}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def test_healthy_ap_raises_rate_then_concurrency(clock):
+    """Test the additive increase up to the limits."""
+    throttle = AdaptiveThrottle(min_rate=6, max_rate=72, max_concurrent=2, clock=clock)
+    throttle.observe(HEALTHY, pending_tags=0)
+
+    throttle.record_success()
+    assert throttle.rate == INITIAL_UPLOAD_RATE + RATE_INCREASE
+
+    # Increases are spaced by the adjust interval
+    throttle.record_success()
+    assert throttle.rate == INITIAL_UPLOAD_RATE + RATE_INCREASE
+
+    clock.now += ADJUST_INTERVAL
+    throttle.record_success()
+    assert (throttle.rate, throttle.concurrency) == (72, 1)
+
+    clock.now += ADJUST_INTERVAL
+    throttle.record_success()
+    clock.now += ADJUST_INTERVAL
+    throttle.record_success()
+    assert (throttle.rate, throttle.concurrency) == (72, 2)
+
+
+@pytest.mark.parametrize("ap_status,pending_tags", [
+    ({**HEALTHY, "heap": 20000}, 0),
+    ({**HEALTHY, "ps_ram_free": 100000}, 0),
+    ({**HEALTHY, "ap_state": "Flashing"}, 0),
+    ({**HEALTHY, "run_state": "Paused"}, 0),
+    (HEALTHY, 11),
+])
+def test_overloaded_ap_halves_rate(clock, ap_status, pending_tags):
+    """Test the multiplicative decrease on each sign of overload."""
+    throttle = AdaptiveThrottle(clock=clock)
+
+    throttle.observe(ap_status, pending_tags)
+
+    assert throttle.rate == INITIAL_UPLOAD_RATE / 2
+    assert throttle.overload is not None
+
+    # No increase while the AP is overloaded
+    clock.now += ADJUST_INTERVAL
+    throttle.record_success()
+    assert throttle.rate == INITIAL_UPLOAD_RATE / 2
+
+
+def test_ap_without_psram_is_healthy(clock):
+    """Test that a PSRAM reading of 0 is not taken as overload."""
+    throttle = AdaptiveThrottle(clock=clock)
+    throttle.observe({**HEALTHY, "ps_ram_free": 0}, 0)
+    assert throttle.overload is None
+    assert throttle.rate == INITIAL_UPLOAD_RATE
+
+
+def test_sys_message_without_states_is_no_signal(clock):
+    """Test that a sys message without apstate/runstate is not taken as overload."""
+    throttle = AdaptiveThrottle(clock=clock)
+    sys_data = {"heap": 120000, "psfree": 2000000}
+    ap_status = {
+        **HEALTHY,
+        "ap_state": Hub._get_ap_state_string(sys_data.get("apstate")),
+        "run_state": Hub._get_ap_run_state_string(sys_data.get("runstate")),
+    }
+    assert ap_status["ap_state"] == "Unknown: None"
+
+    throttle.observe(ap_status, 0)
+    assert throttle.overload is None
+    assert throttle.rate == INITIAL_UPLOAD_RATE
+
+    throttle.observe({"heap": 120000}, 0)
+    assert throttle.overload is None
+    assert throttle.rate == INITIAL_UPLOAD_RATE
+
+
+def test_failures_back_off_to_the_minimum(clock):
+    """Test that decreases are spaced and bounded by the minimum rate."""
+    changes = []
+    throttle = AdaptiveThrottle(min_rate=10, clock=clock)
+    throttle.add_listener(lambda: changes.append(throttle.rate))
+
+    throttle.record_failure()
+    throttle.record_failure()
+    assert changes == [30]
+
+    for _ in range(3):
+        clock.now += ADJUST_INTERVAL
+        throttle.record_failure()
+    assert changes == [30, 15, 10]
+
+
+def test_configure_clamps_the_rate(clock):
+    """Test that new limits apply to the current rate."""
+    throttle = AdaptiveThrottle(clock=clock)
+    throttle.configure(min_rate=1, max_rate=20, max_concurrent=1, min_heap=0, max_pending=10)
+    assert throttle.rate == 20
+
+
+async def test_queue_follows_throttle_concurrency(clock):
+    """Test that the queue runs as many uploads as the throttle allows."""
+    throttle = AdaptiveThrottle(min_rate=600, max_rate=600, max_concurrent=3, clock=clock)
+    throttle.concurrency = 2
+    queue = UploadQueueHandler(throttle=throttle)
+    release = asyncio.Event()
+    running = []
+
+    async def upload(hub, entity_id):
+        running.append(entity_id)
+        await release.wait()
+
+    for index in range(4):
+        await queue.add_to_queue(upload, None, f"open_epaper_link.tag{index}")
+    async with asyncio.timeout(1):
+        while len(running) < 2:
+            await asyncio.sleep(0)
+    await asyncio.sleep(0.05)
+    assert queue.active_uploads == 2
+
+    release.set()
+    await queue.join()
+    assert len(running) == 4
+    await queue.async_shutdown()
+
+
+async def test_queue_reports_outcomes(clock):
+    """Test that failed uploads slow the throttle down."""
+    throttle = AdaptiveThrottle(min_rate=6, max_rate=600, clock=clock)
+    queue = UploadQueueHandler(throttle=throttle)
+
+    async def failing_upload(hub, entity_id):
+        raise RuntimeError("timeout")
+
+    await queue.add_to_queue(failing_upload, None, "open_epaper_link.aa01")
+    await queue.join()
+
+    assert throttle.rate == INITIAL_UPLOAD_RATE / 2
+    await queue.async_shutdown()
+
+
+async def test_rate_increase_wakes_waiting_upload():
+    """Test that a faster rate applies to an upload already waiting for a token."""
+    throttle = AdaptiveThrottle(min_rate=1, max_rate=600)
+    throttle.configure(min_rate=1, max_rate=1, max_concurrent=1, min_heap=0, max_pending=10)
+    queue = UploadQueueHandler(throttle=throttle)
+    uploads = []
+
+    async def upload(hub, entity_id):
+        uploads.append(entity_id)
+
+    await queue.add_to_queue(upload, None, "open_epaper_link.aa01")
+    await queue.add_to_queue(upload, None, "open_epaper_link.bb02")
+    async with asyncio.timeout(1):
+        while len(uploads) < 1:
+            await asyncio.sleep(0)
+
+    # The second upload waits a minute for its token until the rate goes up
+    throttle.configure(min_rate=600, max_rate=600, max_concurrent=1, min_heap=0, max_pending=10)
+    async with asyncio.timeout(1):
+        await queue.join()
+    assert len(uploads) == 2
+    await queue.async_shutdown()
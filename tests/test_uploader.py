@@ -0,0 +1,94 @@
+"""Tests for streaming multipart image uploads."""
+from contextlib import asynccontextmanager
+from email.parser import BytesParser
+from email.policy import HTTP
+
+from custom_components.open_epaper_link.uploader import (
+    UPLOAD_CHUNK_SIZE,
+    MultipartBody,
+    async_post_multipart,
+    upload_timeout,
+)
+
+IMAGE = bytes(range(256)) * 200
+FIELDS = [
+    ('mac', '0000021EB7A1B2C3'),
+    ('dither', '2'),
+    ('image', ('image.jpg', IMAGE, 'image/jpeg')),
+    ('preloadtype', '1'),
+]
+
+
+async def collect(body):
+    return [chunk async for chunk in body.chunks()]
+
+
+def parse(content_type, data):
+    message = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + data
+    )
+    return [
+        (part.get_param("name", header="content-disposition"), part.get_filename(), part.get_payload(decode=True))
+        for part in message.iter_parts()
+    ]
+
+
+async def test_body_is_valid_multipart():
+    """Test that the streamed body parses back into the fields, in order."""
+    body = MultipartBody(FIELDS)
+    data = b"".join(await collect(body))
+
+    assert len(data) == body.size
+    assert parse(body.content_type, data) == [
+        ('mac', None, b'0000021EB7A1B2C3'),
+        ('dither', None, b'2'),
+        ('image', 'image.jpg', IMAGE),
+        ('preloadtype', None, b'1'),
+    ]
+
+
+async def test_image_is_streamed_without_copies():
+    """Test that the image is sent as views of the caller's bytes."""
+    body = MultipartBody(FIELDS)
+    image_chunks = [chunk for chunk in await collect(body) if chunk.obj is IMAGE]
+
+    assert b"".join(image_chunks) == IMAGE
+    assert max(len(chunk) for chunk in image_chunks) == UPLOAD_CHUNK_SIZE
+
+    # Retries stream the same body again
+    assert b"".join(await collect(body)) == b"".join(await collect(body))
+
+
+class FakeResponse:
+    status = 200
+
+    async def read(self):
+        return b"ok"
+
+
+class UploadServer:
+    """Record posts like a client session."""
+
+    def __init__(self):
+        self.posts = []
+
+    @asynccontextmanager
+    async def post(self, url, data=None, headers=None, timeout=None):
+        body = b"".join([bytes(chunk) async for chunk in data])
+        self.posts.append((url, headers, timeout, body))
+        yield FakeResponse()
+
+
+async def test_post_sends_length_and_timeouts():
+    """Test that the body is posted with a Content-Length and phase timeouts."""
+    server = UploadServer()
+    body = MultipartBody(FIELDS)
+
+    assert await async_post_multipart(server, "http://ap/imgupload", body) == 200
+
+    url, headers, timeout, data = server.posts[0]
+    assert url == "http://ap/imgupload"
+    assert headers == {"Content-Type": body.content_type, "Content-Length": str(len(data))}
+    assert timeout == upload_timeout()
+    assert timeout.sock_connect < timeout.total
+    assert timeout.sock_read < timeout.total